@@ -0,0 +1,254 @@
+# access.py
+from datetime import datetime, timezone
+import numpy as np
+
+from instrumentation import count, timed
+from swath import EARTH_RADIUS_KM
+from target_index import TargetIndex, to_unit_xyz
+
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+def _tangents(points):
+    """
+    Finite-difference tangents (per sample step) for Hermite interpolation.
+
+    Central differences where both neighbours are valid, one-sided ones at
+    the ends of the track and next to failed (NaN) samples, and zero for
+    isolated samples.
+    """
+    if len(points) < 2:
+        return np.zeros_like(points)
+    forward = np.full_like(points, np.nan)
+    forward[:-1] = points[1:] - points[:-1]
+    backward = np.full_like(points, np.nan)
+    backward[1:] = forward[:-1]
+    tangents = (forward + backward) / 2
+    tangents = np.where(np.isnan(tangents), np.where(np.isnan(forward), backward, forward), tangents)
+    return np.nan_to_num(tangents, nan=0.0)
+
+def _interpolate(p0, p1, m0, m1, u):
+    """
+    Cubic Hermite interpolation between unit vectors, renormalized onto the sphere.
+    """
+    u = u[:, None]
+    u2 = u * u
+    u3 = u2 * u
+    point = (
+        (2 * u3 - 3 * u2 + 1) * p0
+        + (u3 - 2 * u2 + u) * m0
+        + (-2 * u3 + 3 * u2) * p1
+        + (u3 - u2) * m1
+    )
+    return point / np.linalg.norm(point, axis=1, keepdims=True)
+
+def _angle(a, b):
+    """
+    Central angle in radians between rows of two unit-vector arrays.
+    """
+    return 2 * np.arcsin(np.clip(np.linalg.norm(a - b, axis=1) / 2, 0.0, 1.0))
+
+@timed('access_windows')
+def track_access_windows(track, targets, swath_radius_km=75, index=None, iterations=30):
+    """
+    Computes continuous-time access windows between one ground track and the targets.
+
+    The sampled track is interpolated with cubic Hermite splines on the unit
+    sphere. Every segment that can come within swath_radius_km of a target is
+    searched for its closest approach, and entry/exit times are refined by
+    bisection, so the result does not depend on the sampling step.
+
+    Args:
+        track (dict): Arrays 'epoch' (POSIX seconds), 'lat' and 'lon'.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        swath_radius_km (float): Radius within which a target is visible.
+        index (TargetIndex): Prebuilt index over targets, reused across satellites.
+        iterations (int): Golden-section and bisection iterations per segment.
+
+    Returns:
+        dict: One entry per window, as arrays: 'target' (index into targets),
+            'start', 'end' and 'closest' (POSIX seconds) and 'min_distance_km'.
+            Windows are sorted by target and then by start time.
+    """
+    if index is None:
+        index = TargetIndex(targets)
+    epoch = np.asarray(track['epoch'], dtype=np.float64)
+    lat = np.asarray(track['lat'], dtype=np.float64)
+    lon = np.asarray(track['lon'], dtype=np.float64)
+    windows = _empty_windows()
+    if len(epoch) < 2 or len(index) == 0:
+        return windows
+
+    points = to_unit_xyz(lat, lon)
+    tangents = _tangents(points)
+    angle_limit = swath_radius_km / EARTH_RADIUS_KM
+
+    # Any segment that reaches the radius has an endpoint within radius + half its length
+    segment_km = _angle(points[:-1], points[1:]) * EARTH_RADIUS_KM
+    margin = np.nanmax(segment_km, initial=0.0) / 2
+    point_idx, target_idx = index.query_pairs(lat, lon, swath_radius_km + margin)
+    seg = np.concatenate((point_idx - 1, point_idx))
+    tgt = np.concatenate((target_idx, target_idx))
+    usable = (seg >= 0) & (seg < len(epoch) - 1)
+    pairs = np.unique(np.stack((tgt[usable], seg[usable]), axis=1), axis=0)
+    pairs = pairs[~np.isnan(segment_km[pairs[:, 1]])]
+    if len(pairs) == 0:
+        return windows
+    tgt, seg = pairs[:, 0], pairs[:, 1]
+
+    # Per-segment version of the same bound (with slack for the spline's curvature)
+    x = index.xyz[tgt]
+    a_start = _angle(points[seg], x)
+    a_end = _angle(points[seg + 1], x)
+    half_segment = segment_km[seg] / EARTH_RADIUS_KM / 2
+    near = np.minimum(a_start, a_end) <= angle_limit + 1.01 * half_segment + 1e-9
+    tgt, seg, x, a_start, a_end = tgt[near], seg[near], x[near], a_start[near], a_end[near]
+    if len(seg) == 0:
+        return windows
+
+    p0, p1 = points[seg], points[seg + 1]
+    m0, m1 = tangents[seg], tangents[seg + 1]
+
+    count('distance_evaluations', 2 * len(seg))
+
+    def angle_at(u):
+        count('distance_evaluations', len(u))
+        return _angle(_interpolate(p0, p1, m0, m1, u), x)
+
+    # Golden-section search for the closest approach inside each segment
+    lo = np.zeros(len(seg))
+    hi = np.ones(len(seg))
+    c = hi - GOLDEN * (hi - lo)
+    d = lo + GOLDEN * (hi - lo)
+    fc = angle_at(c)
+    fd = angle_at(d)
+    for _ in range(iterations):
+        closer = fc < fd
+        hi = np.where(closer, d, hi)
+        lo = np.where(closer, lo, c)
+        # One interior point carries over, only the other needs evaluating
+        probe = np.where(closer, hi - GOLDEN * (hi - lo), lo + GOLDEN * (hi - lo))
+        fp = angle_at(probe)
+        c, d = np.where(closer, probe, d), np.where(closer, c, probe)
+        fc, fd = np.where(closer, fp, fd), np.where(closer, fc, fp)
+    candidates = np.stack((np.zeros(len(seg)), (lo + hi) / 2, np.ones(len(seg))))
+    candidate_angles = np.stack((a_start, angle_at(candidates[1]), a_end))
+    best = np.argmin(candidate_angles, axis=0)
+    u_min = candidates[best, np.arange(len(seg))]
+    a_min = candidate_angles[best, np.arange(len(seg))]
+    reaches = a_min <= angle_limit
+
+    def crossing(mask, lo, hi, inside_at_hi):
+        # Bisection for the radius crossing; inside_at_hi says which end is inside
+        lo, hi = lo[mask], hi[mask]
+        sel = np.flatnonzero(mask)
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            count('distance_evaluations', len(mid))
+            inside = _angle(_interpolate(p0[sel], p1[sel], m0[sel], m1[sel], mid), x[sel]) <= angle_limit
+            move_hi = inside if inside_at_hi else ~inside
+            hi = np.where(move_hi, mid, hi)
+            lo = np.where(move_hi, lo, mid)
+        return sel, (lo + hi) / 2
+
+    entry_sel, entry_u = crossing(reaches & (a_start > angle_limit), np.zeros(len(seg)), u_min, True)
+    exit_sel, exit_u = crossing(reaches & (a_end > angle_limit), u_min, np.ones(len(seg)), False)
+
+    dt = epoch[seg + 1] - epoch[seg]
+    entry_t = epoch[seg[entry_sel]] + entry_u * dt[entry_sel]
+    exit_t = epoch[seg[exit_sel]] + exit_u * dt[exit_sel]
+
+    # Windows already open at the start of the track, or still open at its end
+    first_inside = (seg == 0) & (a_start <= angle_limit)
+    last_inside = (seg == len(epoch) - 2) & (a_end <= angle_limit)
+    entry_tgt = np.concatenate((tgt[entry_sel], tgt[first_inside]))
+    entry_t = np.concatenate((entry_t, np.full(first_inside.sum(), epoch[0])))
+    exit_tgt = np.concatenate((tgt[exit_sel], tgt[last_inside]))
+    exit_t = np.concatenate((exit_t, np.full(last_inside.sum(), epoch[-1])))
+
+    # Entries and exits alternate per target, so sorting both pairs them up
+    entry_order = np.lexsort((entry_t, entry_tgt))
+    exit_order = np.lexsort((exit_t, exit_tgt))
+    window_tgt = entry_tgt[entry_order]
+    start = entry_t[entry_order]
+    end = exit_t[exit_order]
+
+    # Closest approach: the best segment minimum falling inside each window
+    min_t = epoch[seg] + u_min * dt
+    span = epoch[-1] - epoch[0] + 1.0
+    window_key = window_tgt * span + (start - epoch[0])
+    minima = np.flatnonzero(reaches)
+    minima_key = tgt[minima] * span + (min_t[minima] - epoch[0])
+    owner = np.searchsorted(window_key, minima_key, side='right') - 1
+    order = np.lexsort((a_min[minima], owner))
+    owner, minima = owner[order], minima[order]
+    _, first = np.unique(owner, return_index=True)
+    closest = min_t[minima[first]]
+    min_angle = a_min[minima[first]]
+
+    count('windows_found', len(window_tgt))
+    windows['target'] = window_tgt
+    windows['start'] = start
+    windows['end'] = end
+    windows['closest'] = closest
+    windows['min_distance_km'] = min_angle * EARTH_RADIUS_KM
+    return windows
+
+def access_windows(constellation, targets, swath_radius_km=75, index=None, iterations=30):
+    """
+    Computes access windows for every satellite of a propagated constellation.
+
+    Args:
+        constellation (dict): Output of constellation.propagate_constellation.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        swath_radius_km (float): Radius within which a target is visible.
+        index (TargetIndex): Prebuilt index over targets.
+        iterations (int): Golden-section and bisection iterations per segment.
+
+    Returns:
+        dict: Same columns as track_access_windows plus 'sat' (row index into
+            the constellation), sorted by satellite, target and start time.
+    """
+    if index is None:
+        index = TargetIndex(targets)
+    epoch = constellation['epoch']
+    parts = []
+    for i, (lat, lon) in enumerate(zip(constellation['lat'], constellation['lon'])):
+        windows = track_access_windows({'epoch': epoch, 'lat': lat, 'lon': lon}, targets, swath_radius_km, index, iterations)
+        windows['sat'] = np.full(len(windows['target']), i, dtype=np.int64)
+        parts.append(windows)
+    if not parts:
+        windows = _empty_windows()
+        windows['sat'] = np.empty(0, dtype=np.int64)
+        return windows
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+def windows_to_records(windows, targets):
+    """
+    Converts columnar access windows into a list of dicts with UTC datetimes.
+
+    Returns:
+        List[dict]: Each dict contains 'target', 'start', 'end', 'closest' and
+            'min_distance_km' (plus 'sat' when present).
+    """
+    records = []
+    for k in range(len(windows['target'])):
+        record = {
+            'target': targets[windows['target'][k]],
+            'start': datetime.fromtimestamp(windows['start'][k], tz=timezone.utc),
+            'end': datetime.fromtimestamp(windows['end'][k], tz=timezone.utc),
+            'closest': datetime.fromtimestamp(windows['closest'][k], tz=timezone.utc),
+            'min_distance_km': float(windows['min_distance_km'][k]),
+        }
+        if 'sat' in windows:
+            record['sat'] = int(windows['sat'][k])
+        records.append(record)
+    return records
+
+def _empty_windows():
+    return {
+        'target': np.empty(0, dtype=np.int64),
+        'start': np.empty(0),
+        'end': np.empty(0),
+        'closest': np.empty(0),
+        'min_distance_km': np.empty(0),
+    }
@@ -1,14 +1,30 @@
 import streamlit as st
 st.set_page_config(layout="wide")  # Use a wide layout
 
+from datetime import datetime, timezone
 import importlib
-import requests
+import io
+import os
+
+import matplotlib.pyplot as plt
+from skyfield.api import load
 
 # Import other dependencies
-from satellite import get_satellite_path_with_edges
-from scheduler import greedy_schedule
-from visualizer import plot_multiple_satellites
-from target_list import TARGETS as DEFAULT_TARGETS
+from ground_track import GroundTrack
+from instrumentation import CAPTURE_MODES, Profiler, stage
+from passes import predict_passes
+from propagation_cache import default_cache
+from satellite import grid_start
+from scheduler import SCHEDULING_MODES, IncrementalScheduler, global_schedule
+from sensor import SensorModel
+from simulation import run_simulation
+from simulation_job import SimulationJob
+from streaming import run_streaming
+from table_io import passes_table
+from visualizer import plot_ground_tracks
+from target_list import TARGETS
+from target_store import DEFAULT_DEDUP_KM, TargetStore, targets_key
+from tle_catalog import TLECatalog, merge_satellites
 
 # ------------------------------------------------
 # Import streamlit-geolocation using importlib
@@ -37,12 +53,25 @@ if "satellites" not in st.session_state:
     st.session_state.satellites = []
 if "custom_targets" not in st.session_state:
     st.session_state.custom_targets = []
+if "imported_targets" not in st.session_state:
+    st.session_state.imported_targets = None
 if "simulation_run" not in st.session_state:
     st.session_state.simulation_run = False
 if "sidebar_hidden" not in st.session_state:
     st.session_state.sidebar_hidden = False
 if "my_location" not in st.session_state:
     st.session_state.my_location = None
+if "tle_profile" not in st.session_state:
+    st.session_state.tle_profile = None
+if "passes" not in st.session_state:
+    st.session_state.passes = None
+if "simulation" not in st.session_state:
+    st.session_state.simulation = None
+    st.session_state.simulation_key = None
+    st.session_state.planner = None
+    st.session_state.job = None
+    st.session_state.job_preview = None
+    st.session_state.simulation_start = None
 
 # ------------------------------------------------
 # Sidebar: Satellite Inputs & TLE Loader
@@ -74,25 +103,18 @@ TLE_SOURCES = {
     "BlackSky": "https://celestrak.com/NORAD/elements/blacksky.txt"  # placeholder URL
 }
 selected_constellation = st.sidebar.selectbox("Select Constellation", list(TLE_SOURCES.keys()), key="constellation_select")
+
+@st.cache_resource
+def get_tle_catalog():
+    return TLECatalog()
+
 if st.sidebar.button("Load TLEs for " + selected_constellation, key="load_tle"):
-    def fetch_tle_from_url(url):
-        response = requests.get(url)
-        if response.status_code == 200:
-            lines = response.text.strip().splitlines()
-            satellites = []
-            # Assume TLE file is in groups of 3 lines: name, TLE line 1, TLE line 2
-            for i in range(0, len(lines), 3):
-                if i + 2 < len(lines):
-                    name = lines[i].strip()
-                    tle1 = lines[i+1].strip()
-                    tle2 = lines[i+2].strip()
-                    satellites.append({"name": name, "tle1": tle1, "tle2": tle2})
-            return satellites
-        else:
-            return []
-    fetched_satellites = fetch_tle_from_url(TLE_SOURCES[selected_constellation])
+    tle_profiler = Profiler()
+    with tle_profiler.activate():
+        fetched_satellites = get_tle_catalog().load(TLE_SOURCES[selected_constellation])
+    st.session_state.tle_profile = tle_profiler.to_dict()
     if fetched_satellites:
-        st.session_state.satellites.extend(fetched_satellites)
+        st.session_state.satellites = merge_satellites(st.session_state.satellites, fetched_satellites)
         st.sidebar.success(f"Loaded {len(fetched_satellites)} satellites from {selected_constellation}")
     else:
         st.sidebar.error("Failed to load TLEs for " + selected_constellation)
@@ -116,13 +138,45 @@ if not st.session_state.satellites:
         {"name": "NUSAT-29 (EDITH CLARKE)", "tle1": "1 52764U 22057AJ  25063.25002839  .00046176  00000-0  97283-3 0  9991", "tle2": "2 52764  97.4726 191.4589 0006861 191.1837 168.9261 15.45099026154632"}
     ])
 
+# Runs longer than this are streamed in time chunks; only access windows and
+# a decimated track preview are kept, and target edits trigger a new run
+IN_MEMORY_MAX_MINUTES = 1440
+MAX_DURATION_MINUTES = 30 * 1440
+
+# How often the page polls a running simulation job
+JOB_POLL_SECONDS = 1.0
+
+# Longest list of captured or unassigned targets written to the page; the rest are only counted
+MAX_LISTED_TARGETS = 100
+
 # ------------------------------------------------
 # Sidebar: Simulation Parameters
 # ------------------------------------------------
 st.sidebar.header("Simulation Parameters")
-duration_minutes = st.sidebar.number_input("Duration (minutes)", min_value=10, max_value=240, value=240, step=10, key="duration")
+duration_minutes = st.sidebar.number_input("Duration (minutes)", min_value=10, max_value=MAX_DURATION_MINUTES, value=240, step=10, key="duration")
 step_seconds = st.sidebar.number_input("Time Step (seconds)", min_value=10, max_value=600, value=60, step=10, key="step_seconds")
 swath_radius_km = st.sidebar.number_input("Swath Radius (km)", min_value=10, max_value=200, value=75, step=5, key="swath_radius")
+scheduling_mode = st.sidebar.selectbox("Scheduling Mode", list(SCHEDULING_MODES), key="scheduling_mode")
+min_gap_seconds = st.sidebar.number_input("Min Gap Between Captures (seconds)", min_value=0, max_value=3600, value=0, step=10, key="min_gap_seconds")
+worker_count = st.sidebar.number_input("Worker Processes", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1, step=1, key="worker_count")
+profile_capture = st.sidebar.selectbox("Profiler Capture", ["Off"] + list(CAPTURE_MODES), key="profile_capture")
+
+# ------------------------------------------------
+# Sidebar: Sensor Model
+# ------------------------------------------------
+st.sidebar.header("Sensor Model")
+use_sensor = st.sidebar.checkbox("Use Sensor Geometry (replaces Swath Radius)", value=False, key="use_sensor")
+sensor = None
+if use_sensor:
+    max_off_nadir_deg = st.sidebar.number_input("Max Off-Nadir (deg)", min_value=1.0, max_value=60.0, value=30.0, step=1.0, key="max_off_nadir")
+    min_target_elevation_deg = st.sidebar.number_input("Min Elevation at Target (deg, 0 = off)", min_value=0.0, max_value=89.0, value=0.0, step=1.0, key="min_target_elevation")
+    daylight_only = st.sidebar.checkbox("Daylight Only", value=True, key="daylight_only")
+    min_sun_elevation_deg = st.sidebar.number_input("Min Sun Elevation (deg)", min_value=-18.0, max_value=60.0, value=10.0, step=1.0, key="min_sun_elevation", disabled=not daylight_only)
+    sensor = SensorModel(
+        max_off_nadir_deg,
+        min_target_elevation_deg or None,
+        min_sun_elevation_deg if daylight_only else None
+    )
 
 # ------------------------------------------------
 # Sidebar: Custom Target Input
@@ -170,6 +224,30 @@ if st.session_state.my_location:
 else:
     st.sidebar.warning("Location not available.")
 
+# ------------------------------------------------
+# Sidebar: Ground Station Passes
+# ------------------------------------------------
+st.sidebar.header("Ground Station Passes")
+location = st.session_state.my_location or {}
+station_lat = st.sidebar.number_input("Station Latitude", min_value=-90.0, max_value=90.0, value=float(location.get("latitude") or 0.0), format="%.4f", key="station_lat")
+station_lon = st.sidebar.number_input("Station Longitude", min_value=-180.0, max_value=180.0, value=float(location.get("longitude") or 0.0), format="%.4f", key="station_lon")
+station_alt_m = st.sidebar.number_input("Station Altitude (m)", min_value=-500.0, max_value=9000.0, value=float(location.get("altitude") or 0.0), step=10.0, key="station_alt")
+pass_hours = st.sidebar.number_input("Pass Horizon (hours)", min_value=1, max_value=24 * 14, value=24, step=1, key="pass_hours")
+min_elevation_deg = st.sidebar.number_input("Min Elevation (deg)", min_value=0.0, max_value=89.0, value=10.0, step=1.0, key="min_elevation")
+if st.sidebar.button("Predict Passes", key="predict_passes"):
+    pass_profiler = Profiler()
+    with pass_profiler.activate():
+        passes = predict_passes(
+            st.session_state.satellites, station_lat, station_lon, station_alt_m / 1000.0,
+            duration_minutes=pass_hours * 60, min_elevation_deg=min_elevation_deg
+        )
+    st.session_state.passes = {
+        "names": [sat["name"] for sat in st.session_state.satellites],
+        "passes": passes,
+        "site": (station_lat, station_lon),
+        "seconds": pass_profiler.stages.get("passes", {}).get("seconds", 0.0),
+    }
+
 if st.session_state.custom_targets:
     st.sidebar.markdown("### Custom Targets:")
     for idx, target in enumerate(st.session_state.custom_targets, start=1):
@@ -177,11 +255,43 @@ if st.session_state.custom_targets:
     if st.sidebar.button("Clear Custom Targets", key="clear_targets"):
         st.session_state.custom_targets = []
 
-# Use custom targets if provided; otherwise, use the default target list
-if st.session_state.custom_targets:
+# ------------------------------------------------
+# Sidebar: Bulk Target Import
+# ------------------------------------------------
+st.sidebar.header("Bulk Target Import")
+target_file = st.sidebar.file_uploader(
+    "Targets File (CSV, GeoJSON or .npy)", type=["csv", "geojson", "json", "npy"], key="target_file"
+)
+dedup_km = st.sidebar.number_input("Merge Targets Within (km)", min_value=0.0, max_value=50.0, value=DEFAULT_DEDUP_KM, step=0.5, key="dedup_km")
+if target_file is not None and st.sidebar.button("Import Targets", key="import_targets"):
+    try:
+        imported = TargetStore.load(target_file.name, target_file)
+    except ValueError as e:
+        st.sidebar.error(f"Could not read {target_file.name}: {e}")
+    else:
+        if dedup_km > 0:
+            imported = imported.dedup(dedup_km)
+        st.session_state.imported_targets = imported
+        st.sidebar.success(f"Imported {len(imported)} targets from {target_file.name}")
+if st.session_state.imported_targets is not None:
+    st.sidebar.write(f"Imported targets: {len(st.session_state.imported_targets)}")
+    if st.sidebar.button("Clear Imported Targets", key="clear_imported"):
+        st.session_state.imported_targets = None
+
+@st.cache_data
+def default_targets(tolerance_km):
+    # The built-in list repeats a few cities with slightly different coordinates
+    return TargetStore.from_tuples(TARGETS).dedup(tolerance_km).tolist() if tolerance_km > 0 else list(TARGETS)
+
+# Use imported and custom targets if provided; otherwise, use the default target list
+if st.session_state.imported_targets is not None:
+    targets = st.session_state.imported_targets
+    if st.session_state.custom_targets:
+        targets = TargetStore.concatenate([targets, TargetStore.from_tuples(st.session_state.custom_targets)])
+elif st.session_state.custom_targets:
     targets = st.session_state.custom_targets
 else:
-    targets = DEFAULT_TARGETS
+    targets = default_targets(dedup_km)
 
 # ------------------------------------------------
 # Sidebar: Run Simulation Button
@@ -189,6 +299,16 @@ else:
 if st.sidebar.button("Run Simulation", key="run_simulation"):
     st.session_state.simulation_run = True
     st.session_state.sidebar_hidden = True
+    # Recompute, but keep a job that is already running for the same inputs;
+    # a cancelled or failed job is dropped so the run starts over
+    st.session_state.simulation = None
+    st.session_state.simulation_key = None
+    if st.session_state.job is not None and st.session_state.job.abandoned:
+        st.session_state.job = None
+    # The time grid starts at the minute of the click and stays fixed across reruns,
+    # so parameter and target edits keep hitting the propagation cache
+    if st.session_state.job is None:
+        st.session_state.simulation_start = grid_start(load.timescale())
 
 # ------------------------------------------------
 # Toggle Sidebar Visibility Buttons (Main Page)
@@ -221,41 +341,192 @@ if st.session_state.sidebar_hidden:
 # ------------------------------------------------
 # Run Simulation and Display Output
 # ------------------------------------------------
-if st.session_state.get("simulation_run", False):
+def render_map(simulation, targets):
+    # Rendered once to PNG so that polling reruns can redisplay it without replotting
+    fig = plot_ground_tracks(GroundTrack.from_simulation(simulation), targets)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+def show_results(simulation, schedule, targets, image=None):
+    with stage("display"):
+        if image is not None:
+            st.image(image)
+        else:
+            fig = plot_ground_tracks(GroundTrack.from_simulation(simulation), targets)
+            st.pyplot(fig)
+            plt.close(fig)
+    st.write("### Captured Targets:")
+    for name, captured in zip(simulation["names"], schedule["tasks"]):
+        st.write(f"**{name}** ({len(captured)}):")
+        if captured:
+            st.write("\n".join(
+                f"- Target at {cap['target']} captured at {cap['time']}" for cap in captured[:MAX_LISTED_TARGETS]
+            ))
+            if len(captured) > MAX_LISTED_TARGETS:
+                st.write(f"... and {len(captured) - MAX_LISTED_TARGETS} more")
+        else:
+            st.write("No targets captured during this pass.")
+    unassigned = schedule["unassigned"]
+    if unassigned:
+        st.write(f"### Unassigned Targets ({len(unassigned)}):")
+        listed = ", ".join(str(target) for target in unassigned[:MAX_LISTED_TARGETS])
+        if len(unassigned) > MAX_LISTED_TARGETS:
+            listed += f", ... and {len(unassigned) - MAX_LISTED_TARGETS} more"
+        st.write(listed)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_job_progress():
+    # Polls the background job without rerunning the whole script
+    job = st.session_state.job
+    if job is None:
+        return
+    if job.finished:
+        st.rerun()
     st.write("Running simulation...")
-    sat_data_list = []
-    captured_info = []
+    st.progress(job.done / job.total if job.total else 0.0, text=f"{job.done} / {job.total or '?'} chunks")
+    if st.button("Cancel Simulation", key="cancel_simulation"):
+        job.cancel()
+    # Partial results only change when another chunk completes
+    preview = st.session_state.job_preview
+    if preview is None or preview["job"] is not job or preview["done"] != job.done:
+        done = job.done
+        partial = job.partial()
+        preview = {"job": job, "done": done, "partial": partial}
+        if partial is not None:
+            preview["schedule"] = global_schedule(
+                partial["windows"], job.targets, len(partial["names"]), scheduling_mode, min_gap_seconds
+            )
+            preview["image"] = render_map(partial, job.targets)
+        st.session_state.job_preview = preview
+    partial = preview["partial"]
+    if partial is not None:
+        st.write(f"Partial results for {len(partial['names'])} of {len(job.names)} satellites:")
+        show_results(partial, preview["schedule"], job.targets, preview["image"])
+
+if st.session_state.get("simulation_run", False):
+    # Stage timings of this rerun, plus the most recent TLE load
+    profiler = Profiler(None if profile_capture == "Off" else profile_capture)
+    if st.session_state.tle_profile:
+        profiler.merge(st.session_state.tle_profile)
     try:
-        for sat in st.session_state.satellites:
-            path, left_edge, right_edge = get_satellite_path_with_edges(
-                sat["tle1"],
-                sat["tle2"],
-                sat["name"],
+        with profiler.activate():
+            # Reuse the tracks and per-target windows while the satellites and
+            # simulation parameters are unchanged; only target edits are applied
+            streamed = duration_minutes > IN_MEMORY_MAX_MINUTES
+            # Windows of streamed and sensor-model runs cannot be extended incrementally, so target edits rerun them
+            incremental = not streamed and sensor is None
+            start = st.session_state.simulation_start
+            simulation_key = (
+                tuple((sat["tle1"], sat["tle2"]) for sat in st.session_state.satellites),
+                start,
                 duration_minutes,
                 step_seconds,
-                swath_radius_km
+                swath_radius_km,
+                sensor.key() if sensor is not None else None,
+                None if incremental else targets_key(targets)
             )
-            captured = greedy_schedule(path, targets, swath_radius_km)
-            captured_info.append({
-                "name": sat["name"],
-                "captured": captured
-            })
-            sat_data_list.append({
-                "name": sat["name"],
-                "path": path,
-                "left_edge": left_edge,
-                "right_edge": right_edge,
-                "captured": captured
-            })
-        fig = plot_multiple_satellites(sat_data_list, targets)
-        st.pyplot(fig)
-        st.write("### Captured Targets:")
-        for info in captured_info:
-            st.write(f"**{info['name']}**:")
-            if info["captured"]:
-                for cap in info["captured"]:
-                    st.write(f"Target at {cap['target']} captured at {cap['time']}")
+            job = st.session_state.job
+            if st.session_state.simulation_key != simulation_key and (job is None or job.key != simulation_key):
+                # Inputs changed: drop any job that is still computing the old ones
+                if job is not None:
+                    job.cancel()
+                if streamed:
+                    job = SimulationJob(
+                        st.session_state.satellites, targets, simulation_key, run_streaming,
+                        capture=profiler.capture, duration_minutes=duration_minutes, step_seconds=step_seconds,
+                        swath_radius_km=swath_radius_km, mode=scheduling_mode, min_gap_seconds=min_gap_seconds,
+                        start=start, sensor=sensor
+                    )
+                else:
+                    job = SimulationJob(
+                        st.session_state.satellites, targets, simulation_key, run_simulation,
+                        capture=profiler.capture, duration_minutes=duration_minutes, step_seconds=step_seconds,
+                        swath_radius_km=swath_radius_km, workers=worker_count, mode=scheduling_mode,
+                        min_gap_seconds=min_gap_seconds, cache=default_cache(), start=start, sensor=sensor
+                    )
+                st.session_state.job = job.start()
+
+            if job is not None and job.key == simulation_key and job.status == "done":
+                st.session_state.simulation = job.result
+                st.session_state.simulation_key = simulation_key
+                st.session_state.planner = IncrementalScheduler.from_simulation(
+                    job.result, job.targets, swath_radius_km
+                ) if incremental else None
+                profiler.merge(job.profiler.to_dict())
+                if job.profiler.profile_text:
+                    profiler.profile_text = job.profiler.profile_text
+                st.session_state.job = None
+                st.session_state.job_preview = None
+
+            if st.session_state.simulation_key == simulation_key:
+                planner = st.session_state.planner
+                simulation = st.session_state.simulation
+                if planner is not None:
+                    planner.sync(targets)
+                    schedule = planner.schedule(scheduling_mode, min_gap_seconds)
+                else:
+                    schedule = global_schedule(
+                        simulation["windows"], targets, len(simulation["names"]), scheduling_mode, min_gap_seconds
+                    )
+                show_results(simulation, schedule, targets)
+            elif job.status == "cancelled":
+                st.warning("Simulation cancelled.")
+            elif job.status == "failed":
+                st.error(f"Error during simulation: {job.error}")
             else:
-                st.write("No targets captured during this pass.")
+                show_job_progress()
     except Exception as e:
         st.error(f"Error during simulation: {e}")
+
+    with st.expander("Performance"):
+        if profiler.stages:
+            st.table(profiler.rows())
+        if profiler.counters:
+            st.table([{"counter": name, "value": value} for name, value in sorted(profiler.counters.items())])
+        if profiler.profile_text:
+            st.code(profiler.profile_text)
+        st.download_button(
+            "Download Performance Log (JSON)",
+            profiler.to_json(satellites=len(st.session_state.satellites), targets=len(targets)),
+            file_name="performance.json",
+            mime="application/json",
+            key="download_performance"
+        )
+    # Append every run to a JSON Lines log for external monitoring
+    if os.environ.get("PERFORMANCE_LOG"):
+        profiler.export(os.environ["PERFORMANCE_LOG"], satellites=len(st.session_state.satellites), targets=len(targets))
+
+# ------------------------------------------------
+# Ground Station Passes
+# ------------------------------------------------
+def format_time(epoch):
+    if epoch != epoch:
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+if st.session_state.passes is not None:
+    predicted = st.session_state.passes
+    table = passes_table(predicted["names"], predicted["passes"])
+    st.write(
+        f"### Passes over ({predicted['site'][0]:.4f}, {predicted['site'][1]:.4f}): "
+        f"{len(table['satellite'])} passes, computed in {predicted['seconds']:.2f} s"
+    )
+    # st.dataframe columns can be sorted by clicking their headers
+    st.dataframe(
+        {
+            "Satellite": table["satellite"].tolist(),
+            "Rise (UTC)": [format_time(e) for e in table["rise"].tolist()],
+            "Rise Az (deg)": table["rise_azimuth"].round(1),
+            "Culmination (UTC)": [format_time(e) for e in table["culmination"].tolist()],
+            "Max Elevation (deg)": table["max_elevation"].round(1),
+            "Culmination Az (deg)": table["culmination_azimuth"].round(1),
+            "Set (UTC)": [format_time(e) for e in table["set"].tolist()],
+            "Set Az (deg)": table["set_azimuth"].round(1),
+            "Duration (s)": (table["set"] - table["rise"]).round(0),
+        },
+        width="stretch",
+        hide_index=True,
+        key="passes_table",
+    )
@@ -0,0 +1,350 @@
+# benchmark.py
+"""
+Reproducible benchmarks of the planning pipeline stages.
+
+Runs offline from the TLE fixtures in fixtures/, on a fixed start time, and
+writes wall time, peak memory and a per-stage breakdown as JSON. The
+original per-satellite API (list-of-dicts paths, greedy_schedule and
+plot_multiple_satellites) is timed alongside the pipeline, so regressions in
+the compatibility wrappers show up too.
+
+Examples:
+    python benchmark.py run --suite quick --output base.json
+    python benchmark.py run --suite full --output new.json
+    python benchmark.py compare base.json new.json --threshold 0.15
+"""
+import argparse
+from datetime import datetime, timezone
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from skyfield.api import load
+import numpy as np
+
+from access import access_windows
+from constellation import propagate_constellation_at
+from ground_track import GroundTrack
+from satellite import get_satellite_path, get_satellite_path_with_edges, time_grid
+from scheduler import global_schedule, greedy_schedule
+from swath import swath_edges
+from target_index import TargetIndex
+from target_list import TARGETS
+from tle_catalog import parse_tle_text, tle_checksum
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "nusat.tle")
+
+# Shortly after the fixture epochs, so SGP4 results do not depend on the day the benchmark runs
+START = datetime(2025, 3, 4, 12, 0, tzinfo=timezone.utc)
+
+BASELINE = {'satellites': 10, 'steps': 90, 'targets': None}
+
+# Stages of the original per-satellite API; reported, but not part of a scenario's total
+LEGACY_STAGES = ('get_satellite_path', 'get_satellite_path_with_edges', 'greedy_schedule', 'plot_multiple_satellites')
+
+# greedy_schedule compares every path point with every target in Python, so
+# scenarios above this many comparisons skip it
+LEGACY_MAX_DISTANCE_EVALUATIONS = 2_000_000
+
+# Each suite varies one dimension at a time from BASELINE; targets=None means target_list.TARGETS
+SUITES = {
+    'quick': {
+        'satellites': [1, 10, 100],
+        'steps': [90, 1000],
+        'targets': [None, 10_000],
+    },
+    'full': {
+        'satellites': [1, 10, 100, 1000],
+        'steps': [90, 1000, 10_000],
+        'targets': [None, 10_000, 100_000, 1_000_000],
+    },
+}
+
+def fixture_satellites(count, path=FIXTURE_PATH):
+    """
+    Returns count satellites derived from the bundled TLE fixtures.
+
+    Beyond the fixtures themselves, element sets are cloned with the RAAN and
+    mean anomaly spread evenly (and new catalog numbers), which gives a
+    deterministic constellation of any size without network access.
+
+    Returns:
+        List[dict]: Each dict contains 'name', 'tle1' and 'tle2'.
+    """
+    with open(path, encoding="utf-8") as f:
+        base = parse_tle_text(f.read())
+    satellites = [{'name': sat['name'], 'tle1': sat['tle1'], 'tle2': sat['tle2']} for sat in base[:count]]
+    for i in range(len(satellites), count):
+        sat = base[i % len(base)]
+        catalog = f"{90000 + i:05d}"
+        raan = (float(sat['tle2'][17:25]) + 360.0 * i / count) % 360.0
+        anomaly = (float(sat['tle2'][43:51]) + 137.508 * i) % 360.0
+        tle1 = sat['tle1'][:2] + catalog + sat['tle1'][7:68]
+        tle2 = sat['tle2'][:2] + catalog + sat['tle2'][7:17] + f"{raan:8.4f}" + sat['tle2'][25:43] + f"{anomaly:8.4f}" + sat['tle2'][51:68]
+        satellites.append({
+            'name': f"BENCH-{i:04d}",
+            'tle1': tle1 + str(tle_checksum(tle1)),
+            'tle2': tle2 + str(tle_checksum(tle2)),
+        })
+    return satellites
+
+def synthetic_targets(count, seed=0):
+    """
+    Returns count targets spread uniformly over the sphere, or target_list.TARGETS for None.
+    """
+    if count is None:
+        return list(TARGETS)
+    rng = np.random.default_rng(seed)
+    lat = np.degrees(np.arcsin(rng.uniform(-1.0, 1.0, count)))
+    lon = rng.uniform(-180.0, 180.0, count)
+    return list(zip(lat.tolist(), lon.tolist()))
+
+def scenarios(suite):
+    """
+    Expands a suite into scenario parameter dicts, without duplicates.
+    """
+    seen = []
+    for dimension, values in SUITES[suite].items():
+        for value in values:
+            params = dict(BASELINE, **{dimension: value})
+            if params not in seen:
+                seen.append(params)
+    return seen
+
+def _measure(function, memory):
+    gc.collect()
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def _render(plot, *args):
+    # Imported here so benchmarks without rendering never load matplotlib
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import visualizer
+
+    fig = getattr(visualizer, plot)(*args)
+    fig.savefig(io.BytesIO(), format="png")
+    plt.close(fig)
+
+def _legacy_data(satellites, state):
+    # The list-of-dicts input of visualizer.plot_multiple_satellites
+    captured = state.get('captured') or [[] for _ in satellites]
+    return [
+        {'name': sat['name'], 'path': path, 'left_edge': left, 'right_edge': right, 'captured': captures}
+        for sat, (path, left, right), captures in zip(satellites, state['legacy'], captured)
+    ]
+
+def render_available():
+    """
+    Draws the basemap ahead of the timed runs; returns False if it cannot be
+    drawn (cartopy downloads Natural Earth data on first use).
+    """
+    try:
+        from visualizer import _basemap
+        # The basemap is drawn once per process in the app, so keep it out of the timings
+        _basemap(1800, 900)
+    except Exception as e:
+        print(f"Skipping render stage: {e}", file=sys.stderr)
+        return False
+    return True
+
+def run_scenario(params, swath_radius_km=75, render=True, memory=True, legacy=True):
+    """
+    Runs every pipeline stage once for one scenario.
+
+    Wall times come from a pass without tracemalloc (it slows Python
+    allocations); with memory=True a second pass records each stage's peak
+    traced allocation. With legacy=True the LEGACY_STAGES run as well, one
+    call per satellite as the original app made them.
+
+    Returns:
+        dict: 'params', 'wall_s', 'peak_mb' and 'stages', mapping each stage
+            to its 'wall_s' and 'peak_mb'. 'wall_s' and 'peak_mb' cover the
+            pipeline stages only.
+    """
+    satellites = fixture_satellites(params['satellites'])
+    targets = synthetic_targets(params['targets'])
+    ts = load.timescale()
+    t_array, epoch = time_grid(ts, params['steps'], 60, START)
+
+    passes = [False, True] if memory else [False]
+    stages = {}
+    for traced in passes:
+        state = {}
+        steps = [
+            ('propagate', lambda: state.update(constellation=propagate_constellation_at(satellites, t_array, epoch))),
+            ('swath_edges', lambda: state.update(edges=swath_edges(
+                state['constellation']['lat'], state['constellation']['lon'], swath_radius_km))),
+            ('target_index', lambda: state.update(index=TargetIndex(targets))),
+            ('access_windows', lambda: state.update(windows=access_windows(
+                state['constellation'], targets, swath_radius_km, state['index']))),
+            ('schedule', lambda: state.update(schedule=global_schedule(state['windows'], targets, len(satellites)))),
+        ]
+        if render:
+            steps.append(('render', lambda: _render('plot_ground_tracks', GroundTrack.from_simulation(dict(
+                state['constellation'], **dict(zip(('left_lat', 'left_lon', 'right_lat', 'right_lon'), state['edges']))
+            )), targets)))
+        if legacy:
+            steps += [
+                ('get_satellite_path', lambda: state.update(paths=[
+                    get_satellite_path(sat['tle1'], sat['tle2'], sat['name'], params['steps'], 60, START)
+                    for sat in satellites
+                ])),
+                ('get_satellite_path_with_edges', lambda: state.update(legacy=[
+                    get_satellite_path_with_edges(
+                        sat['tle1'], sat['tle2'], sat['name'], params['steps'], 60, swath_radius_km, START
+                    )
+                    for sat in satellites
+                ])),
+            ]
+            if len(satellites) * params['steps'] * len(targets) <= LEGACY_MAX_DISTANCE_EVALUATIONS:
+                steps.append(('greedy_schedule', lambda: state.update(captured=[
+                    greedy_schedule(path, targets, swath_radius_km) for path, _, _ in state['legacy']
+                ])))
+            if render:
+                steps.append(('plot_multiple_satellites', lambda: _render(
+                    'plot_multiple_satellites', _legacy_data(satellites, state), targets
+                )))
+        for stage, function in steps:
+            _, elapsed, peak = _measure(function, traced)
+            entry = stages.setdefault(stage, {})
+            if traced:
+                entry['peak_mb'] = peak / 2 ** 20
+            else:
+                entry['wall_s'] = elapsed
+    pipeline = [entry for stage, entry in stages.items() if stage not in LEGACY_STAGES]
+    result = {
+        'params': params,
+        'wall_s': sum(entry['wall_s'] for entry in pipeline),
+        'stages': stages,
+    }
+    if memory:
+        result['peak_mb'] = max(entry['peak_mb'] for entry in pipeline)
+    return result
+
+def scenario_name(params):
+    targets = 'TARGETS' if params['targets'] is None else params['targets']
+    return f"sats={params['satellites']} steps={params['steps']} targets={targets}"
+
+def run_suite(suite, repeat=1, render=True, memory=True, log=print, legacy=True):
+    """
+    Runs every scenario of a suite, keeping the fastest of repeat runs.
+
+    Returns:
+        dict: 'meta' (environment) and 'results' (see run_scenario, plus 'name').
+    """
+    render = render and render_available()
+    results = []
+    for params in scenarios(suite):
+        runs = [run_scenario(params, render=render, memory=memory and i == 0, legacy=legacy) for i in range(repeat)]
+        best = min(runs, key=lambda run: run['wall_s'])
+        if memory:
+            best['peak_mb'] = runs[0]['peak_mb']
+            for stage, entry in best['stages'].items():
+                entry['peak_mb'] = runs[0]['stages'][stage]['peak_mb']
+        best['name'] = scenario_name(params)
+        results.append(best)
+        log(f"{best['name']}: {best['wall_s']:.3f} s"
+            + (f", peak {best['peak_mb']:.1f} MB" if memory else ""))
+    return {
+        'meta': {
+            'suite': suite,
+            'repeat': repeat,
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+def compare(base, new, threshold=0.1, min_seconds=0.01):
+    """
+    Compares two benchmark reports scenario by scenario.
+
+    A stage regresses when its wall time grows by more than threshold
+    (relative) and it takes at least min_seconds, so timer noise on tiny
+    stages is ignored.
+
+    Returns:
+        tuple: (rows, regressions) where rows are (scenario, stage, base_s,
+            new_s, ratio) for every stage present in both reports.
+    """
+    base_results = {result['name']: result for result in base['results']}
+    rows = []
+    regressions = []
+    for result in new['results']:
+        previous = base_results.get(result['name'])
+        if previous is None:
+            continue
+        entries = [('total', previous['wall_s'], result['wall_s'])]
+        entries += [
+            (stage, previous['stages'][stage]['wall_s'], entry['wall_s'])
+            for stage, entry in result['stages'].items() if stage in previous['stages']
+        ]
+        for stage, before, after in entries:
+            ratio = after / before if before > 0 else float('inf')
+            row = (result['name'], stage, before, after, ratio)
+            rows.append(row)
+            if after >= min_seconds and ratio > 1 + threshold:
+                regressions.append(row)
+    return rows, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the satellite planning pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run a benchmark suite")
+    run.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    run.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the fastest is kept")
+    run.add_argument("--output", help="JSON report path (default: stdout)")
+    run.add_argument("--no-render", action="store_true", help="Skip the rendering stage")
+    run.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    run.add_argument("--no-legacy", action="store_true", help="Skip the original per-satellite API stages")
+    diff = commands.add_parser("compare", help="Compare two JSON reports")
+    diff.add_argument("base")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown (default: 0.1)")
+    diff.add_argument("--min-seconds", type=float, default=0.01, help="Ignore stages faster than this")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_suite(args.suite, args.repeat, not args.no_render, not args.no_memory,
+                           log=lambda line: print(line, file=sys.stderr), legacy=not args.no_legacy)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    rows, regressions = compare(base, new, args.threshold, args.min_seconds)
+    for name, stage, before, after, ratio in rows:
+        flag = "  REGRESSION" if (name, stage, before, after, ratio) in regressions else ""
+        print(f"{name:<40} {stage:<15} {before:9.4f} s -> {after:9.4f} s  x{ratio:5.2f}{flag}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# cli.py
+"""
+Headless batch runs of the planning pipeline, without Streamlit or cartopy.
+
+Example:
+    python cli.py --tle planet.txt --targets targets.csv --duration 1440 --step 30 --output-dir out
+"""
+import argparse
+import importlib.util
+from datetime import datetime, timezone
+import os
+import sys
+import time
+
+from propagation_cache import PropagationCache
+from scheduler import SCHEDULING_MODES
+from sensor import SensorModel
+from simulation import run_simulation
+from streaming import run_streaming
+from table_io import OUTPUT_FORMATS, captures_table, tracks_table, write_table
+from target_list import TARGETS as DEFAULT_TARGETS
+from target_store import TargetStore
+from tle_catalog import merge_satellites, parse_tle_text
+
+def read_tle_files(paths):
+    """
+    Reads satellites from one or more 2-line or 3-line TLE files.
+
+    Satellites appearing in several files are kept once, with the most recent element set.
+
+    Returns:
+        List[dict]: Each dict contains 'name', 'tle1', 'tle2', 'norad_id' and 'epoch'.
+    """
+    satellites = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            satellites = merge_satellites(satellites, parse_tle_text(f.read()))
+    return satellites
+
+def parse_start(value):
+    """
+    Parses an ISO 8601 start time; naive times are taken as UTC and seconds are dropped.
+    """
+    start = datetime.fromisoformat(value)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    return start.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run satellite propagation, swath edges and capture scheduling headlessly.")
+    parser.add_argument("--tle", action="append", required=True, metavar="FILE",
+                        help="TLE file in 2-line or 3-line format (repeatable)")
+    parser.add_argument("--targets", action="append", metavar="FILE",
+                        help="Target file: CSV with lat/lon[/priority] columns, GeoJSON points or an (N, 2|3) .npy array "
+                             "(repeatable; default: target_list.TARGETS)")
+    parser.add_argument("--dedup-km", type=float, default=None,
+                        help="Merge targets closer than this many km, keeping the highest priority")
+    parser.add_argument("--duration", type=float, default=90, help="Simulation duration in minutes (default: 90)")
+    parser.add_argument("--step", type=float, default=60, help="Time step in seconds (default: 60)")
+    parser.add_argument("--swath", type=float, default=75, help="Swath radius in km (default: 75)")
+    parser.add_argument("--max-off-nadir", type=float, default=None,
+                        help="Use the sensor-geometry capture model with this off-nadir limit in degrees "
+                             "(replaces --swath; default 30 when another sensor limit is given)")
+    parser.add_argument("--min-elevation", type=float, default=None,
+                        help="Sensor model: minimum satellite elevation seen from the target in degrees")
+    parser.add_argument("--min-sun-elevation", type=float, default=None,
+                        help="Sensor model: minimum solar elevation at the target in degrees")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--mode", choices=SCHEDULING_MODES, default='earliest', help="Scheduling mode")
+    parser.add_argument("--min-gap", type=float, default=0.0, help="Minimum seconds between captures of one satellite")
+    parser.add_argument("--max-tasks", type=int, default=None, help="Maximum captures per satellite")
+    parser.add_argument("--start", type=parse_start, default=None, help="UTC start time, ISO 8601 (default: now)")
+    parser.add_argument("--output-dir", default=".", help="Directory for the output files (default: current directory)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default='csv', help="Output format (default: csv)")
+    parser.add_argument("--no-tracks", action="store_true", help="Only write captures, not the per-step tracks")
+    parser.add_argument("--cache-dir", default=None, help="Directory for the on-disk propagation cache")
+    parser.add_argument("--chunk-minutes", type=float, default=None,
+                        help="Stream the run in time chunks of this length, writing results as they complete "
+                             "(bounded memory for multi-day horizons)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        print("Parquet output requires pyarrow; install it or use --format csv", file=sys.stderr)
+        return 2
+    satellites = read_tle_files(args.tle)
+    if not satellites:
+        print("No valid TLEs found in " + ", ".join(args.tle), file=sys.stderr)
+        return 1
+    if args.targets:
+        targets = TargetStore.concatenate(TargetStore.load(path) for path in args.targets)
+    else:
+        targets = TargetStore.from_tuples(DEFAULT_TARGETS)
+    if args.dedup_km is not None:
+        before = len(targets)
+        targets = targets.dedup(args.dedup_km)
+        print(f"Merged {before - len(targets)} targets within {args.dedup_km:g} km")
+    cache = PropagationCache(disk_dir=args.cache_dir) if args.cache_dir else None
+    sensor = None
+    if (args.max_off_nadir, args.min_elevation, args.min_sun_elevation) != (None, None, None):
+        sensor = SensorModel(
+            args.max_off_nadir if args.max_off_nadir is not None else 30.0,
+            args.min_elevation, args.min_sun_elevation
+        )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    started = time.perf_counter()
+    if args.chunk_minutes is not None:
+        simulation = run_streaming(
+            satellites, targets, args.duration, args.step, args.swath, args.chunk_minutes,
+            mode=args.mode, min_gap_seconds=args.min_gap, max_tasks_per_satellite=args.max_tasks,
+            start=args.start, output_dir=args.output_dir, fmt=args.format, write_tracks=not args.no_tracks,
+            sensor=sensor
+        )
+        elapsed = time.perf_counter() - started
+        print(f"Wrote streamed results to {args.output_dir}")
+        _print_summary(satellites, targets, simulation, elapsed)
+        return 0
+
+    simulation = run_simulation(
+        satellites, targets, args.duration, args.step, args.swath,
+        workers=args.workers, mode=args.mode, min_gap_seconds=args.min_gap,
+        max_tasks_per_satellite=args.max_tasks, cache=cache, start=args.start, sensor=sensor
+    )
+    elapsed = time.perf_counter() - started
+
+    outputs = [('captures', captures_table(simulation['names'], simulation['schedule']['tasks']))]
+    if not args.no_tracks:
+        outputs.append(('tracks', tracks_table(simulation['names'], simulation['epoch'], simulation)))
+    for name, table in outputs:
+        path = os.path.join(args.output_dir, f"{name}.{args.format}")
+        write_table(table, path, args.format)
+        print(f"Wrote {len(next(iter(table.values())))} rows to {path}")
+
+    _print_summary(satellites, targets, simulation, elapsed)
+    return 0
+
+def _print_summary(satellites, targets, simulation, elapsed):
+    captured = sum(len(tasks) for tasks in simulation['schedule']['tasks'])
+    print(f"{len(satellites)} satellites, {len(targets)} targets: {captured} captured, "
+          f"{len(simulation['schedule']['unassigned'])} unassigned in {elapsed:.1f} s")
+
+if __name__ == "__main__":
+    sys.exit(main())
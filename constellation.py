@@ -0,0 +1,196 @@
+# constellation.py
+from skyfield.api import load
+from skyfield.sgp4lib import theta_GMST1982
+from sgp4.api import Satrec, SatrecArray
+import numpy as np
+
+from instrumentation import count, timed
+from satellite import time_grid
+from swath import WGS84_A_KM, WGS84_F
+
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+# Julian date of the POSIX epoch (1970-01-01T00:00:00 UTC)
+JD_UNIX_EPOCH = 2440587.5
+
+def ecef_to_geodetic(x, y, z, iterations=3):
+    """
+    Converts Earth-fixed cartesian coordinates to WGS84 geodetic coordinates.
+
+    Args:
+        x, y, z (np.ndarray): Earth-fixed coordinates in km (any matching shape).
+        iterations (int): Fixed-point iterations for the latitude; three are
+            enough for sub-millimetre accuracy at LEO altitudes.
+
+    Returns:
+        tuple: (lat, lon, alt_km) arrays, with lat/lon in degrees.
+    """
+    lon = np.arctan2(y, x)
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - WGS84_E2))
+    for _ in range(iterations):
+        sin_lat = np.sin(lat)
+        n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * sin_lat ** 2)
+        lat = np.arctan2(z + WGS84_E2 * n * sin_lat, p)
+    sin_lat = np.sin(lat)
+    n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * sin_lat ** 2)
+    alt = p * np.cos(lat) + z * sin_lat - n * (1 - WGS84_E2 * sin_lat ** 2)
+    return np.degrees(lat), np.degrees(lon), alt
+
+def geodetic_to_ecef(lat, lon, alt_km=0.0):
+    """
+    Converts WGS84 geodetic coordinates to Earth-fixed cartesian coordinates.
+
+    Args:
+        lat, lon (np.ndarray): Coordinates in degrees (any matching shape).
+        alt_km (np.ndarray): Height above the ellipsoid in km.
+
+    Returns:
+        tuple: (x, y, z) arrays in km.
+    """
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    sin_lat = np.sin(lat)
+    n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * sin_lat ** 2)
+    r = (n + alt_km) * np.cos(lat)
+    return r * np.cos(lon), r * np.sin(lon), (n * (1 - WGS84_E2) + alt_km) * sin_lat
+
+def teme_to_ecef(r_teme, ut1_whole, ut1_fraction):
+    """
+    Rotates TEME positions into the Earth-fixed frame (polar motion neglected).
+
+    Args:
+        r_teme (np.ndarray): Positions (..., 3) as returned by SGP4.
+        ut1_whole, ut1_fraction (np.ndarray): UT1 Julian date split, broadcastable
+            against r_teme[..., 0].
+
+    Returns:
+        tuple: (x, y, z) arrays in km.
+    """
+    theta, _ = theta_GMST1982(np.atleast_1d(ut1_whole), np.atleast_1d(ut1_fraction))
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    x = cos_t * r_teme[..., 0] + sin_t * r_teme[..., 1]
+    y = -sin_t * r_teme[..., 0] + cos_t * r_teme[..., 1]
+    return x, y, r_teme[..., 2]
+
+def posix_to_time(ts, epoch):
+    """
+    Converts POSIX seconds to a skyfield Time.
+
+    POSIX time has no leap seconds, so the date and the time of day are
+    passed separately rather than as seconds since 1970.
+    """
+    day, seconds = divmod(np.asarray(epoch, dtype=np.float64), 86400.0)
+    return ts.utc(1970, 1, 1 + day.astype(np.int64), 0, 0, seconds)
+
+def ut1_offset(ts, epoch):
+    """
+    Returns UT1 - UTC in days at a POSIX time.
+
+    It drifts by well under a millisecond per day, so one value serves a
+    horizon of several days.
+    """
+    return float(posix_to_time(ts, float(epoch)).dut1) / 86400.0
+
+def propagate_pairs(satrecs, sat, epoch, ut1_offset=0.0):
+    """
+    Propagates satellite sat[k] to time epoch[k] for every k.
+
+    Unlike propagate_constellation_at, each satellite is only evaluated at
+    its own times, with one SGP4 array call per satellite.
+
+    Args:
+        satrecs (List[Satrec]): Parsed satellites.
+        sat (np.ndarray): Index into satrecs per sample.
+        epoch (np.ndarray): POSIX seconds per sample.
+        ut1_offset (float): UT1 - UTC in days, see ut1_offset().
+
+    Returns:
+        tuple: (x, y, z) Earth-fixed positions in km, NaN where SGP4 fails.
+    """
+    sat = np.asarray(sat, dtype=np.int64)
+    epoch = np.asarray(epoch, dtype=np.float64)
+    days = JD_UNIX_EPOCH + epoch / 86400.0
+    jd, fr = divmod(days, 1.0)
+    r_teme = np.empty((len(epoch), 3))
+    order = np.argsort(sat, kind='stable')
+    sats, starts = np.unique(sat[order], return_index=True)
+    for s, rows in zip(sats.tolist(), np.split(order, starts[1:])):
+        error, r_teme[rows], _ = satrecs[s].sgp4_array(jd[rows], fr[rows])
+        r_teme[rows[error != 0]] = np.nan
+    count('points_propagated', len(epoch))
+    ut1_jd, ut1_fr = divmod(days + ut1_offset, 1.0)
+    return teme_to_ecef(r_teme, ut1_jd, ut1_fr)
+
+def propagate_constellation(satellites, duration_minutes=90, step_seconds=60, include_altitude=False):
+    """
+    Propagates every satellite over a shared time grid in one SGP4 array call.
+
+    Args:
+        satellites (List[dict]): Each dict contains 'name', 'tle1' and 'tle2'.
+        duration_minutes (int): Total simulation duration in minutes.
+        step_seconds (int): Time interval in seconds for sampling positions.
+        include_altitude (bool): Also return the altitude above the WGS84 ellipsoid.
+
+    Returns:
+        dict: 'names' (list of N names), 'epoch' (T POSIX seconds) and 'lat'/'lon'
+            (N x T arrays in degrees), plus 'alt_km' when include_altitude is True.
+            Samples where SGP4 reports an error are NaN.
+    """
+    ts = load.timescale()
+    t_array, epoch = time_grid(ts, duration_minutes, step_seconds)
+    return propagate_constellation_at(satellites, t_array, epoch, include_altitude)
+
+@timed('propagate')
+def propagate_constellation_at(satellites, t_array, epoch, include_altitude=False):
+    """
+    Propagates every satellite over an existing time grid.
+
+    Args:
+        satellites (List[dict]): Each dict contains 'name', 'tle1' and 'tle2'.
+        t_array (Time): skyfield Time array, used for Earth rotation (UT1).
+        epoch (np.ndarray): POSIX seconds for each element of t_array.
+        include_altitude (bool): Also return the altitude above the WGS84 ellipsoid.
+
+    Returns:
+        dict: Same layout as propagate_constellation.
+    """
+    epoch = np.atleast_1d(np.asarray(epoch, dtype=np.float64))
+    names = [sat['name'] for sat in satellites]
+    if not satellites:
+        empty = np.empty((0, len(epoch)))
+        constellation = {'names': names, 'epoch': epoch, 'lat': empty, 'lon': empty}
+        if include_altitude:
+            constellation['alt_km'] = empty
+        return constellation
+
+    sat_array = SatrecArray([Satrec.twoline2rv(sat['tle1'], sat['tle2']) for sat in satellites])
+    jd, fr = divmod(JD_UNIX_EPOCH + epoch / 86400.0, 1.0)
+    error, r_teme, _ = sat_array.sgp4(jd, fr)
+    count('points_propagated', error.size)
+
+    x, y, z = teme_to_ecef(r_teme, t_array.whole, t_array.ut1_fraction)
+    lat, lon, alt = ecef_to_geodetic(x, y, z)
+    failed = error != 0
+    lat[failed] = np.nan
+    lon[failed] = np.nan
+    constellation = {'names': names, 'epoch': epoch, 'lat': lat, 'lon': lon}
+    if include_altitude:
+        alt[failed] = np.nan
+        constellation['alt_km'] = alt
+    return constellation
+
+def satellite_track(constellation, index):
+    """
+    Extracts one satellite's row from a constellation as a columnar track.
+
+    Returns:
+        dict: 'epoch', 'lat', 'lon' (and 'alt_km' if present), as returned by
+            satellite.get_satellite_track.
+    """
+    track = {'epoch': constellation['epoch']}
+    for key in ('lat', 'lon', 'alt_km'):
+        if key in constellation:
+            track[key] = constellation[key][index]
+    return track
@@ -0,0 +1,207 @@
+# ground_track.py
+from datetime import datetime, timezone
+import numpy as np
+
+from swath import swath_edges
+
+TRACK_COLUMNS = ('lat', 'lon', 'left_lat', 'left_lon', 'right_lat', 'right_lon')
+
+class GroundTrack:
+    """
+    Ground tracks of one or more satellites on a shared time grid.
+
+    Every column is an (N, T) NumPy array (N satellites, T samples) and
+    'epoch' is a float64 (T,) array of POSIX seconds. Edge columns are None
+    until swath edges are computed. Indexing with a column name returns the
+    array itself, so a GroundTrack can be passed wherever a constellation
+    dict is expected (e.g. access.access_windows).
+    Indexing with ints, slices or (satellites, samples) tuples returns a new
+    GroundTrack whose columns are views when NumPy basic slicing allows it.
+    """
+
+    __slots__ = ('names', 'epoch') + TRACK_COLUMNS
+
+    def __init__(self, names, epoch, lat, lon, left_lat=None, left_lon=None, right_lat=None, right_lon=None):
+        """
+        Args:
+            names (List[str]): Satellite names, one per row.
+            epoch (np.ndarray): POSIX seconds of the shared time grid (T,).
+            lat, lon (np.ndarray): Ground track in degrees, (N, T) or (T,) for one satellite.
+            left_lat, left_lon, right_lat, right_lon (np.ndarray): Optional swath edges, same shape.
+        """
+        self.names = list(names)
+        self.epoch = np.asarray(epoch, dtype=np.float64)
+        columns = (lat, lon, left_lat, left_lon, right_lat, right_lon)
+        for key, value in zip(TRACK_COLUMNS, columns):
+            if value is not None:
+                value = np.asarray(value)
+                if value.ndim == 1:
+                    value = value[None, :]
+                if value.shape != (len(self.names), len(self.epoch)):
+                    raise ValueError(f"{key} has shape {value.shape}, expected {(len(self.names), len(self.epoch))}")
+            setattr(self, key, value)
+        if self.lat is None or self.lon is None:
+            raise ValueError("lat and lon are required")
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return f"GroundTrack({len(self.names)} satellites, {len(self.epoch)} samples, edges={self.has_edges})"
+
+    def __contains__(self, key):
+        return key in ('names', 'epoch') or (key in TRACK_COLUMNS and getattr(self, key) is not None)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self:
+                raise KeyError(key)
+            return getattr(self, key)
+        sats, samples = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(sats, (int, np.integer)):
+            sats = slice(sats, sats + 1 if sats != -1 else None)
+        if isinstance(samples, (int, np.integer)):
+            samples = slice(samples, samples + 1 if samples != -1 else None)
+        names = np.arange(len(self.names))[sats]
+        columns = [None if value is None else value[sats][:, samples] for value in self.columns()]
+        return GroundTrack([self.names[i] for i in names.tolist()], self.epoch[samples], *columns)
+
+    @property
+    def has_edges(self):
+        return self.left_lat is not None
+
+    @property
+    def n_samples(self):
+        return len(self.epoch)
+
+    def columns(self):
+        """
+        Returns the track columns in TRACK_COLUMNS order (edges may be None).
+        """
+        return [getattr(self, key) for key in TRACK_COLUMNS]
+
+    def satellite(self, index):
+        """
+        Returns one satellite as a columnar track dict of 1-D views.
+
+        Returns:
+            dict: 'epoch', 'lat', 'lon' (plus the edge columns when present),
+                as used by access.track_access_windows.
+        """
+        track = {'epoch': self.epoch}
+        for key, value in zip(TRACK_COLUMNS, self.columns()):
+            if value is not None:
+                track[key] = value[index]
+        return track
+
+    def with_edges(self, swath_radius_km=75, model='wgs84'):
+        """
+        Returns a GroundTrack sharing this track's arrays plus computed swath edges.
+        """
+        lat = self.lat.astype(np.float64, copy=False)
+        lon = self.lon.astype(np.float64, copy=False)
+        return GroundTrack(self.names, self.epoch, self.lat, self.lon, *swath_edges(lat, lon, swath_radius_km, model))
+
+    def astype(self, dtype):
+        """
+        Returns a GroundTrack with the track columns cast to dtype ('epoch' stays float64).
+        """
+        columns = [None if value is None else value.astype(dtype, copy=False) for value in self.columns()]
+        return GroundTrack(self.names, self.epoch, *columns)
+
+    @classmethod
+    def concatenate(cls, tracks):
+        """
+        Stacks the satellites of several GroundTracks on the same time grid.
+
+        Edge columns are kept only when every input has them.
+        """
+        tracks = list(tracks)
+        if not tracks:
+            raise ValueError("need at least one GroundTrack")
+        epoch = tracks[0].epoch
+        for track in tracks[1:]:
+            if not np.array_equal(track.epoch, epoch):
+                raise ValueError("GroundTracks must share the same time grid")
+        names = [name for track in tracks for name in track.names]
+        columns = []
+        for key in TRACK_COLUMNS:
+            values = [getattr(track, key) for track in tracks]
+            columns.append(None if any(value is None for value in values) else np.concatenate(values))
+        return cls(names, epoch, *columns)
+
+    @classmethod
+    def from_simulation(cls, simulation):
+        """
+        Wraps a constellation.propagate_constellation or simulation.run_simulation
+        result without copying its arrays.
+        """
+        columns = [simulation.get(key) for key in TRACK_COLUMNS]
+        return cls(simulation['names'], simulation['epoch'], *columns)
+
+    @classmethod
+    def from_path(cls, name, path, left_edge=None, right_edge=None):
+        """
+        Builds a one-satellite GroundTrack from the list-of-dicts format.
+
+        Args:
+            name (str): Satellite name.
+            path (List[dict]): Each dict contains 'time' (UTC datetime), 'lat' and 'lon'.
+            left_edge, right_edge (List[dict]): Optional edges with 'lat' and 'lon'.
+        """
+        epoch = np.array([point['time'].timestamp() for point in path], dtype=np.float64)
+        columns = [_column(path, 'lat'), _column(path, 'lon')]
+        if left_edge is not None and right_edge is not None:
+            columns += [_column(left_edge, 'lat'), _column(left_edge, 'lon'),
+                        _column(right_edge, 'lat'), _column(right_edge, 'lon')]
+        return cls([name], epoch, *columns)
+
+    def to_path(self, index=0):
+        """
+        Converts one satellite back to the list-of-dicts path format.
+
+        Returns:
+            List[dict]: Each dict contains 'time' (UTC datetime), 'lat', and 'lon'.
+        """
+        return [
+            {'time': datetime.fromtimestamp(e, tz=timezone.utc), 'lat': lat, 'lon': lon}
+            for e, lat, lon in zip(self.epoch.tolist(), self.lat[index].tolist(), self.lon[index].tolist())
+        ]
+
+    def to_edges(self, index=0):
+        """
+        Converts one satellite's swath edges back to the list-of-dicts format.
+
+        Returns:
+            tuple: (left_edge, right_edge), lists of dicts with 'lat' and 'lon'.
+        """
+        if not self.has_edges:
+            raise ValueError("GroundTrack has no swath edges; call with_edges first")
+        left_edge = [{'lat': la, 'lon': lo} for la, lo in zip(self.left_lat[index].tolist(), self.left_lon[index].tolist())]
+        right_edge = [{'lat': la, 'lon': lo} for la, lo in zip(self.right_lat[index].tolist(), self.right_lon[index].tolist())]
+        return left_edge, right_edge
+
+    def to_sat_data_list(self, captured=None):
+        """
+        Converts every satellite into the list-of-dicts format of visualizer.plot_multiple_satellites.
+
+        Args:
+            captured (List[List[dict]]): Optional capture records per satellite.
+
+        Returns:
+            List[dict]: Each dict contains 'name', 'path', 'left_edge', 'right_edge' and 'captured'.
+        """
+        sat_data_list = []
+        for i, name in enumerate(self.names):
+            left_edge, right_edge = self.to_edges(i)
+            sat_data_list.append({
+                'name': name,
+                'path': self.to_path(i),
+                'left_edge': left_edge,
+                'right_edge': right_edge,
+                'captured': captured[i] if captured is not None else [],
+            })
+        return sat_data_list
+
+def _column(points, key):
+    return np.array([point[key] for point in points], dtype=np.float64)
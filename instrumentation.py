@@ -0,0 +1,193 @@
+# instrumentation.py
+"""
+Stage timers and counters for the planning pipeline.
+
+Library code reports through the module-level stage(), timed() and count()
+helpers, which do nothing unless a Profiler is active in the current
+context. Each Streamlit session runs in its own thread, so profilers of
+concurrent sessions do not see each other's measurements.
+
+Example:
+    profiler = Profiler(capture='cprofile')
+    with profiler.activate():
+        run_simulation(...)
+    print(profiler.to_json())
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import functools
+import io
+import json
+import time
+
+CAPTURE_MODES = ('cprofile', 'pyinstrument')
+
+_active = ContextVar('profiler', default=None)
+
+class Profiler:
+    """
+    Collects wall time per named stage and event counters.
+
+    Stage times are totals over every call; nested stages are timed
+    independently, so a parent stage includes its children. Stages merged in
+    from worker processes add up CPU time across workers rather than wall time.
+    """
+
+    def __init__(self, capture=None):
+        """
+        Args:
+            capture (str): Optional whole-run profiler, one of CAPTURE_MODES.
+        """
+        if capture is not None and capture not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode: {capture!r}")
+        self.capture = capture
+        self.stages = {}
+        self.counters = {}
+        self.profile_text = None
+        self.created = datetime.now(timezone.utc)
+
+    def add_time(self, name, seconds, calls=1):
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += calls
+
+    def add_count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def merge(self, data):
+        """
+        Adds the stages and counters of another profiler's to_dict() output.
+        """
+        for name, entry in data.get('stages', {}).items():
+            self.add_time(name, entry['seconds'], entry['calls'])
+        for name, n in data.get('counters', {}).items():
+            self.add_count(name, n)
+
+    @contextmanager
+    def activate(self):
+        """
+        Makes this the active profiler in the current context, running the
+        capture profiler (if any) for the duration of the block.
+        """
+        token = _active.set(self)
+        capture = self._start_capture()
+        try:
+            yield self
+        finally:
+            self._stop_capture(capture)
+            _active.reset(token)
+
+    def _start_capture(self):
+        if self.capture == 'cprofile':
+            import cProfile
+            capture = cProfile.Profile()
+            capture.enable()
+            return capture
+        if self.capture == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler as Sampler
+            except ImportError:
+                self.profile_text = "pyinstrument is not installed"
+                return None
+            capture = Sampler()
+            capture.start()
+            return capture
+        return None
+
+    def _stop_capture(self, capture):
+        if capture is None:
+            return
+        if self.capture == 'cprofile':
+            import pstats
+            capture.disable()
+            out = io.StringIO()
+            pstats.Stats(capture, stream=out).sort_stats('cumulative').print_stats(40)
+            self.profile_text = out.getvalue()
+        else:
+            capture.stop()
+            self.profile_text = capture.output_text()
+
+    def rows(self):
+        """
+        Returns the stages as table rows, slowest first.
+
+        Returns:
+            List[dict]: Each dict contains 'stage', 'seconds', 'calls' and 'mean_ms'.
+        """
+        return [
+            {
+                'stage': name,
+                'seconds': round(entry['seconds'], 4),
+                'calls': entry['calls'],
+                'mean_ms': round(1000 * entry['seconds'] / entry['calls'], 3) if entry['calls'] else 0.0,
+            }
+            for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]['seconds'])
+        ]
+
+    def to_dict(self):
+        return {
+            'created': self.created.isoformat(),
+            'stages': {name: dict(entry) for name, entry in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+    def to_json(self, **extra):
+        """
+        Serializes the measurements (plus any extra fields) as one JSON line.
+        """
+        return json.dumps(dict(self.to_dict(), **extra), default=str)
+
+    def export(self, path, **extra):
+        """
+        Appends the measurements to a JSON Lines log file.
+        """
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(self.to_json(**extra) + '\n')
+
+def active():
+    """
+    Returns the profiler active in the current context, or None.
+    """
+    return _active.get()
+
+@contextmanager
+def stage(name):
+    """
+    Times the enclosed block under name when a profiler is active.
+    """
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add_time(name, time.perf_counter() - started)
+
+def timed(name):
+    """
+    Decorator form of stage().
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _active.get()
+            if profiler is None:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add_time(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    """
+    Adds n to a counter when a profiler is active.
+    """
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.add_count(name, n)
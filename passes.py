@@ -0,0 +1,222 @@
+# passes.py
+from skyfield.api import load
+from sgp4.api import Satrec, SatrecArray
+import numpy as np
+
+from constellation import JD_UNIX_EPOCH, geodetic_to_ecef, propagate_pairs, teme_to_ecef, ut1_offset
+from instrumentation import count, timed
+from satellite import grid_start
+
+# Coarse local maxima up to this many degrees per coarse-step second below the
+# mask are refined too, so short passes peaking between samples are not missed
+ELEVATION_SLACK_DEG_PER_SECOND = 0.1
+
+PASS_COLUMNS = (
+    'sat', 'rise', 'culmination', 'set', 'max_elevation',
+    'rise_azimuth', 'culmination_azimuth', 'set_azimuth',
+)
+
+def site_frame(lat, lon, alt_km=0.0):
+    """
+    Returns the Earth-fixed position and local east/north/up axes of a ground site.
+
+    Args:
+        lat, lon (float): Site coordinates in degrees.
+        alt_km (float): Height above the WGS84 ellipsoid in km.
+
+    Returns:
+        tuple: (position, east, north, up), each a (3,) array.
+    """
+    position = np.array(geodetic_to_ecef(lat, lon, alt_km), dtype=np.float64)
+    lat, lon = np.radians(lat), np.radians(lon)
+    east = np.array([-np.sin(lon), np.cos(lon), 0.0])
+    north = np.array([-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)])
+    up = np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+    return position, east, north, up
+
+def look_angles(x, y, z, frame):
+    """
+    Computes topocentric elevation, azimuth and range of Earth-fixed positions.
+
+    Atmospheric refraction is neglected.
+
+    Args:
+        x, y, z (np.ndarray): Earth-fixed positions in km (any matching shape).
+        frame (tuple): Output of site_frame.
+
+    Returns:
+        tuple: (elevation, azimuth, range_km) arrays, angles in degrees with
+            azimuth clockwise from north in [0, 360).
+    """
+    position, east, north, up = frame
+    dx, dy, dz = x - position[0], y - position[1], z - position[2]
+    e = dx * east[0] + dy * east[1]
+    n = dx * north[0] + dy * north[1] + dz * north[2]
+    u = dx * up[0] + dy * up[1] + dz * up[2]
+    horizontal = np.hypot(e, n)
+    elevation = np.degrees(np.arctan2(u, horizontal))
+    azimuth = np.degrees(np.arctan2(e, n)) % 360.0
+    return elevation, azimuth, np.hypot(horizontal, u)
+
+def _site_evaluator(satrecs, sat, frame, dut1):
+    # Look angles of a fixed list of satellites at times that change between refinement steps
+    def evaluate(epoch):
+        count('pass_evaluations', len(epoch))
+        return look_angles(*propagate_pairs(satrecs, sat, epoch, dut1), frame)
+    return evaluate
+
+@timed('passes')
+def predict_passes(satellites, lat, lon, alt_km=0.0, duration_minutes=1440, step_seconds=60,
+                   min_elevation_deg=10.0, start=None, iterations=24):
+    """
+    Predicts the passes of every satellite over a ground site.
+
+    The whole constellation is first sampled on a coarse time grid in one
+    SGP4 array call. Passes are then located from the coarse elevation
+    curves: each local maximum near or above the elevation mask is refined
+    to the culmination by golden-section search, and rise and set are found
+    by bisection inside the coarse step where the elevation crosses the
+    mask. Only the events themselves are propagated at full precision.
+
+    Args:
+        satellites (List[dict]): Each dict contains 'name', 'tle1' and 'tle2'.
+        lat, lon (float): Site coordinates in degrees.
+        alt_km (float): Site height above the WGS84 ellipsoid in km.
+        duration_minutes (int): Prediction horizon in minutes.
+        step_seconds (int): Coarse sampling step; passes shorter than about one
+            step may still be found, but not reliably.
+        min_elevation_deg (float): Elevation mask; rise and set are the mask crossings.
+        start (datetime): UTC start of the horizon (default: the current minute).
+        iterations (int): Refinement steps per event.
+
+    Returns:
+        dict: One entry per pass, sorted by culmination time, as arrays:
+            'sat' (index into satellites), 'rise', 'culmination' and 'set'
+            (POSIX seconds; rise/set are NaN when the pass is already in
+            progress at the start or still in progress at the end of the
+            horizon), 'max_elevation' and 'rise_azimuth', 'culmination_azimuth',
+            'set_azimuth' (degrees).
+    """
+    ts = load.timescale()
+    if start is None:
+        start = grid_start(ts)
+    passes = {key: np.empty(0, dtype=np.int64 if key == 'sat' else np.float64) for key in PASS_COLUMNS}
+    if not satellites:
+        return passes
+
+    frame = site_frame(lat, lon, alt_km)
+    dut1 = ut1_offset(ts, start.timestamp())
+    satrecs = [Satrec.twoline2rv(sat['tle1'], sat['tle2']) for sat in satellites]
+    epoch = start.timestamp() + np.arange(0, duration_minutes * 60 + step_seconds, step_seconds, dtype=np.float64)
+    epoch = epoch[epoch <= start.timestamp() + duration_minutes * 60]
+    if len(epoch) < 2:
+        return passes
+
+    # Coarse pass: every satellite at every step in one array call
+    days = JD_UNIX_EPOCH + epoch / 86400.0
+    jd, fr = divmod(days, 1.0)
+    error, r_teme, _ = SatrecArray(satrecs).sgp4(jd, fr)
+    count('points_propagated', error.size)
+    ut1_jd, ut1_fr = divmod(days + dut1, 1.0)
+    elevation = look_angles(*teme_to_ecef(r_teme, ut1_jd, ut1_fr), frame)[0]
+    # Failed samples never start or extend a pass
+    elevation[error != 0] = -90.0
+
+    n_steps = len(epoch)
+    below = elevation < min_elevation_deg
+    steps = np.arange(n_steps)
+    # Last sample at or before t below the mask (-1 if none), and first at or after t (n_steps if none)
+    last_below = np.maximum.accumulate(np.where(below, steps, -1), axis=1)
+    next_below = np.minimum.accumulate(np.where(below, steps, n_steps)[:, ::-1], axis=1)[:, ::-1]
+
+    padded = np.pad(elevation, ((0, 0), (1, 1)), constant_values=-np.inf)
+    peak = (elevation >= padded[:, :-2]) & (elevation >= padded[:, 2:])
+    peak &= elevation >= min_elevation_deg - ELEVATION_SLACK_DEG_PER_SECOND * step_seconds
+    sat, k = np.nonzero(peak)
+    if len(sat) == 0:
+        return passes
+
+    # Culmination: golden-section search between the neighbouring coarse samples
+    evaluate = _site_evaluator(satrecs, sat, frame, dut1)
+    lo = epoch[np.maximum(k - 1, 0)]
+    hi = epoch[np.minimum(k + 1, n_steps - 1)]
+    ratio = (np.sqrt(5) - 1) / 2
+    a = hi - ratio * (hi - lo)
+    b = lo + ratio * (hi - lo)
+    el_a, el_b = evaluate(a)[0], evaluate(b)[0]
+    for _ in range(iterations):
+        left = el_a >= el_b
+        hi = np.where(left, b, hi)
+        lo = np.where(left, lo, a)
+        b_new = np.where(left, a, lo + ratio * (hi - lo))
+        a_new = np.where(left, hi - ratio * (hi - lo), b)
+        known = np.where(left, el_a, el_b)
+        fresh = evaluate(np.where(left, a_new, b_new))[0]
+        el_a, el_b = np.where(left, fresh, known), np.where(left, known, fresh)
+        a, b = a_new, b_new
+    culmination = np.where(el_a >= el_b, a, b)
+    # The search cannot leave its bracket, so also consider the coarse sample itself (edges of the horizon)
+    coarse_el = elevation[sat, k]
+    use_coarse = coarse_el > np.maximum(el_a, el_b)
+    culmination[use_coarse] = epoch[k[use_coarse]]
+    max_elevation = np.where(use_coarse, coarse_el, np.maximum(el_a, el_b))
+
+    visible = max_elevation >= min_elevation_deg
+    sat, culmination, max_elevation = sat[visible], culmination[visible], max_elevation[visible]
+    if len(sat) == 0:
+        return passes
+
+    # Coarse brackets of the mask crossings on either side of the culmination
+    before = np.searchsorted(epoch, culmination, side='right') - 1
+    rise_below = last_below[sat, before]
+    set_below = next_below[sat, np.minimum(before + 1, n_steps - 1)]
+    set_below = np.where(before + 1 >= n_steps, n_steps, set_below)
+    # Several coarse maxima of one pass share the same brackets; keep the highest
+    order = np.lexsort((-max_elevation, set_below, rise_below, sat))
+    key = np.stack((sat, rise_below, set_below), axis=1)[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (key[1:] != key[:-1]).any(axis=1)
+    keep = np.sort(order[first])
+    sat, culmination, max_elevation = sat[keep], culmination[keep], max_elevation[keep]
+    rise_below, set_below, before = rise_below[keep], set_below[keep], before[keep]
+
+    has_rise = rise_below >= 0
+    has_set = set_below < n_steps
+    rise_lo = epoch[np.maximum(rise_below, 0)]
+    rise_hi = np.where(rise_below + 1 <= before, epoch[np.minimum(rise_below + 1, n_steps - 1)], culmination)
+    set_lo = np.where(set_below - 1 > before, epoch[np.maximum(set_below - 1, 0)], culmination)
+    set_hi = epoch[np.minimum(set_below, n_steps - 1)]
+
+    # Rise and set: bisection on the mask crossing, both in one batch per step
+    evaluate = _site_evaluator(satrecs, np.concatenate((sat, sat)), frame, dut1)
+    lo = np.concatenate((rise_lo, set_hi))
+    hi = np.concatenate((rise_hi, set_lo))
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        above = evaluate(mid)[0] >= min_elevation_deg
+        hi = np.where(above, mid, hi)
+        lo = np.where(above, lo, mid)
+    crossing = hi
+    n = len(sat)
+    rise = np.where(has_rise, crossing[:n], np.nan)
+    set_ = np.where(has_set, crossing[n:], np.nan)
+
+    # Azimuths at the three events; horizon edges stand in for missing rise/set
+    evaluate = _site_evaluator(satrecs, np.concatenate((sat, sat, sat)), frame, dut1)
+    azimuth = evaluate(np.concatenate((
+        np.where(has_rise, rise, epoch[0]), culmination, np.where(has_set, set_, epoch[-1])
+    )))[1]
+    count('passes_found', n)
+
+    order = np.argsort(culmination, kind='stable')
+    passes = {
+        'sat': sat,
+        'rise': rise,
+        'culmination': culmination,
+        'set': set_,
+        'max_elevation': max_elevation,
+        'rise_azimuth': azimuth[:n],
+        'culmination_azimuth': azimuth[n:2 * n],
+        'set_azimuth': azimuth[2 * n:],
+    }
+    return {key: value[order] for key, value in passes.items()}
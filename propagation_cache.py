@@ -0,0 +1,116 @@
+# propagation_cache.py
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def cache_key(tle1, tle2, start_epoch, duration_minutes, step_seconds, swath_radius_km):
+    """
+    Builds the cache key for one satellite's track and swath edges.
+    """
+    parts = (tle1.strip(), tle2.strip(), repr(float(start_epoch)), repr(float(duration_minutes)),
+             repr(float(step_seconds)), repr(float(swath_radius_km)))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+class PropagationCache:
+    """
+    LRU cache of per-satellite track arrays with an optional on-disk tier.
+
+    Entries are dicts of NumPy arrays. The memory tier is bounded by the
+    total array size in bytes; entries evicted from memory stay available
+    on disk when disk_dir is set. Safe to share between threads, so one
+    instance can serve every session of a Streamlit server process.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key + ".npz")
+
+    def get(self, key):
+        """
+        Returns the cached arrays for key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        if self.disk_dir is not None:
+            try:
+                with np.load(self._disk_path(key)) as data:
+                    entry = {name: data[name] for name in data.files}
+            except (OSError, ValueError, EOFError):
+                entry = None
+            if entry is not None:
+                self._remember(key, entry)
+                with self._lock:
+                    self.hits += 1
+                return entry
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, entry):
+        """
+        Stores a dict of arrays under key, writing it to the disk tier if enabled.
+        """
+        self._remember(key, entry)
+        if self.disk_dir is not None and not os.path.exists(self._disk_path(key)):
+            os.makedirs(self.disk_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp.npz")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **entry)
+            os.replace(tmp_path, self._disk_path(key))
+
+    def _remember(self, key, entry):
+        size = sum(value.nbytes for value in entry.values())
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= sum(value.nbytes for value in self._entries.pop(key).values())
+            if size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= sum(value.nbytes for value in evicted.values())
+
+    def clear(self):
+        """
+        Empties the memory tier (the disk tier is left untouched).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def default_cache():
+    """
+    Returns the process-wide cache, created on first use.
+
+    The disk tier is enabled when the PROPAGATION_CACHE_DIR environment variable is set.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = PropagationCache(disk_dir=os.environ.get("PROPAGATION_CACHE_DIR"))
+        return _default_cache
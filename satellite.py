@@ -1,10 +1,94 @@
 # satellite.py
-from skyfield.api import load, EarthSatellite
+from datetime import datetime, timezone
+from skyfield.api import load, EarthSatellite, wgs84
 import numpy as np
 import math
-from geopy.distance import distance as geopy_distance
 
-def get_satellite_path(tle_line1, tle_line2, name, duration_minutes=90, step_seconds=60):
+from ground_track import GroundTrack
+from instrumentation import count, timed
+from swath import swath_edges
+
+def time_grid(ts, duration_minutes, step_seconds, start=None):
+    """
+    Builds the simulation time grid, by default starting at the current UTC minute.
+
+    Args:
+        ts (Timescale): skyfield timescale.
+        duration_minutes (int): Total simulation duration in minutes.
+        step_seconds (int): Time interval in seconds between samples.
+        start (datetime): Optional UTC start time (whole minutes), so several
+            processes can rebuild the same grid.
+
+    Returns:
+        tuple: (t_array, epoch) where t_array is a skyfield Time array and
+            epoch is a float64 NumPy array of POSIX seconds for each sample.
+    """
+    if start is None:
+        start = grid_start(ts)
+    offsets = np.arange(0, duration_minutes * 60, step_seconds)
+    t_array = ts.utc(start.year, start.month, start.day, start.hour, start.minute, offsets)
+    epoch = start.timestamp() + offsets.astype(np.float64)
+    return t_array, epoch
+
+def grid_start(ts):
+    """
+    Returns the current UTC time truncated to the minute, the default grid start.
+    """
+    now = ts.now().utc_datetime()
+    return datetime(now.year, now.month, now.day, now.hour, now.minute, tzinfo=timezone.utc)
+
+@timed('propagate')
+def get_satellite_track(tle_line1, tle_line2, name, duration_minutes=90, step_seconds=60, include_altitude=False,
+                        start=None):
+    """
+    Returns the satellite ground track as columnar NumPy arrays.
+
+    The whole time grid is propagated in a single vectorized skyfield/SGP4
+    call instead of one call per sample.
+
+    Args:
+        tle_line1 (str): First line of the TLE.
+        tle_line2 (str): Second line of the TLE.
+        name (str): Satellite name.
+        duration_minutes (int): Total simulation duration in minutes.
+        step_seconds (int): Time interval in seconds for sampling positions.
+        include_altitude (bool): Also return the altitude above the WGS84 ellipsoid.
+        start (datetime): UTC start time in whole minutes (default: the current minute).
+
+    Returns:
+        dict: 'epoch' (POSIX seconds), 'lat' and 'lon' (degrees) arrays, plus
+            'alt_km' when include_altitude is True.
+    """
+    ts = load.timescale()
+    satellite = EarthSatellite(tle_line1, tle_line2, name, ts)
+    t_array, epoch = time_grid(ts, duration_minutes, step_seconds, start)
+    position = wgs84.geographic_position_of(satellite.at(t_array))
+    count('points_propagated', len(epoch))
+    track = {
+        'epoch': epoch,
+        'lat': np.atleast_1d(position.latitude.degrees),
+        'lon': np.atleast_1d(position.longitude.degrees),
+    }
+    if include_altitude:
+        track['alt_km'] = np.atleast_1d(position.elevation.km)
+    return track
+
+def track_to_path(track):
+    """
+    Converts a columnar track into the list-of-dicts path format.
+
+    Args:
+        track (dict): Output of get_satellite_track.
+
+    Returns:
+        List[dict]: Each dict contains 'time' (UTC datetime), 'lat', and 'lon'.
+    """
+    return [
+        {'time': datetime.fromtimestamp(e, tz=timezone.utc), 'lat': lat, 'lon': lon}
+        for e, lat, lon in zip(track['epoch'].tolist(), track['lat'].tolist(), track['lon'].tolist())
+    ]
+
+def get_satellite_path(tle_line1, tle_line2, name, duration_minutes=90, step_seconds=60, start=None):
     """
     Returns the satellite ground track for the given TLE.
     
@@ -14,31 +98,13 @@ def get_satellite_path(tle_line1, tle_line2, name, duration_minutes=90, step_sec
         name (str): Satellite name.
         duration_minutes (int): Total simulation duration in minutes.
         step_seconds (int): Time interval in seconds for sampling positions.
+        start (datetime): UTC start time in whole minutes (default: the current minute).
         
     Returns:
         List[dict]: Each dict contains 'time', 'lat', and 'lon'.
     """
-    ts = load.timescale()
-    satellite = EarthSatellite(tle_line1, tle_line2, name, ts)
-    steps = int(duration_minutes * 60 / step_seconds)
-    t0 = ts.now()
-    t_array = ts.utc(
-        t0.utc_datetime().year,
-        t0.utc_datetime().month,
-        t0.utc_datetime().day,
-        t0.utc_datetime().hour,
-        t0.utc_datetime().minute,
-        np.arange(0, duration_minutes * 60, step_seconds)
-    )
-    
-    path = []
-    for t in t_array:
-        geocentric = satellite.at(t)
-        subpoint = geocentric.subpoint()
-        lat = subpoint.latitude.degrees
-        lon = subpoint.longitude.degrees
-        path.append({'time': t.utc_datetime(), 'lat': lat, 'lon': lon})
-    return path
+    track = get_satellite_track(tle_line1, tle_line2, name, duration_minutes, step_seconds, start=start)
+    return track_to_path(track)
 
 def compute_bearing(lat1, lon1, lat2, lon2):
     """
@@ -54,7 +120,30 @@ def compute_bearing(lat1, lon1, lat2, lon2):
     compass_bearing = (initial_bearing + 360) % 360
     return compass_bearing
 
-def get_satellite_path_with_edges(tle_line1, tle_line2, name, duration_minutes=90, step_seconds=60, swath_radius_km=75):
+def get_ground_track(tle_line1, tle_line2, name, duration_minutes=90, step_seconds=60, swath_radius_km=None, start=None):
+    """
+    Returns the satellite ground track as a GroundTrack.
+
+    Args:
+        tle_line1 (str): First line of the TLE.
+        tle_line2 (str): Second line of the TLE.
+        name (str): Satellite name.
+        duration_minutes (int): Total simulation duration in minutes.
+        step_seconds (int): Time interval in seconds for sampling positions.
+        swath_radius_km (float): When set, swath edges at this distance are included.
+        start (datetime): UTC start time in whole minutes (default: the current minute).
+
+    Returns:
+        GroundTrack: One-satellite track.
+    """
+    track = get_satellite_track(tle_line1, tle_line2, name, duration_minutes, step_seconds, start=start)
+    ground_track = GroundTrack([name], track['epoch'], track['lat'], track['lon'])
+    if swath_radius_km is not None:
+        ground_track = ground_track.with_edges(swath_radius_km)
+    return ground_track
+
+def get_satellite_path_with_edges(tle_line1, tle_line2, name, duration_minutes=90, step_seconds=60, swath_radius_km=75,
+                                  start=None):
     """
     Computes the satellite ground track along with left and right swath edge lines.
     
@@ -63,25 +152,25 @@ def get_satellite_path_with_edges(tle_line1, tle_line2, name, duration_minutes=9
             where path is a list of dicts (each with 'time', 'lat', 'lon'),
             left_edge/right_edge are lists of dicts with 'lat' and 'lon'
     """
-    path = get_satellite_path(tle_line1, tle_line2, name, duration_minutes, step_seconds)
-    left_edge = []
-    right_edge = []
+    ground_track = get_ground_track(tle_line1, tle_line2, name, duration_minutes, step_seconds, swath_radius_km, start)
+    left_edge, right_edge = ground_track.to_edges()
+    return ground_track.to_path(), left_edge, right_edge
+
+def compute_swath_edges(path, swath_radius_km=75, model='wgs84'):
+    """
+    Computes the left and right swath edge lines for an existing ground track.
     
-    for i, point in enumerate(path):
-        lat = point['lat']
-        lon = point['lon']
-        # Use next point to compute bearing if available; else use previous
-        if i < len(path) - 1:
-            bearing = compute_bearing(lat, lon, path[i+1]['lat'], path[i+1]['lon'])
-        else:
-            bearing = compute_bearing(path[i-1]['lat'], path[i-1]['lon'], lat, lon)
-            
-        left_bearing = (bearing - 90) % 360
-        right_bearing = (bearing + 90) % 360
-        
-        left_point = geopy_distance(kilometers=swath_radius_km).destination((lat, lon), left_bearing)
-        right_point = geopy_distance(kilometers=swath_radius_km).destination((lat, lon), right_bearing)
-        left_edge.append({'lat': left_point.latitude, 'lon': left_point.longitude})
-        right_edge.append({'lat': right_point.latitude, 'lon': right_point.longitude})
+    Args:
+        path (List[dict]): Ground track with keys 'lat' and 'lon'.
+        swath_radius_km (float): Distance from the track to each edge.
+        model (str): Earth model passed to swath.swath_edges ('wgs84' or 'spherical').
         
-    return path, left_edge, right_edge
+    Returns:
+        tuple: (left_edge, right_edge), lists of dicts with 'lat' and 'lon'
+    """
+    lat = np.array([point['lat'] for point in path], dtype=np.float64)
+    lon = np.array([point['lon'] for point in path], dtype=np.float64)
+    left_lat, left_lon, right_lat, right_lon = swath_edges(lat, lon, swath_radius_km, model)
+    left_edge = [{'lat': la, 'lon': lo} for la, lo in zip(left_lat.tolist(), left_lon.tolist())]
+    right_edge = [{'lat': la, 'lon': lo} for la, lo in zip(right_lat.tolist(), right_lon.tolist())]
+    return left_edge, right_edge
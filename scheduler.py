@@ -1,6 +1,16 @@
 # scheduler.py
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
 from geopy.distance import great_circle
+import numpy as np
 
+from access import track_access_windows
+from instrumentation import count, timed
+from swath import EARTH_RADIUS_KM
+from target_index import TargetIndex
+from target_store import targets_key
+
+@timed('schedule')
 def greedy_schedule(path, targets, swath_radius_km=75):
     """
     Determines which targets are captured by the satellite.
@@ -19,6 +29,7 @@ def greedy_schedule(path, targets, swath_radius_km=75):
     
     for point in path:
         point_coords = (point['lat'], point['lon'])
+        count('distance_evaluations', len(remaining_targets))
         for target in remaining_targets:
             distance = great_circle(point_coords, target).km
             if distance <= swath_radius_km:
@@ -27,4 +38,460 @@ def greedy_schedule(path, targets, swath_radius_km=75):
         remaining_targets = [t for t in remaining_targets if t not in [cap['target'] for cap in captured]]
         if not remaining_targets:
             break
+    count('captures', len(captured))
     return captured
+
+def great_circle_km(lat1, lon1, lat2, lon2):
+    """
+    Vectorized haversine distance in km; inputs in degrees and broadcastable.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+@timed('schedule')
+def schedule_track(track, targets, swath_radius_km=75):
+    """
+    Determines which targets are captured along a columnar track.
+    
+    Equivalent to greedy_schedule, but evaluates every track point against
+    every target as one array operation.
+    
+    Args:
+        track (dict): Arrays 'epoch' (POSIX seconds), 'lat' and 'lon'.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        swath_radius_km (float): Radius within which a target is considered captured.
+        
+    Returns:
+        List[dict]: Each dict contains 'target' (the target coordinate) and 'time' (capture time).
+    """
+    if len(targets) == 0 or len(track['epoch']) == 0:
+        return []
+    target_arr = np.asarray(targets, dtype=np.float64)
+    count('distance_evaluations', len(track['epoch']) * len(targets))
+    distances = great_circle_km(
+        track['lat'][:, None], track['lon'][:, None],
+        target_arr[None, :, 0], target_arr[None, :, 1]
+    )
+    within = distances <= swath_radius_km
+    hit = within.any(axis=0)
+    first = np.argmax(within, axis=0)
+    # Order by capture time, then by position in the target list
+    order = np.lexsort((np.arange(len(targets)), first))
+    return [
+        {'target': targets[j], 'time': datetime.fromtimestamp(track['epoch'][first[j]], tz=timezone.utc)}
+        for j in order if hit[j]
+    ]
+
+def schedule_constellation(constellation, targets, swath_radius_km=75):
+    """
+    Schedules every satellite of a propagated constellation against one shared
+    target index.
+    
+    Args:
+        constellation (dict): Output of constellation.propagate_constellation.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        swath_radius_km (float): Radius within which a target is considered captured.
+        
+    Returns:
+        List[List[dict]]: Capture records for each satellite, in constellation order.
+    """
+    epoch = constellation['epoch']
+    index = TargetIndex(targets)
+    return [
+        indexed_schedule_track({'epoch': epoch, 'lat': lat, 'lon': lon}, targets, swath_radius_km, index)
+        for lat, lon in zip(constellation['lat'], constellation['lon'])
+    ]
+
+@timed('schedule')
+def indexed_schedule(path, targets, swath_radius_km=75, index=None):
+    """
+    Determines which targets are captured by the satellite using a spatial index.
+    
+    Returns the same records as greedy_schedule, but only compares each path
+    point with the targets in nearby index cells, so it scales to large target sets.
+    
+    Args:
+        path (List[dict]): Satellite path with keys 'lat', 'lon' and 'time'.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        swath_radius_km (float): Radius within which a target is considered captured.
+        index (TargetIndex): Prebuilt index over targets, reused across satellites.
+        
+    Returns:
+        List[dict]: Each dict contains 'target' (the target coordinate) and 'time' (capture time).
+    """
+    if index is None:
+        index = TargetIndex(targets)
+    lat = np.array([point['lat'] for point in path], dtype=np.float64)
+    lon = np.array([point['lon'] for point in path], dtype=np.float64)
+    point_idx, target_idx = index.first_captures(lat, lon, swath_radius_km)
+    return [
+        {'target': targets[j], 'time': path[i]['time']}
+        for i, j in zip(point_idx.tolist(), target_idx.tolist())
+    ]
+
+@timed('schedule')
+def indexed_schedule_track(track, targets, swath_radius_km=75, index=None):
+    """
+    Columnar-track variant of indexed_schedule.
+    
+    Args:
+        track (dict): Arrays 'epoch' (POSIX seconds), 'lat' and 'lon'.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        swath_radius_km (float): Radius within which a target is considered captured.
+        index (TargetIndex): Prebuilt index over targets, reused across satellites.
+        
+    Returns:
+        List[dict]: Each dict contains 'target' (the target coordinate) and 'time' (capture time).
+    """
+    if index is None:
+        index = TargetIndex(targets)
+    point_idx, target_idx = index.first_captures(track['lat'], track['lon'], swath_radius_km)
+    epoch = track['epoch']
+    return [
+        {'target': targets[j], 'time': datetime.fromtimestamp(epoch[i], tz=timezone.utc)}
+        for i, j in zip(point_idx.tolist(), target_idx.tolist())
+    ]
+
+@timed('schedule')
+def window_schedule(windows, targets):
+    """
+    Turns access windows for one satellite into capture records.
+    
+    Each target is captured once, at the closest approach of its earliest window.
+    
+    Args:
+        windows (dict): Output of access.track_access_windows.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        
+    Returns:
+        List[dict]: Each dict contains 'target', 'time' (closest approach) and
+            the window 'start' and 'end', ordered by capture time.
+    """
+    first = np.lexsort((windows['start'], windows['target']))
+    _, keep = np.unique(windows['target'][first], return_index=True)
+    chosen = first[keep]
+    chosen = chosen[np.lexsort((windows['target'][chosen], windows['closest'][chosen]))]
+    return [
+        {
+            'target': targets[windows['target'][k]],
+            'time': datetime.fromtimestamp(windows['closest'][k], tz=timezone.utc),
+            'start': datetime.fromtimestamp(windows['start'][k], tz=timezone.utc),
+            'end': datetime.fromtimestamp(windows['end'][k], tz=timezone.utc),
+        }
+        for k in chosen.tolist()
+    ]
+
+def access_schedule_constellation(constellation, targets, swath_radius_km=75):
+    """
+    Schedules every satellite of a propagated constellation from continuous-time
+    access windows, so captures between coarse time steps are not missed.
+    
+    Args:
+        constellation (dict): Output of constellation.propagate_constellation.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        swath_radius_km (float): Radius within which a target is considered captured.
+        
+    Returns:
+        List[List[dict]]: Capture records (see window_schedule) for each satellite.
+    """
+    index = TargetIndex(targets)
+    epoch = constellation['epoch']
+    return [
+        window_schedule(
+            track_access_windows({'epoch': epoch, 'lat': lat, 'lon': lon}, targets, swath_radius_km, index),
+            targets
+        )
+        for lat, lon in zip(constellation['lat'], constellation['lon'])
+    ]
+
+SCHEDULING_MODES = ('earliest', 'coverage')
+
+@timed('schedule')
+def global_schedule(windows, targets, n_satellites, mode='earliest', min_gap_seconds=0.0, max_tasks_per_satellite=None,
+                    priorities=None):
+    """
+    Assigns each target to at most one satellite from the constellation's access windows.
+    
+    Modes:
+        'earliest': windows are taken in order of closest-approach time, which
+            minimizes the time until each target is first imaged (revisit).
+        'coverage': starts from the 'earliest' plan, then inserts unassigned
+            targets (fewest windows first) by moving a single blocking task to
+            another window, which increases how many targets fit when
+            satellites are constrained by min_gap_seconds or a task cap.
+
+    With priorities, constrained satellites consider higher-priority targets
+    first in both modes; without constraints every target simply gets its
+    earliest window.
+    
+    Args:
+        windows (dict): Output of access.access_windows (must include 'sat').
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        n_satellites (int): Number of satellites in the constellation.
+        mode (str): One of SCHEDULING_MODES.
+        min_gap_seconds (float): Minimum time between two captures of one satellite.
+        max_tasks_per_satellite (int): Optional cap on captures per satellite.
+        priorities (np.ndarray): Optional weight per target (higher first);
+            defaults to the priority column of a target_store.TargetStore.
+        
+    Returns:
+        dict: 'tasks' (List[List[dict]] of capture records per satellite, each
+            with 'target', 'time' (closest approach) and the window 'start' and
+            'end', ordered by capture time) and 'unassigned' (List[tuple] of targets).
+    """
+    if mode not in SCHEDULING_MODES:
+        raise ValueError(f"Unknown scheduling mode: {mode!r}")
+    sat = windows['sat']
+    tgt = windows['target']
+    closest = windows['closest']
+    assigned = np.full(len(targets), -1, dtype=np.int64)
+    if priorities is None:
+        priorities = getattr(targets, 'priority', None)
+    # Sort key that puts high-priority targets first (all zeros without priorities)
+    rank = np.zeros(len(tgt)) if priorities is None else -np.asarray(priorities, dtype=np.float64)[tgt]
+
+    if min_gap_seconds <= 0 and max_tasks_per_satellite is None:
+        # Unconstrained: both modes pick every target's earliest window
+        order = np.lexsort((sat, closest, tgt))
+        targets_seen, first = np.unique(tgt[order], return_index=True)
+        assigned[targets_seen] = order[first]
+    else:
+        order = np.lexsort((tgt, sat, closest, rank))
+        # Per-satellite plans: sorted lists of (capture time, window index)
+        plans = [[] for _ in range(n_satellites)]
+        for k in order.tolist():
+            if assigned[tgt[k]] < 0 and _fits(plans[sat[k]], closest[k], min_gap_seconds, max_tasks_per_satellite):
+                insort(plans[sat[k]], (closest[k], k))
+                assigned[tgt[k]] = k
+        if mode == 'coverage':
+            options = np.bincount(tgt, minlength=len(targets))
+            _repair(plans, assigned, windows, np.lexsort((closest, options[tgt], rank)), min_gap_seconds, max_tasks_per_satellite)
+
+    tasks = [[] for _ in range(n_satellites)]
+    chosen = assigned[assigned >= 0]
+    chosen = chosen[np.lexsort((tgt[chosen], closest[chosen]))]
+    count('captures', len(chosen))
+    for k in chosen.tolist():
+        tasks[sat[k]].append({
+            'target': targets[tgt[k]],
+            'time': datetime.fromtimestamp(closest[k], tz=timezone.utc),
+            'start': datetime.fromtimestamp(windows['start'][k], tz=timezone.utc),
+            'end': datetime.fromtimestamp(windows['end'][k], tz=timezone.utc),
+        })
+    unassigned = [targets[j] for j in np.flatnonzero(assigned < 0).tolist()]
+    return {'tasks': tasks, 'unassigned': unassigned}
+
+def _conflicts(plan, t, min_gap_seconds):
+    """
+    Returns the (time, window) entries of a satellite plan closer than min_gap_seconds to t.
+    """
+    lo = bisect_left(plan, (t - min_gap_seconds, np.inf))
+    hi = bisect_left(plan, (t + min_gap_seconds, -1))
+    return [entry for entry in plan[lo:hi] if abs(entry[0] - t) < min_gap_seconds]
+
+def _fits(plan, t, min_gap_seconds, max_tasks_per_satellite):
+    if max_tasks_per_satellite is not None and len(plan) >= max_tasks_per_satellite:
+        return False
+    return not _conflicts(plan, t, min_gap_seconds)
+
+def _repair(plans, assigned, windows, order, min_gap_seconds, max_tasks_per_satellite):
+    """
+    Inserts unassigned targets by relocating one conflicting task to another window.
+    
+    order lists the window indices; targets are tried in order of their first window.
+    """
+    sat = windows['sat']
+    tgt = windows['target']
+    closest = windows['closest']
+    options = {}
+    for k in order.tolist():
+        options.setdefault(tgt[k], []).append(k)
+
+    for j, candidates in options.items():
+        if assigned[j] >= 0:
+            continue
+        for k in candidates:
+            plan = plans[sat[k]]
+            blocking = _conflicts(plan, closest[k], min_gap_seconds)
+            if not blocking and _fits(plan, closest[k], min_gap_seconds, max_tasks_per_satellite):
+                insort(plan, (closest[k], k))
+                assigned[j] = k
+                break
+            if len(blocking) != 1:
+                continue
+            moved = blocking[0]
+            plan.remove(moved)
+            if not _fits(plan, closest[k], min_gap_seconds, max_tasks_per_satellite):
+                insort(plan, moved)
+                continue
+            insort(plan, (closest[k], k))
+            for k2 in options[tgt[moved[1]]]:
+                if k2 != moved[1] and _fits(plans[sat[k2]], closest[k2], min_gap_seconds, max_tasks_per_satellite):
+                    insort(plans[sat[k2]], (closest[k2], k2))
+                    assigned[tgt[k2]] = k2
+                    assigned[j] = k
+                    break
+            if assigned[j] >= 0:
+                break
+            plan.remove((closest[k], k))
+            insort(plan, moved)
+
+class IncrementalScheduler:
+    """
+    Keeps per-target access windows for a fixed set of tracks.
+
+    Adding targets only computes windows for the new targets against the
+    stored tracks, and removing targets just drops their windows, so
+    interactive edits to the target list never re-scan existing targets.
+    Syncing to the list that was last synced returns immediately.
+    """
+
+    WINDOW_COLUMNS = ('sat', 'target', 'start', 'end', 'closest', 'min_distance_km')
+
+    def __init__(self, epoch, lat, lon, swath_radius_km=75):
+        """
+        Args:
+            epoch (np.ndarray): POSIX seconds of the shared time grid (T,).
+            lat, lon (np.ndarray): (N, T) track arrays in degrees.
+            swath_radius_km (float): Radius within which a target is considered captured.
+        """
+        self.epoch = np.asarray(epoch, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.swath_radius_km = swath_radius_km
+        self.targets = []
+        self._ids = {}
+        self._next_id = 0
+        # Priority per stable target id; targets without one count as 0
+        self._priority = {}
+        # targets_key() of the list the tracked targets were last synced to
+        self._synced = None
+        # Stored windows use stable target ids in the 'target' column
+        self._windows = {
+            key: np.empty(0, dtype=np.int64 if key in ('sat', 'target') else np.float64)
+            for key in self.WINDOW_COLUMNS
+        }
+
+    @classmethod
+    def from_simulation(cls, simulation, targets, swath_radius_km=75):
+        """
+        Seeds a scheduler with the tracks and windows of a simulation.run_simulation result.
+        """
+        planner = cls(simulation['epoch'], simulation['lat'], simulation['lon'], swath_radius_km)
+        first_position = {}
+        for j, target in enumerate(targets):
+            first_position.setdefault(tuple(target), j)
+        for target, j in first_position.items():
+            planner._ids[target] = j
+            planner.targets.append(target)
+        planner._next_id = len(targets)
+        if getattr(targets, 'priority', None) is not None:
+            planner._priority = {j: float(targets.priority[j]) for j in first_position.values()}
+        windows = simulation['windows']
+        # Duplicate targets have identical windows; keep those of the first occurrence
+        keep = np.isin(windows['target'], list(first_position.values()))
+        planner._windows = {key: windows[key][keep] for key in cls.WINDOW_COLUMNS}
+        planner._synced = targets_key(targets)
+        return planner
+
+    def add_targets(self, targets, priorities=None):
+        """
+        Computes access windows for the targets that are not tracked yet.
+
+        Args:
+            targets (List[tuple]): Target coordinates as (lat, lon).
+            priorities (List[float]): Optional weight per target, also updated
+                for targets that are already tracked.
+
+        Returns:
+            int: Number of targets added.
+        """
+        new = []
+        self._synced = None
+        if priorities is None:
+            priorities = getattr(targets, 'priority', None)
+        for k, target in enumerate(targets):
+            target = tuple(target)
+            if target not in self._ids:
+                self._ids[target] = self._next_id
+                self._next_id += 1
+                self.targets.append(target)
+                new.append(target)
+            if priorities is not None:
+                self._priority[self._ids[target]] = float(priorities[k])
+        if not new:
+            return 0
+        index = TargetIndex(new)
+        ids = np.array([self._ids[target] for target in new], dtype=np.int64)
+        parts = [self._windows]
+        for i in range(len(self.lat)):
+            windows = track_access_windows(
+                {'epoch': self.epoch, 'lat': self.lat[i], 'lon': self.lon[i]},
+                new, self.swath_radius_km, index
+            )
+            windows['target'] = ids[windows['target']]
+            windows['sat'] = np.full(len(windows['target']), i, dtype=np.int64)
+            parts.append(windows)
+        self._windows = {key: np.concatenate([part[key] for part in parts]) for key in self.WINDOW_COLUMNS}
+        return len(new)
+
+    def remove_targets(self, targets):
+        """
+        Drops the stored windows of the given targets.
+
+        Returns:
+            int: Number of targets removed.
+        """
+        removed = [self._ids.pop(tuple(target)) for target in targets if tuple(target) in self._ids]
+        if not removed:
+            return 0
+        self._synced = None
+        for target_id in removed:
+            self._priority.pop(target_id, None)
+        self.targets = [target for target in self.targets if target in self._ids]
+        keep = ~np.isin(self._windows['target'], removed)
+        self._windows = {key: value[keep] for key, value in self._windows.items()}
+        return len(removed)
+
+    def sync(self, targets, priorities=None):
+        """
+        Makes the tracked targets match the given list, adding and removing as needed.
+
+        Returns:
+            tuple: (added, removed) counts.
+        """
+        key = targets_key(targets, priorities)
+        if key == self._synced:
+            return 0, 0
+        wanted = {tuple(target) for target in targets}
+        removed = self.remove_targets([target for target in self.targets if target not in wanted])
+        added = self.add_targets(targets, priorities)
+        self._synced = key
+        return added, removed
+
+    def windows(self):
+        """
+        Returns the stored windows with 'target' indexing into self.targets.
+        """
+        position = np.full(self._next_id, -1, dtype=np.int64)
+        for j, target in enumerate(self.targets):
+            position[self._ids[target]] = j
+        windows = dict(self._windows)
+        windows['target'] = position[windows['target']]
+        return windows
+
+    def schedule(self, mode='earliest', min_gap_seconds=0.0, max_tasks_per_satellite=None):
+        """
+        Runs global_schedule over the tracked targets.
+
+        Returns:
+            dict: See global_schedule.
+        """
+        priorities = None
+        if self._priority:
+            priorities = np.array([self._priority.get(self._ids[target], 0.0) for target in self.targets])
+        return global_schedule(
+            self.windows(), self.targets, len(self.lat),
+            mode, min_gap_seconds, max_tasks_per_satellite, priorities
+        )
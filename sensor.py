@@ -0,0 +1,270 @@
+# sensor.py
+"""
+Sensor-geometry capture model.
+
+A target counts as captured only if the sensor can point at it within its
+off-nadir limit, the satellite is high enough above the target's horizon,
+and (optionally) the sun is high enough for optical imaging. Candidate
+(satellite position, target) pairs still come from the TargetIndex radius
+prefilter, with the radius derived from the limits, so the geometry is only
+evaluated for pairs that can possibly pass.
+
+Solar elevation uses skyfield's JPL ephemeris (SUN_EPHEMERIS). When the file
+is neither present nor downloadable (e.g. offline), a low-precision solar
+position (about 0.01 degrees) is used instead and a warning is issued.
+"""
+import functools
+import os
+import warnings
+
+from skyfield.api import load
+from skyfield.framelib import itrs
+from skyfield.sgp4lib import theta_GMST1982
+from sgp4.api import Satrec
+import numpy as np
+
+from constellation import JD_UNIX_EPOCH, ecef_to_geodetic, geodetic_to_ecef, posix_to_time, propagate_pairs, ut1_offset
+from instrumentation import count, timed
+from swath import EARTH_RADIUS_KM
+from target_index import TargetIndex, to_unit_xyz
+
+SUN_EPHEMERIS = os.environ.get("SUN_EPHEMERIS", "de421.bsp")
+
+# The access radius is computed on a sphere; this covers the ellipsoid's flattening
+RADIUS_MARGIN = 1.01
+
+@functools.lru_cache(maxsize=None)
+def _ephemeris(name):
+    try:
+        return load(name)
+    except Exception as e:
+        warnings.warn(f"Sun ephemeris {name} unavailable ({e}); using a low-precision solar position")
+        return None
+
+def _sun_direction_analytic(epoch):
+    # Astronomical Almanac low-precision formulae, rotated into the Earth-fixed frame with GMST
+    days = JD_UNIX_EPOCH + epoch / 86400.0
+    n = days - 2451545.0
+    mean_longitude = np.radians(280.460 + 0.9856474 * n)
+    anomaly = np.radians(357.528 + 0.9856003 * n)
+    longitude = mean_longitude + np.radians(1.915 * np.sin(anomaly) + 0.020 * np.sin(2 * anomaly))
+    obliquity = np.radians(23.439 - 0.0000004 * n)
+    x = np.cos(longitude)
+    y = np.cos(obliquity) * np.sin(longitude)
+    z = np.sin(obliquity) * np.sin(longitude)
+    whole, fraction = divmod(days, 1.0)
+    theta, _ = theta_GMST1982(whole, fraction)
+    return np.stack((np.cos(theta) * x + np.sin(theta) * y, -np.sin(theta) * x + np.cos(theta) * y, z), axis=-1)
+
+def sun_direction(epoch, ephemeris=SUN_EPHEMERIS):
+    """
+    Returns the Earth-fixed unit vector towards the sun.
+
+    Args:
+        epoch (np.ndarray): POSIX seconds (K,).
+        ephemeris (str): skyfield ephemeris file; the analytic fallback is used
+            when it cannot be loaded.
+
+    Returns:
+        np.ndarray: Unit vectors (K, 3).
+    """
+    epoch = np.atleast_1d(np.asarray(epoch, dtype=np.float64))
+    planets = _ephemeris(ephemeris) if ephemeris else None
+    if planets is None or len(epoch) == 0:
+        return _sun_direction_analytic(epoch)
+    t = posix_to_time(load.timescale(), epoch)
+    xyz = (planets['sun'] - planets['earth']).at(t).frame_xyz(itrs).km.T
+    return xyz / np.linalg.norm(xyz, axis=-1, keepdims=True)
+
+def capture_geometry(sat_xyz, target_xyz, target_up, sun=None):
+    """
+    Computes the viewing geometry of (satellite, target) pairs.
+
+    Args:
+        sat_xyz (np.ndarray): Earth-fixed satellite positions in km (K, 3).
+        target_xyz (np.ndarray): Earth-fixed target positions in km (K, 3).
+        target_up (np.ndarray): Unit normals of the ellipsoid at the targets (K, 3).
+        sun (np.ndarray): Optional unit vectors towards the sun (K, 3).
+
+    Returns:
+        dict: 'off_nadir' (angle between the line of sight and the satellite's
+            geodetic nadir), 'elevation' (of the satellite above the target's
+            horizon), 'range_km' and, with sun, 'sun_elevation' at the target;
+            angles in degrees.
+    """
+    line = target_xyz - sat_xyz
+    range_km = np.linalg.norm(line, axis=-1)
+    # Geodetic nadir: the ellipsoid normal through the sub-satellite point
+    lat, lon, _ = ecef_to_geodetic(sat_xyz[:, 0], sat_xyz[:, 1], sat_xyz[:, 2])
+    sat_up = to_unit_xyz(lat, lon)
+    geometry = {
+        'off_nadir': np.degrees(np.arccos(np.clip(-np.einsum('ij,ij->i', line, sat_up) / range_km, -1, 1))),
+        'elevation': np.degrees(np.arcsin(np.clip(-np.einsum('ij,ij->i', line, target_up) / range_km, -1, 1))),
+        'range_km': range_km,
+    }
+    if sun is not None:
+        geometry['sun_elevation'] = np.degrees(np.arcsin(np.clip(np.einsum('ij,ij->i', sun, target_up), -1, 1)))
+    return geometry
+
+def apogee_altitude_km(satellites):
+    """
+    Returns the highest apogee altitude of the satellites' mean elements in km.
+    """
+    satrecs = [Satrec.twoline2rv(sat['tle1'], sat['tle2']) for sat in satellites]
+    return max((satrec.alta * satrec.radiusearthkm for satrec in satrecs), default=0.0)
+
+class SensorModel:
+    """
+    Capture limits of an imaging sensor.
+
+    For access windows the limits are applied at the closest approach, the
+    time at which the schedulers place the capture (see filter_windows).
+
+    Example:
+        sensor = SensorModel(max_off_nadir_deg=25, min_sun_elevation_deg=10)
+        run_simulation(satellites, targets, sensor=sensor)
+    """
+
+    def __init__(self, max_off_nadir_deg=30.0, min_elevation_deg=None, min_sun_elevation_deg=None,
+                 ephemeris=SUN_EPHEMERIS):
+        """
+        Args:
+            max_off_nadir_deg (float): Largest pointing angle away from nadir.
+            min_elevation_deg (float): Optional lowest satellite elevation seen from the target.
+            min_sun_elevation_deg (float): Optional lowest solar elevation at the target.
+            ephemeris (str): skyfield ephemeris used for the sun position.
+        """
+        if not 0 < max_off_nadir_deg < 90:
+            raise ValueError(f"max_off_nadir_deg must be between 0 and 90, got {max_off_nadir_deg}")
+        self.max_off_nadir_deg = max_off_nadir_deg
+        self.min_elevation_deg = min_elevation_deg
+        self.min_sun_elevation_deg = min_sun_elevation_deg
+        self.ephemeris = ephemeris
+
+    def __repr__(self):
+        return (f"SensorModel(max_off_nadir_deg={self.max_off_nadir_deg}, min_elevation_deg={self.min_elevation_deg}, "
+                f"min_sun_elevation_deg={self.min_sun_elevation_deg})")
+
+    def key(self):
+        """
+        Returns a hashable description of the limits, e.g. for cache keys.
+        """
+        return (self.max_off_nadir_deg, self.min_elevation_deg, self.min_sun_elevation_deg)
+
+    def load_ephemeris(self):
+        """
+        Loads the sun ephemeris, downloading it if needed, so that worker
+        processes started afterwards find the file instead of fetching it too.
+
+        Returns:
+            bool: Whether the ephemeris is available (otherwise the analytic
+                solar position is used).
+        """
+        if self.min_sun_elevation_deg is None or not self.ephemeris:
+            return False
+        return _ephemeris(self.ephemeris) is not None
+
+    def access_radius_km(self, alt_km):
+        """
+        Returns the ground distance from the sub-satellite point beyond which
+        no target can satisfy the pointing and elevation limits.
+
+        Args:
+            alt_km (float): Highest satellite altitude considered.
+        """
+        ratio = (EARTH_RADIUS_KM + alt_km) / EARTH_RADIUS_KM
+        # Pointing further off nadir than the horizon reaches no more ground
+        eta = min(np.radians(self.max_off_nadir_deg), np.arcsin(1.0 / ratio))
+        # Central angle at which the off-nadir limit meets the ground
+        angle = np.arcsin(min(ratio * np.sin(eta), 1.0)) - eta
+        if self.min_elevation_deg is not None:
+            eps = np.radians(self.min_elevation_deg)
+            angle = min(angle, np.arccos(np.cos(eps) / ratio) - eps)
+        return float(max(angle, 0.0) * EARTH_RADIUS_KM * RADIUS_MARGIN)
+
+    def accepts(self, geometry):
+        """
+        Returns a boolean mask of the capture_geometry() entries within the limits.
+        """
+        ok = geometry['off_nadir'] <= self.max_off_nadir_deg
+        if self.min_elevation_deg is not None:
+            ok &= geometry['elevation'] >= self.min_elevation_deg
+        if self.min_sun_elevation_deg is not None:
+            ok &= geometry['sun_elevation'] >= self.min_sun_elevation_deg
+        return ok
+
+    def _geometry(self, sat_xyz, epoch, targets, target_idx, index=None):
+        coords = np.asarray(targets, dtype=np.float64).reshape(-1, 2)[target_idx]
+        up = index.xyz[target_idx] if index is not None else to_unit_xyz(coords[:, 0], coords[:, 1])
+        target_xyz = np.stack(geodetic_to_ecef(coords[:, 0], coords[:, 1]), axis=-1)
+        sun = None
+        if self.min_sun_elevation_deg is not None:
+            # Sun positions per distinct time; tracks share their samples across many pairs
+            times, inverse = np.unique(epoch, return_inverse=True)
+            sun = sun_direction(times, self.ephemeris)[inverse]
+        count('geometry_evaluations', len(target_idx))
+        return capture_geometry(sat_xyz, target_xyz, up, sun)
+
+    @timed('sensor_geometry')
+    def track_captures(self, track, targets, index=None):
+        """
+        Finds every (track sample, target) pair within the sensor limits.
+
+        Args:
+            track (dict): 'epoch', 'lat', 'lon' and 'alt_km' arrays (T,), e.g. from
+                satellite.get_satellite_track(..., include_altitude=True).
+            targets (List[tuple]): List of target coordinates as (lat, lon).
+            index (TargetIndex): Prebuilt index over targets.
+
+        Returns:
+            dict: 'point' and 'target' index arrays plus the capture_geometry()
+                columns, sorted by point and then by target.
+        """
+        if index is None:
+            index = TargetIndex(targets)
+        alt = np.asarray(track['alt_km'], dtype=np.float64)
+        radius = self.access_radius_km(np.nanmax(alt, initial=0.0))
+        point_idx, target_idx = index.query_pairs(track['lat'], track['lon'], radius)
+        lat = np.asarray(track['lat'], dtype=np.float64)[point_idx]
+        lon = np.asarray(track['lon'], dtype=np.float64)[point_idx]
+        sat_xyz = np.stack(geodetic_to_ecef(lat, lon, alt[point_idx]), axis=-1)
+        epoch = np.asarray(track['epoch'], dtype=np.float64)[point_idx]
+        geometry = self._geometry(sat_xyz, epoch, targets, target_idx, index)
+        keep = self.accepts(geometry)
+        captures = {'point': point_idx[keep], 'target': target_idx[keep]}
+        captures.update((key, value[keep]) for key, value in geometry.items())
+        return captures
+
+    @timed('sensor_geometry')
+    def filter_windows(self, windows, satellites, targets, first=0, index=None):
+        """
+        Keeps the access windows whose closest approach is within the sensor limits.
+
+        Closest approach is where the off-nadir angle is smallest and the
+        elevation largest, so a window that fails there fails throughout.
+        The sun limit is also checked only at closest approach, the capture
+        time the schedulers use; a window is kept even if the sun is below
+        the limit elsewhere in it. Each satellite is propagated exactly at
+        its windows' closest times.
+
+        Args:
+            windows (dict): Output of access.access_windows, computed with a radius
+                of at least access_radius_km().
+            satellites (List[dict]): Each dict contains 'tle1' and 'tle2'.
+            targets (List[tuple]): List of target coordinates as (lat, lon).
+            first (int): Value of windows['sat'] for satellites[0].
+            index (TargetIndex): Prebuilt index over targets (its XYZ vectors are reused).
+
+        Returns:
+            dict: The windows that pass, with the same columns.
+        """
+        if len(windows['sat']) == 0:
+            return windows
+        satrecs = [Satrec.twoline2rv(sat['tle1'], sat['tle2']) for sat in satellites]
+        closest = windows['closest']
+        dut1 = ut1_offset(load.timescale(), closest[0])
+        sat_xyz = np.stack(propagate_pairs(satrecs, windows['sat'] - first, closest, dut1), axis=-1)
+        geometry = self._geometry(sat_xyz, closest, targets, windows['target'], index)
+        keep = self.accepts(geometry)
+        count('windows_rejected', int((~keep).sum()))
+        return {key: value[keep] for key, value in windows.items()}
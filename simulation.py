@@ -0,0 +1,232 @@
+# simulation.py
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import os
+
+from skyfield.api import load
+import numpy as np
+
+from access import access_windows, track_access_windows
+from constellation import propagate_constellation_at
+from ground_track import TRACK_COLUMNS, GroundTrack
+from instrumentation import Profiler, active, count, timed
+from propagation_cache import cache_key
+from satellite import grid_start, time_grid
+from scheduler import global_schedule
+from sensor import apogee_altitude_km
+from swath import swath_edges
+from target_index import TargetIndex
+
+# Per-process state of pool workers, built once by _init_worker
+_WORKER = {}
+
+# How often a parallel run checks for cancellation while waiting on workers
+CANCEL_POLL_SECONDS = 0.25
+
+class SimulationCancelled(Exception):
+    """
+    Raised by run_simulation when its cancel event is set.
+    """
+
+def _worker_state(targets, swath_radius_km, sensor=None):
+    return {
+        'ts': load.timescale(),
+        'targets': targets,
+        'index': TargetIndex(targets),
+        'swath_radius_km': swath_radius_km,
+        'sensor': sensor,
+    }
+
+def _init_worker(targets, swath_radius_km, sensor=None):
+    _WORKER.update(_worker_state(targets, swath_radius_km, sensor))
+
+def _run_chunk(first, satellites, tracks, start, duration_minutes, step_seconds, collect=False, state=None):
+    """
+    Propagates, computes swath edges and access windows for one chunk of satellites.
+
+    Satellites with an entry in tracks (cached float32 TRACK_COLUMNS) skip
+    propagation; the others are propagated together. Access windows are
+    always computed from the float32 tracks, so results do not depend on
+    whether a track came from the cache.
+
+    With a sensor model configured, windows failing its limits are dropped here.
+
+    With collect set (in worker processes), stage timings and counters are
+    gathered by a local Profiler and returned under 'profile'.
+
+    state holds the targets, index and settings (see _worker_state); pool
+    workers use their per-process _WORKER. Serial runs pass their own, so
+    concurrent runs in threads of one process do not share it.
+
+    Returns:
+        tuple: (first, result) where result holds (n, T) float32 track columns
+            and the chunk's access windows with global satellite indices.
+    """
+    if collect:
+        profiler = Profiler()
+        with profiler.activate():
+            first, result = _run_chunk(first, satellites, tracks, start, duration_minutes, step_seconds, state=state)
+        result['profile'] = profiler.to_dict()
+        return first, result
+    if state is None:
+        state = _WORKER
+    t_array, epoch = time_grid(state['ts'], duration_minutes, step_seconds, start)
+    missing = [i for i, track in enumerate(tracks) if track is None]
+    tracks = list(tracks)
+    if missing:
+        constellation = propagate_constellation_at([satellites[i] for i in missing], t_array, epoch)
+        lat, lon = constellation['lat'], constellation['lon']
+        left_lat, left_lon, right_lat, right_lon = swath_edges(lat, lon, state['swath_radius_km'])
+        columns = dict(zip(TRACK_COLUMNS, (lat, lon, left_lat, left_lon, right_lat, right_lon)))
+        for row, i in enumerate(missing):
+            tracks[i] = {key: columns[key][row].astype(np.float32) for key in TRACK_COLUMNS}
+
+    parts = []
+    for i, track in enumerate(tracks):
+        windows = track_access_windows(
+            {'epoch': epoch, 'lat': track['lat'].astype(np.float64), 'lon': track['lon'].astype(np.float64)},
+            state['targets'], state['swath_radius_km'], state['index']
+        )
+        windows['sat'] = np.full(len(windows['target']), first + i, dtype=np.int64)
+        parts.append(windows)
+    result = {key: np.stack([track[key] for track in tracks]) for key in TRACK_COLUMNS}
+    result['epoch'] = epoch
+    result['windows'] = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    if state['sensor'] is not None:
+        result['windows'] = state['sensor'].filter_windows(
+            result['windows'], satellites, state['targets'], first, state['index']
+        )
+    return first, result
+
+@timed('simulation')
+def run_simulation(satellites, targets, duration_minutes=90, step_seconds=60, swath_radius_km=75,
+                   workers=None, chunk_size=16, mode='earliest', min_gap_seconds=0.0,
+                   max_tasks_per_satellite=None, progress=None, cache=None, start=None,
+                   on_chunk=None, cancel=None, sensor=None):
+    """
+    Runs propagation, swath edges, access windows and global scheduling for a constellation.
+
+    Satellites are split into chunks that are processed in parallel by a
+    ProcessPoolExecutor; with workers=1 everything runs in the calling process.
+    Results are assembled in satellite order regardless of completion order.
+
+    Args:
+        satellites (List[dict]): Each dict contains 'name', 'tle1' and 'tle2'.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        duration_minutes (int): Total simulation duration in minutes.
+        step_seconds (int): Time interval in seconds for sampling positions.
+        swath_radius_km (float): Radius within which a target is considered captured.
+        workers (int): Number of worker processes (default: os.cpu_count()).
+        chunk_size (int): Satellites per task sent to a worker.
+        mode (str): Scheduling mode, see scheduler.global_schedule.
+        min_gap_seconds (float): Minimum time between two captures of one satellite.
+        max_tasks_per_satellite (int): Optional cap on captures per satellite.
+        progress (callable): Called as progress(done, total) after each
+            satellite chunk completes.
+        cache (PropagationCache): Optional cache of per-satellite tracks and
+            swath edges; cached satellites are not propagated again.
+        start (datetime): UTC start of the time grid in whole minutes
+            (default: the current minute).
+        on_chunk (callable): Called as on_chunk(first, result) as each chunk
+            completes, with its 'epoch', float32 TRACK_COLUMNS rows starting at
+            satellite first and its 'windows'; used to show partial results.
+        cancel (threading.Event): When set, pending chunks are dropped and
+            SimulationCancelled is raised.
+        sensor (SensorModel): Optional sensor geometry; swath_radius_km is then
+            replaced by the sensor's access radius at the highest apogee, and
+            only windows within its off-nadir, elevation and sun limits are kept.
+
+    Returns:
+        dict: 'names', 'epoch' (T,), float32 (N, T) arrays for each of
+            TRACK_COLUMNS, 'windows' (see access.access_windows) and
+            'schedule' (see scheduler.global_schedule).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if sensor is not None:
+        swath_radius_km = sensor.access_radius_km(apogee_altitude_km(satellites))
+        sensor.load_ephemeris()
+    if start is None:
+        start = grid_start(load.timescale())
+    keys = [
+        cache_key(sat['tle1'], sat['tle2'], start.timestamp(), duration_minutes, step_seconds, swath_radius_km)
+        for sat in satellites
+    ]
+    tracks = [cache.get(key) if cache is not None else None for key in keys]
+    count('cache_hits', sum(track is not None for track in tracks))
+    chunks = [
+        (first, satellites[first:first + chunk_size], tracks[first:first + chunk_size])
+        for first in range(0, len(satellites), chunk_size)
+    ]
+    results = {}
+
+    profiler = active()
+    if workers <= 1 or len(chunks) <= 1:
+        state = _worker_state(targets, swath_radius_km, sensor)
+        for first, chunk, chunk_tracks in chunks:
+            if cancel is not None and cancel.is_set():
+                raise SimulationCancelled()
+            results[first] = _run_chunk(first, chunk, chunk_tracks, start, duration_minutes, step_seconds, state=state)[1]
+            if on_chunk is not None:
+                on_chunk(first, results[first])
+            if progress is not None:
+                progress(len(results), len(chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(targets, swath_radius_km, sensor)) as executor:
+            futures = [
+                executor.submit(_run_chunk, first, chunk, chunk_tracks, start, duration_minutes, step_seconds,
+                                profiler is not None)
+                for first, chunk, chunk_tracks in chunks
+            ]
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    first, result = future.result()
+                    if profiler is not None:
+                        profiler.merge(result.pop('profile'))
+                    results[first] = result
+                    if on_chunk is not None:
+                        on_chunk(first, result)
+                    if progress is not None:
+                        progress(len(results), len(chunks))
+                if pending and cancel is not None and cancel.is_set():
+                    for future in pending:
+                        future.cancel()
+                    raise SimulationCancelled()
+
+    _, epoch = time_grid(load.timescale(), duration_minutes, step_seconds, start)
+    ordered = [results[first] for first, _, _ in chunks]
+    if cache is not None:
+        for first, chunk, chunk_tracks in chunks:
+            for i, track in enumerate(chunk_tracks):
+                if track is None:
+                    cache.put(keys[first + i], {key: results[first][key][i].copy() for key in TRACK_COLUMNS})
+    simulation = {'names': [sat['name'] for sat in satellites], 'epoch': epoch}
+    for key in TRACK_COLUMNS:
+        if ordered:
+            simulation[key] = np.concatenate([result[key] for result in ordered])
+        else:
+            simulation[key] = np.empty((0, len(epoch)), dtype=np.float32)
+    if ordered:
+        simulation['windows'] = {
+            key: np.concatenate([result['windows'][key] for result in ordered])
+            for key in ordered[0]['windows']
+        }
+    else:
+        simulation['windows'] = access_windows(simulation, targets, swath_radius_km)
+    simulation['schedule'] = global_schedule(
+        simulation['windows'], targets, len(satellites),
+        mode, min_gap_seconds, max_tasks_per_satellite
+    )
+    return simulation
+
+def to_sat_data_list(simulation):
+    """
+    Converts a simulation result into the list-of-dicts format used by the visualizer.
+
+    Returns:
+        List[dict]: Each dict contains 'name', 'path', 'left_edge', 'right_edge' and 'captured'.
+    """
+    track = GroundTrack.from_simulation(simulation).astype(np.float64)
+    return track.to_sat_data_list(simulation['schedule']['tasks'])
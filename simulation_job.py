@@ -0,0 +1,119 @@
+# simulation_job.py
+import threading
+
+import numpy as np
+
+from ground_track import TRACK_COLUMNS
+from instrumentation import Profiler
+from simulation import SimulationCancelled, run_simulation
+
+class SimulationJob:
+    """
+    Runs a simulation in a background thread so the UI can keep rendering.
+
+    The job is meant to live in st.session_state: each rerun polls status
+    and progress, shows partial() results, and adopts result once the job
+    is done. Reruns with the same key reuse the job that is already running
+    instead of starting over.
+    """
+
+    def __init__(self, satellites, targets, key=None, function=run_simulation, capture=None, **kwargs):
+        """
+        Args:
+            satellites (List[dict]): Each dict contains 'name', 'tle1' and 'tle2'.
+            targets (List[tuple] or TargetStore): Target coordinates the job runs against.
+            key: Identifies the inputs, so callers can tell whether the job is still current.
+            function (callable): simulation.run_simulation or streaming.run_streaming;
+                partial results are only available from run_simulation.
+            capture (str): Optional whole-run profiler for the job thread,
+                see instrumentation.CAPTURE_MODES.
+            **kwargs: Passed on to function.
+        """
+        self.key = key
+        self.satellites = list(satellites)
+        # A slice copies a list (which the session may keep editing) and keeps a TargetStore's priorities
+        self.targets = targets[:]
+        self.names = [sat['name'] for sat in self.satellites]
+        self.status = 'pending'
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.profiler = Profiler(capture)
+        self._function = function
+        self._kwargs = kwargs
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._chunks = {}
+        self._thread = threading.Thread(target=self._run, name="simulation-job", daemon=True)
+
+    def start(self):
+        self.status = 'running'
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """
+        Asks the job to stop; it finishes the chunks already being computed.
+        """
+        self._cancel.set()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'cancelled', 'failed')
+
+    @property
+    def abandoned(self):
+        """
+        Whether the job was cancelled (possibly still winding down) or failed,
+        so it will never produce a result.
+        """
+        return self._cancel.is_set() or self.status in ('cancelled', 'failed')
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        kwargs = dict(self._kwargs, progress=self._progress, cancel=self._cancel)
+        if self._function is run_simulation:
+            kwargs['on_chunk'] = self._on_chunk
+        try:
+            with self.profiler.activate():
+                self.result = self._function(self.satellites, self.targets, **kwargs)
+            self.status = 'done'
+        except SimulationCancelled:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.error = e
+            self.status = 'failed'
+
+    def _progress(self, done, total):
+        self.done, self.total = done, total
+
+    def _on_chunk(self, first, result):
+        with self._lock:
+            self._chunks[first] = result
+
+    def partial(self):
+        """
+        Returns the satellites completed so far in the run_simulation layout.
+
+        Returns:
+            dict: 'names', 'epoch', float32 (n, T) TRACK_COLUMNS and 'windows'
+                for the n completed satellites (in constellation order, with
+                'sat' indexing into them), or None before the first chunk.
+        """
+        with self._lock:
+            chunks = sorted(self._chunks.items())
+        if not chunks:
+            return None
+        rows = np.concatenate([np.arange(first, first + len(result['lat'])) for first, result in chunks])
+        position = np.full(len(self.names), -1, dtype=np.int64)
+        position[rows] = np.arange(len(rows))
+        partial = {'names': [self.names[i] for i in rows.tolist()], 'epoch': chunks[0][1]['epoch']}
+        for key in TRACK_COLUMNS:
+            partial[key] = np.concatenate([result[key] for _, result in chunks])
+        windows = {key: np.concatenate([result['windows'][key] for _, result in chunks]) for key in chunks[0][1]['windows']}
+        windows['sat'] = position[windows['sat']]
+        partial['windows'] = windows
+        return partial
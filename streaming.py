@@ -0,0 +1,237 @@
+# streaming.py
+import os
+
+from skyfield.api import load
+import numpy as np
+
+from access import access_windows
+from constellation import propagate_constellation_at
+from ground_track import TRACK_COLUMNS
+from instrumentation import count, timed
+from satellite import grid_start
+from scheduler import global_schedule
+from sensor import apogee_altitude_km
+from simulation import SimulationCancelled
+from swath import swath_edges
+from table_io import TableWriter, captures_table, tracks_table, windows_table
+from target_index import TargetIndex
+
+DEFAULT_CHUNK_MINUTES = 360
+
+# Samples per satellite kept for the map preview of a streamed run
+DEFAULT_PREVIEW_SAMPLES = 2000
+
+WINDOW_COLUMNS = ('sat', 'target', 'start', 'end', 'closest', 'min_distance_km')
+
+def time_chunks(ts, start, duration_minutes, step_seconds, chunk_minutes=DEFAULT_CHUNK_MINUTES):
+    """
+    Splits the simulation time grid into consecutive chunks.
+
+    Each chunk repeats the last sample of the previous one, so the track
+    segment across a chunk boundary is covered. The samples match
+    satellite.time_grid for the same start.
+
+    Yields:
+        tuple: (index, t_array, epoch) with the global sample indices, a
+            skyfield Time array and POSIX seconds of the chunk.
+    """
+    total = int(np.ceil(duration_minutes * 60 / step_seconds))
+    per_chunk = max(1, int(chunk_minutes * 60 // step_seconds))
+    for first in range(0, max(total - 1, 1), per_chunk):
+        index = np.arange(first, min(first + per_chunk, total - 1) + 1)
+        offsets = index * step_seconds
+        t_array = ts.utc(start.year, start.month, start.day, start.hour, start.minute, offsets)
+        yield index, t_array, start.timestamp() + offsets.astype(np.float64)
+
+def stream_tracks(satellites, start, duration_minutes, step_seconds, swath_radius_km=75,
+                  chunk_minutes=DEFAULT_CHUNK_MINUTES):
+    """
+    Propagates a constellation one time chunk at a time.
+
+    Only the current chunk is held in memory, so peak memory depends on
+    chunk_minutes and the number of satellites, not on the horizon.
+
+    Yields:
+        dict: 'index' (global sample indices), 'epoch' (POSIX seconds),
+            'names' and (N, T) float64 arrays for each of TRACK_COLUMNS.
+    """
+    ts = load.timescale()
+    for index, t_array, epoch in time_chunks(ts, start, duration_minutes, step_seconds, chunk_minutes):
+        chunk = propagate_constellation_at(satellites, t_array, epoch)
+        chunk['index'] = index
+        edges = swath_edges(chunk['lat'], chunk['lon'], swath_radius_km)
+        chunk.update(zip(TRACK_COLUMNS[2:], edges))
+        yield chunk
+
+def stream_windows(chunks, targets, swath_radius_km=75, index=None):
+    """
+    Computes access windows chunk by chunk, stitching windows across chunk boundaries.
+
+    A window still open at the end of a chunk is held back until the next
+    chunk closes it; all other windows are yielded as soon as their chunk
+    has been processed. Tangents at chunk edges are one-sided, so window
+    times can differ slightly from a single-pass access.access_windows run.
+
+    Args:
+        chunks (Iterable[dict]): Output of stream_tracks.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        swath_radius_km (float): Radius within which a target is visible.
+        index (TargetIndex): Prebuilt index over targets.
+
+    Yields:
+        tuple: (chunk, windows) where windows holds the windows closed in
+            that track chunk (columns as access.access_windows). A final
+            (None, windows) pair holds the windows open at the end of the horizon.
+    """
+    if index is None:
+        index = TargetIndex(targets)
+    pending = {}
+    for chunk in chunks:
+        windows = _stitch(pending, access_windows(chunk, targets, swath_radius_km, index), chunk['epoch'][0])
+        still_open = windows['end'] >= chunk['epoch'][-1]
+        pending = {
+            (int(windows['sat'][k]), int(windows['target'][k])): {column: windows[column][k] for column in WINDOW_COLUMNS}
+            for k in np.flatnonzero(still_open).tolist()
+        }
+        yield chunk, {column: value[~still_open] for column, value in windows.items()}
+    # Windows still open at the end of the horizon
+    yield None, _from_records(list(pending.values()))
+
+def _stitch(pending, windows, chunk_start):
+    # Windows starting at the chunk's first sample continue a pending window of the same pair
+    if not pending:
+        return windows
+    windows = {column: value.copy() for column, value in windows.items()}
+    continued = set()
+    for k in np.flatnonzero(windows['start'] <= chunk_start).tolist():
+        key = (int(windows['sat'][k]), int(windows['target'][k]))
+        previous = pending.get(key)
+        if previous is None:
+            continue
+        continued.add(key)
+        windows['start'][k] = previous['start']
+        if previous['min_distance_km'] <= windows['min_distance_km'][k]:
+            windows['closest'][k] = previous['closest']
+            windows['min_distance_km'][k] = previous['min_distance_km']
+    # Pending windows that did not continue ended exactly at the boundary
+    closed = [window for key, window in pending.items() if key not in continued]
+    if not closed:
+        return windows
+    extra = _from_records(closed)
+    return {column: np.concatenate((windows[column], extra[column])) for column in WINDOW_COLUMNS}
+
+def _from_records(records):
+    return {
+        column: np.array([record[column] for record in records],
+                         dtype=np.int64 if column in ('sat', 'target') else np.float64)
+        for column in WINDOW_COLUMNS
+    }
+
+@timed('streaming')
+def run_streaming(satellites, targets, duration_minutes=1440, step_seconds=10, swath_radius_km=75,
+                  chunk_minutes=DEFAULT_CHUNK_MINUTES, mode='earliest', min_gap_seconds=0.0,
+                  max_tasks_per_satellite=None, start=None, output_dir=None, fmt='csv',
+                  write_tracks=True, preview_samples=DEFAULT_PREVIEW_SAMPLES, progress=None, cancel=None,
+                  sensor=None):
+    """
+    Long-horizon variant of simulation.run_simulation with bounded memory.
+
+    Tracks are propagated and turned into access windows one time chunk at a
+    time and discarded afterwards. Only the access windows (one row per
+    satellite pass over a target) and a decimated preview of the tracks for
+    the map are kept. With output_dir set, tracks and windows are appended to
+    tracks.<fmt> and windows.<fmt> as each chunk completes, and the schedule
+    is written to captures.<fmt> at the end.
+
+    Args:
+        satellites (List[dict]): Each dict contains 'name', 'tle1' and 'tle2'.
+        targets (List[tuple]): List of target coordinates as (lat, lon).
+        duration_minutes (int): Total simulation duration in minutes.
+        step_seconds (int): Time interval in seconds for sampling positions.
+        swath_radius_km (float): Radius within which a target is considered captured.
+        chunk_minutes (int): Horizon propagated per chunk.
+        mode (str): Scheduling mode, see scheduler.global_schedule.
+        min_gap_seconds (float): Minimum time between two captures of one satellite.
+        max_tasks_per_satellite (int): Optional cap on captures per satellite.
+        start (datetime): UTC start of the time grid in whole minutes
+            (default: the current minute).
+        output_dir (str): Optional directory for progressive output files.
+        fmt (str): Output format, 'csv' or 'parquet'.
+        write_tracks (bool): Also write the per-step tracks.
+        preview_samples (int): Approximate samples per satellite kept in memory for plotting.
+        progress (callable): Called as progress(done, total) after each chunk.
+        cancel (threading.Event): When set, the run stops after the current
+            chunk and raises simulation.SimulationCancelled.
+        sensor (SensorModel): Optional sensor geometry, see simulation.run_simulation.
+
+    Returns:
+        dict: 'names', 'epoch' and float32 (N, T) TRACK_COLUMNS of the preview,
+            plus 'windows' and 'schedule' for the whole horizon (see run_simulation).
+    """
+    if start is None:
+        start = grid_start(load.timescale())
+    if sensor is not None:
+        swath_radius_km = sensor.access_radius_km(apogee_altitude_km(satellites))
+    index = TargetIndex(targets)
+    names = [sat['name'] for sat in satellites]
+    total = int(np.ceil(duration_minutes * 60 / step_seconds))
+    per_chunk = max(1, int(chunk_minutes * 60 // step_seconds))
+    n_chunks = max(1, int(np.ceil((total - 1) / per_chunk)))
+    stride = max(1, int(np.ceil(total / preview_samples)))
+
+    writers = {}
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        outputs = ('tracks', 'windows') if write_tracks else ('windows',)
+        writers = {name: TableWriter(os.path.join(output_dir, f"{name}.{fmt}"), fmt) for name in outputs}
+
+    preview = {key: [] for key in ('epoch',) + TRACK_COLUMNS}
+    parts = []
+    done = 0
+    try:
+        chunks = stream_tracks(satellites, start, duration_minutes, step_seconds, swath_radius_km, chunk_minutes)
+        for chunk, windows in stream_windows(_counted(chunks), targets, swath_radius_km, index):
+            if sensor is not None:
+                windows = sensor.filter_windows(windows, satellites, targets, index=index)
+            parts.append(windows)
+            if 'windows' in writers:
+                writers['windows'].write(windows_table(names, windows, targets))
+            if chunk is None:
+                continue
+            if cancel is not None and cancel.is_set():
+                raise SimulationCancelled()
+            # The first sample of every chunk after the first repeats the previous chunk's last one
+            new = slice(0 if chunk['index'][0] == 0 else 1, None)
+            if 'tracks' in writers:
+                writers['tracks'].write(tracks_table(names, chunk['epoch'][new], {key: chunk[key][:, new] for key in TRACK_COLUMNS}))
+            keep = (chunk['index'] % stride == 0) | (chunk['index'] == total - 1)
+            keep[:new.start] = False
+            preview['epoch'].append(chunk['epoch'][keep])
+            for key in TRACK_COLUMNS:
+                preview[key].append(chunk[key][:, keep].astype(np.float32))
+            done += 1
+            if progress is not None:
+                progress(done, n_chunks)
+
+        windows = {column: np.concatenate([part[column] for part in parts]) for column in WINDOW_COLUMNS}
+        order = np.lexsort((windows['start'], windows['target'], windows['sat']))
+        windows = {column: value[order] for column, value in windows.items()}
+        schedule = global_schedule(windows, targets, len(satellites), mode, min_gap_seconds, max_tasks_per_satellite)
+        if output_dir is not None:
+            with TableWriter(os.path.join(output_dir, f"captures.{fmt}"), fmt) as writer:
+                writer.write(captures_table(names, schedule['tasks']))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    result = {'names': names, 'epoch': np.concatenate(preview['epoch'])}
+    for key in TRACK_COLUMNS:
+        result[key] = np.concatenate(preview[key], axis=1)
+    result['windows'] = windows
+    result['schedule'] = schedule
+    return result
+
+def _counted(chunks):
+    for chunk in chunks:
+        count('stream_chunks')
+        yield chunk
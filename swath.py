@@ -0,0 +1,157 @@
+# swath.py
+import numpy as np
+
+from instrumentation import timed
+
+# Mean Earth radius, as used by geopy's great_circle
+EARTH_RADIUS_KM = 6371.009
+
+# WGS84 ellipsoid, as used by geopy's geodesic distance
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B_KM = WGS84_A_KM * (1 - WGS84_F)
+
+# Agreement with geopy's distance().destination() for swath radii up to a few
+# hundred km: the WGS84 model matches it to within this many degrees, while the
+# spherical model places edges up to ~0.5% of the swath radius away (~400 m at 75 km).
+WGS84_TOLERANCE_DEG = 1e-8
+
+def track_bearings(lat, lon):
+    """
+    Computes the initial bearing of a ground track at every point.
+
+    Each point uses the bearing towards the next point; the last point reuses
+    the bearing from the previous point, matching satellite.compute_bearing.
+
+    Args:
+        lat (np.ndarray): Track latitudes in degrees, time along the last axis
+            (several tracks can be stacked as rows).
+        lon (np.ndarray): Track longitudes in degrees.
+
+    Returns:
+        np.ndarray: Compass bearings in degrees [0, 360).
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    if lat.shape[-1] < 2:
+        return np.zeros_like(lat)
+    lat1, lat2 = lat[..., :-1], lat[..., 1:]
+    diff_long = lon[..., 1:] - lon[..., :-1]
+    x = np.sin(diff_long) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(diff_long)
+    bearing = (np.degrees(np.arctan2(x, y)) + 360) % 360
+    return np.concatenate((bearing, bearing[..., -1:]), axis=-1)
+
+def destination_spherical(lat, lon, bearing, distance_km):
+    """
+    Destination points on a sphere of radius EARTH_RADIUS_KM.
+
+    Args:
+        lat, lon (np.ndarray): Start points in degrees.
+        bearing (np.ndarray): Initial bearings in degrees.
+        distance_km (float or np.ndarray): Distances to travel.
+
+    Returns:
+        tuple: (lat, lon) arrays of destination points in degrees.
+    """
+    lat1 = np.radians(lat)
+    lon1 = np.radians(lon)
+    theta = np.radians(bearing)
+    delta = np.asarray(distance_km) / EARTH_RADIUS_KM
+    sin_lat2 = np.sin(lat1) * np.cos(delta) + np.cos(lat1) * np.sin(delta) * np.cos(theta)
+    lat2 = np.arcsin(np.clip(sin_lat2, -1.0, 1.0))
+    lon2 = lon1 + np.arctan2(
+        np.sin(theta) * np.sin(delta) * np.cos(lat1),
+        np.cos(delta) - np.sin(lat1) * sin_lat2
+    )
+    return np.degrees(lat2), _wrap_longitude(np.degrees(lon2))
+
+def destination_wgs84(lat, lon, bearing, distance_km, max_iterations=20):
+    """
+    Destination points on the WGS84 ellipsoid (vectorized Vincenty direct).
+
+    Args:
+        lat, lon (np.ndarray): Start points in degrees.
+        bearing (np.ndarray): Initial bearings in degrees.
+        distance_km (float or np.ndarray): Distances to travel.
+        max_iterations (int): Upper bound on the sigma iterations.
+
+    Returns:
+        tuple: (lat, lon) arrays of destination points in degrees.
+    """
+    a, b, f = WGS84_A_KM, WGS84_B_KM, WGS84_F
+    alpha1 = np.radians(bearing)
+    sin_alpha1 = np.sin(alpha1)
+    cos_alpha1 = np.cos(alpha1)
+
+    tan_u1 = (1 - f) * np.tan(np.radians(lat))
+    cos_u1 = 1 / np.sqrt(1 + tan_u1 ** 2)
+    sin_u1 = tan_u1 * cos_u1
+    sigma1 = np.arctan2(tan_u1, cos_alpha1)
+    sin_alpha = cos_u1 * sin_alpha1
+    cos_sq_alpha = 1 - sin_alpha ** 2
+    u_sq = cos_sq_alpha * (a ** 2 - b ** 2) / b ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+
+    sigma_0 = np.asarray(distance_km) / (b * big_a)
+    sigma = sigma_0
+    for _ in range(max_iterations):
+        cos_2sigma_m = np.cos(2 * sigma1 + sigma)
+        sin_sigma = np.sin(sigma)
+        cos_sigma = np.cos(sigma)
+        delta_sigma = big_b * sin_sigma * (cos_2sigma_m + big_b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+        ))
+        sigma_next = sigma_0 + delta_sigma
+        converged = np.nanmax(np.abs(sigma_next - sigma), initial=0.0) < 1e-12
+        sigma = sigma_next
+        if converged:
+            break
+
+    cos_2sigma_m = np.cos(2 * sigma1 + sigma)
+    sin_sigma = np.sin(sigma)
+    cos_sigma = np.cos(sigma)
+    tmp = sin_u1 * sin_sigma - cos_u1 * cos_sigma * cos_alpha1
+    lat2 = np.arctan2(
+        sin_u1 * cos_sigma + cos_u1 * sin_sigma * cos_alpha1,
+        (1 - f) * np.sqrt(sin_alpha ** 2 + tmp ** 2)
+    )
+    lam = np.arctan2(sin_sigma * sin_alpha1, cos_u1 * cos_sigma - sin_u1 * sin_sigma * cos_alpha1)
+    c = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+    big_l = lam - (1 - c) * f * sin_alpha * (
+        sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+    )
+    return np.degrees(lat2), _wrap_longitude(np.asarray(lon) + np.degrees(big_l))
+
+@timed('swath_edges')
+def swath_edges(lat, lon, swath_radius_km=75, model='wgs84'):
+    """
+    Computes the left and right swath edge lines for a whole ground track.
+
+    Args:
+        lat (np.ndarray): Track latitudes in degrees, time along the last axis.
+        lon (np.ndarray): Track longitudes in degrees.
+        swath_radius_km (float): Distance from the track to each edge.
+        model (str): 'wgs84' (matches geopy's geodesic destination) or
+            'spherical' (faster, less accurate; see WGS84_TOLERANCE_DEG).
+
+    Returns:
+        tuple: (left_lat, left_lon, right_lat, right_lon) arrays in degrees.
+    """
+    if model == 'wgs84':
+        destination = destination_wgs84
+    elif model == 'spherical':
+        destination = destination_spherical
+    else:
+        raise ValueError(f"Unknown swath model: {model!r}")
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    bearing = track_bearings(lat, lon)
+    left_lat, left_lon = destination(lat, lon, (bearing - 90) % 360, swath_radius_km)
+    right_lat, right_lon = destination(lat, lon, (bearing + 90) % 360, swath_radius_km)
+    return left_lat, left_lon, right_lat, right_lon
+
+def _wrap_longitude(lon):
+    return (lon + 180) % 360 - 180
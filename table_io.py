@@ -0,0 +1,180 @@
+# table_io.py
+import csv
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ground_track import TRACK_COLUMNS
+
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+# Columns holding POSIX seconds; written as ISO 8601 in CSV and as timestamps in Parquet (NaN as empty/null)
+TIME_COLUMNS = ('time', 'start', 'end', 'closest', 'rise', 'culmination', 'set')
+
+def captures_table(names, tasks):
+    """
+    Flattens a schedule into columns, one row per capture.
+
+    Args:
+        names (List[str]): Satellite names.
+        tasks (List[List[dict]]): Capture records per satellite, see scheduler.global_schedule.
+
+    Returns:
+        dict: 'satellite', 'target_lat', 'target_lon', 'time', 'start' and
+            'end' (POSIX seconds) arrays.
+    """
+    rows = [
+        (name, task['target'][0], task['target'][1], task['time'].timestamp(),
+         task['start'].timestamp(), task['end'].timestamp())
+        for name, sat_tasks in zip(names, tasks)
+        for task in sat_tasks
+    ]
+    columns = list(zip(*rows)) if rows else [[]] * 6
+    return {
+        'satellite': np.array(columns[0], dtype=object),
+        'target_lat': np.array(columns[1], dtype=np.float64),
+        'target_lon': np.array(columns[2], dtype=np.float64),
+        'time': np.array(columns[3], dtype=np.float64),
+        'start': np.array(columns[4], dtype=np.float64),
+        'end': np.array(columns[5], dtype=np.float64),
+    }
+
+def tracks_table(names, epoch, columns):
+    """
+    Flattens tracks and swath edges into columns, one row per satellite and time step.
+
+    Args:
+        names (List[str]): Satellite names.
+        epoch (np.ndarray): POSIX seconds (T,).
+        columns (dict): (N, T) arrays for each of TRACK_COLUMNS.
+
+    Returns:
+        dict: 'satellite', 'time' (POSIX seconds) and the TRACK_COLUMNS arrays.
+    """
+    table = {
+        'satellite': np.repeat(np.array(names, dtype=object), len(epoch)),
+        'time': np.tile(epoch, len(names)),
+    }
+    for key in TRACK_COLUMNS:
+        table[key] = np.asarray(columns[key]).reshape(-1)
+    return table
+
+def windows_table(names, windows, targets):
+    """
+    Flattens access windows into columns, one row per window.
+
+    Returns:
+        dict: 'satellite', 'target_lat', 'target_lon', 'start', 'end',
+            'closest' (POSIX seconds) and 'min_distance_km' arrays.
+    """
+    target_arr = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+    return {
+        'satellite': np.array(names, dtype=object)[windows['sat']] if len(names) else np.empty(0, dtype=object),
+        'target_lat': target_arr[windows['target'], 0],
+        'target_lon': target_arr[windows['target'], 1],
+        'start': windows['start'],
+        'end': windows['end'],
+        'closest': windows['closest'],
+        'min_distance_km': windows['min_distance_km'],
+    }
+
+def passes_table(names, passes):
+    """
+    Flattens predicted ground-station passes into columns, one row per pass.
+
+    Args:
+        names (List[str]): Satellite names.
+        passes (dict): Output of passes.predict_passes.
+
+    Returns:
+        dict: 'satellite', 'rise', 'culmination', 'set' (POSIX seconds, NaN
+            outside the horizon), 'max_elevation' and the azimuth arrays.
+    """
+    table = {'satellite': np.array(names, dtype=object)[passes['sat']] if len(names) else np.empty(0, dtype=object)}
+    for key, value in passes.items():
+        if key != 'sat':
+            table[key] = value
+    return table
+
+class TableWriter:
+    """
+    Appends dicts of equal-length columns to one CSV or Parquet file.
+
+    The file is created on the first write, so tables can be written chunk
+    by chunk without holding the whole result in memory. Parquet output
+    requires pyarrow.
+    """
+
+    def __init__(self, path, fmt='csv'):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {fmt!r}")
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, table):
+        if self.fmt == 'parquet':
+            self._write_parquet(table)
+        else:
+            self._write_csv(table)
+        self.rows += len(next(iter(table.values())))
+
+    def _write_csv(self, table):
+        if self._writer is None:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(list(table))
+        columns = []
+        for key, value in table.items():
+            if key in TIME_COLUMNS:
+                columns.append([
+                    datetime.fromtimestamp(e, tz=timezone.utc).isoformat() if e == e else ''
+                    for e in value.tolist()
+                ])
+            else:
+                columns.append(value.tolist())
+        self._writer.writerows(zip(*columns))
+
+    def _write_parquet(self, table):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow; install it or use the csv format")
+        arrays = {}
+        for key, value in table.items():
+            if key in TIME_COLUMNS:
+                missing = np.isnan(value)
+                micros = np.where(missing, 0, value * 1e6).astype(np.int64)
+                arrays[key] = pa.array(micros, type=pa.timestamp('us', tz='UTC'), mask=missing)
+            elif value.dtype == object:
+                arrays[key] = pa.array(value.tolist(), type=pa.string())
+            else:
+                arrays[key] = pa.array(value)
+        batch = pa.table(arrays)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, batch.schema)
+        self._writer.write_table(batch)
+
+    def close(self):
+        if self._writer is not None and self.fmt == 'parquet':
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        self._writer = None
+        self._file = None
+
+def write_table(table, path, fmt='csv'):
+    """
+    Writes a dict of equal-length columns to a CSV or Parquet file.
+    """
+    with TableWriter(path, fmt) as writer:
+        writer.write(table)
@@ -0,0 +1,135 @@
+# target_index.py
+import numpy as np
+
+from swath import EARTH_RADIUS_KM
+
+# Upper bound on (query point, neighbour cell) combinations examined at once
+QUERY_CHUNK = 1 << 20
+
+def to_unit_xyz(lat, lon):
+    """
+    Converts latitude/longitude in degrees to unit vectors on the sphere.
+
+    Returns:
+        np.ndarray: Array of shape (..., 3).
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)), axis=-1)
+
+class TargetIndex:
+    """
+    Uniform-grid spatial index over ground targets.
+
+    Targets are stored as unit-sphere XYZ vectors bucketed into cubic cells,
+    so a radius query only inspects the cells around each query point
+    instead of every target.
+    """
+
+    def __init__(self, targets, cell_km=100.0):
+        """
+        Args:
+            targets (List[tuple], np.ndarray or TargetStore): Target coordinates
+                as (lat, lon); a TargetStore's precomputed XYZ vectors are reused.
+            cell_km (float): Approximate cell edge length on the ground.
+        """
+        self.targets = targets
+        xyz = getattr(targets, 'xyz', None)
+        if xyz is None:
+            coords = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+            xyz = to_unit_xyz(coords[:, 0], coords[:, 1])
+        self.xyz = xyz
+        self.cell = cell_km / EARTH_RADIUS_KM
+        self._offset = int(np.ceil(1.0 / self.cell)) + 2
+        self._dim = 2 * self._offset + 1
+
+        keys = self._keys(self._cells(self.xyz))
+        self._order = np.argsort(keys, kind='stable')
+        self._cell_keys, self._cell_starts, self._cell_counts = np.unique(
+            keys[self._order], return_index=True, return_counts=True
+        )
+
+    def __len__(self):
+        return len(self.xyz)
+
+    def _cells(self, xyz):
+        return np.floor(xyz / self.cell).astype(np.int64)
+
+    def _keys(self, cells):
+        shifted = cells + self._offset
+        return (shifted[..., 0] * self._dim + shifted[..., 1]) * self._dim + shifted[..., 2]
+
+    def query_pairs(self, lat, lon, radius_km):
+        """
+        Finds every (query point, target) pair within radius_km of each other.
+
+        Args:
+            lat, lon (np.ndarray): Query points in degrees.
+            radius_km (float): Great-circle search radius.
+
+        Returns:
+            tuple: (point_idx, target_idx) integer arrays, sorted by point and
+                then by target index.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        valid = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        empty = np.empty(0, dtype=np.int64)
+        if len(self) == 0 or len(valid) == 0:
+            return empty, empty
+
+        points = to_unit_xyz(lat[valid], lon[valid])
+        angle = radius_km / EARTH_RADIUS_KM
+        chord = 2 * np.sin(min(angle, np.pi) / 2)
+        reach = int(np.ceil(chord / self.cell))
+        cells = self._cells(points)
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, steps, indexing='ij'), axis=-1).reshape(-1, 3)
+        # Drop corner cells that cannot intersect the search sphere
+        offsets = offsets[np.linalg.norm(np.maximum(np.abs(offsets) - 1, 0), axis=1) * self.cell <= chord]
+
+        point_parts = []
+        target_parts = []
+        chunk = max(1, QUERY_CHUNK // len(offsets))
+        for first in range(0, len(cells), chunk):
+            neighbours = (cells[first:first + chunk, None, :] + offsets[None, :, :]).reshape(-1, 3)
+            owners = np.repeat(np.arange(first, min(first + chunk, len(cells))), len(offsets))
+            keys = self._keys(neighbours)
+            pos = np.searchsorted(self._cell_keys, keys)
+            pos = np.minimum(pos, len(self._cell_keys) - 1)
+            found = (self._cell_keys[pos] == keys) & (np.abs(neighbours) <= self._offset).all(axis=1)
+            if not found.any():
+                continue
+            starts = self._cell_starts[pos[found]]
+            counts = self._cell_counts[pos[found]]
+            # Position of each candidate inside its cell run
+            run = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            point_parts.append(np.repeat(owners[found], counts))
+            target_parts.append(self._order[np.repeat(starts, counts) + run])
+
+        if not point_parts:
+            return empty, empty
+        point_idx = np.concatenate(point_parts)
+        target_idx = np.concatenate(target_parts)
+        dots = np.einsum('ij,ij->i', points[point_idx], self.xyz[target_idx])
+        keep = dots >= np.cos(angle)
+        point_idx = valid[point_idx[keep]]
+        target_idx = target_idx[keep]
+        order = np.lexsort((target_idx, point_idx))
+        return point_idx[order], target_idx[order]
+
+    def first_captures(self, lat, lon, radius_km):
+        """
+        Finds, for each target, the first query point within radius_km.
+
+        Returns:
+            tuple: (point_idx, target_idx) arrays with one entry per captured
+                target, sorted by point and then by target index.
+        """
+        point_idx, target_idx = self.query_pairs(lat, lon, radius_km)
+        # Pairs are sorted by point, so the first occurrence of a target is its earliest capture
+        target_idx, first = np.unique(target_idx, return_index=True)
+        point_idx = point_idx[first]
+        order = np.lexsort((target_idx, point_idx))
+        return point_idx[order], target_idx[order]
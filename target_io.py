@@ -0,0 +1,199 @@
+# target_io.py
+import csv
+import io
+import json
+import os
+
+import numpy as np
+
+LAT_COLUMNS = ('lat', 'latitude')
+LON_COLUMNS = ('lon', 'lng', 'long', 'longitude')
+PRIORITY_COLUMNS = ('priority', 'weight')
+NAME_COLUMNS = ('name', 'label')
+
+def _find_column(header, names):
+    return next((header.index(name) for name in names if name in header), None)
+
+def _open_text(source):
+    # Paths are opened here; uploaded files and other binary streams are decoded
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, newline='', encoding='utf-8')
+    data = source.read()
+    return io.StringIO(data.decode('utf-8') if isinstance(data, bytes) else data, newline='')
+
+def read_target_columns_csv(source):
+    """
+    Reads target columns from a CSV file.
+
+    The latitude and longitude columns are found by header name ('lat' /
+    'latitude', 'lon' / 'lng' / 'longitude', case-insensitive), with
+    optional 'priority'/'weight' and 'name'/'label' columns. Files without a
+    header are read as 'lat,lon[,priority]'. Numeric columns are parsed with
+    np.loadtxt, so millions of rows load without per-row Python objects;
+    files with quoted cells (e.g. names containing commas) go through the
+    csv module instead.
+
+    Args:
+        source (str or file): Path or binary/text stream.
+
+    Returns:
+        dict: 'lat' and 'lon' arrays, plus 'priority' and 'names' when present.
+    """
+    with _open_text(source) as f:
+        first = ''
+        while not first.strip():
+            first = f.readline()
+            if not first:
+                return {'lat': np.empty(0), 'lon': np.empty(0)}
+        header = [cell.strip().lower() for cell in next(csv.reader([first]))]
+        lat_col = _find_column(header, LAT_COLUMNS)
+        lon_col = _find_column(header, LON_COLUMNS)
+        if lat_col is None or lon_col is None:
+            try:
+                [float(cell) for cell in header]
+            except ValueError:
+                raise ValueError(f"no lat/lon columns in CSV header {header}")
+            lat_col, lon_col = 0, 1
+            priority_col = 2 if len(header) > 2 else None
+            name_col = None
+            # The first line is data; parse it together with the rest
+            text = first + f.read()
+        else:
+            priority_col = _find_column(header, PRIORITY_COLUMNS)
+            name_col = _find_column(header, NAME_COLUMNS)
+            text = f.read()
+
+    numeric = [lat_col, lon_col] + ([priority_col] if priority_col is not None else [])
+    if '"' in text:
+        # Quoted cells may contain commas, which np.loadtxt would split
+        rows = [row for row in csv.reader(io.StringIO(text)) if row and any(cell.strip() for cell in row)]
+        values = np.array([[row[col] for col in numeric] for row in rows], dtype=np.float64).reshape(-1, len(numeric))
+    else:
+        rows = None
+        values = np.loadtxt(io.StringIO(text), delimiter=',', usecols=numeric, ndmin=2, dtype=np.float64)
+    columns = {'lat': values[:, 0], 'lon': values[:, 1]}
+    if priority_col is not None:
+        columns['priority'] = values[:, 2]
+    if name_col is not None:
+        if rows is None:
+            rows = [row for row in csv.reader(io.StringIO(text)) if row and any(cell.strip() for cell in row)]
+        columns['names'] = [row[name_col].strip() for row in rows]
+    return columns
+
+def read_target_columns_geojson(source):
+    """
+    Reads Point and MultiPoint geometries from a GeoJSON file.
+
+    Accepts a FeatureCollection, a single Feature or a bare geometry; other
+    geometry types are skipped. 'priority'/'weight' and 'name' feature
+    properties are kept when present.
+
+    Returns:
+        dict: 'lat' and 'lon' arrays, plus 'priority' and 'names' when present.
+    """
+    with _open_text(source) as f:
+        data = json.load(f)
+    if data.get('type') == 'FeatureCollection':
+        features = data.get('features', [])
+    elif data.get('type') == 'Feature':
+        features = [data]
+    else:
+        features = [{'geometry': data}]
+    lat, lon, priority, names = [], [], [], []
+    for feature in features:
+        geometry = feature.get('geometry')
+        if not geometry:
+            continue
+        if geometry.get('type') == 'Point':
+            points = [geometry['coordinates']]
+        elif geometry.get('type') == 'MultiPoint':
+            points = geometry['coordinates']
+        else:
+            continue
+        properties = feature.get('properties') or {}
+        weight = next((properties[key] for key in PRIORITY_COLUMNS if properties.get(key) is not None), None)
+        for point in points:
+            # GeoJSON positions are (lon, lat)
+            lon.append(float(point[0]))
+            lat.append(float(point[1]))
+            priority.append(np.nan if weight is None else float(weight))
+            names.append(properties.get('name'))
+    columns = {'lat': np.array(lat, dtype=np.float64), 'lon': np.array(lon, dtype=np.float64)}
+    priority = np.array(priority, dtype=np.float64)
+    if len(priority) and not np.isnan(priority).all():
+        columns['priority'] = np.nan_to_num(priority, nan=0.0)
+    if any(name is not None for name in names):
+        columns['names'] = names
+    return columns
+
+def read_target_columns_npy(path, mmap=True):
+    """
+    Reads target columns from a .npy file without copying.
+
+    The array is either (N, 2) / (N, 3) with lat, lon[, priority] columns, or
+    a structured array with 'lat', 'lon' and optional 'priority' fields. With
+    mmap the file is memory-mapped and the columns are views into it.
+
+    Returns:
+        dict: 'lat' and 'lon' arrays, plus 'priority' when present.
+    """
+    array = np.load(path, mmap_mode='r' if mmap else None)
+    if array.dtype.names:
+        columns = {'lat': array['lat'], 'lon': array['lon']}
+        if 'priority' in array.dtype.names:
+            columns['priority'] = array['priority']
+        return columns
+    if array.ndim != 2 or array.shape[1] not in (2, 3):
+        raise ValueError(f"{path}: expected an (N, 2) or (N, 3) array, got {array.shape}")
+    columns = {'lat': array[:, 0], 'lon': array[:, 1]}
+    if array.shape[1] == 3:
+        columns['priority'] = array[:, 2]
+    return columns
+
+def read_target_columns(path, source=None):
+    """
+    Reads target columns from a CSV, GeoJSON or .npy file, chosen by extension.
+
+    Args:
+        path (str): File path, or just the file name when source is given.
+        source (file): Optional stream with the file contents (e.g. an upload).
+
+    Returns:
+        dict: 'lat' and 'lon' arrays, plus 'priority' and 'names' when present.
+    """
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension in ('.geojson', '.json'):
+        return read_target_columns_geojson(source if source is not None else path)
+    if extension == '.npy':
+        return read_target_columns_npy(source if source is not None else path, mmap=source is None)
+    return read_target_columns_csv(source if source is not None else path)
+
+def read_targets(path):
+    """
+    Reads targets from a CSV, GeoJSON or .npy file, chosen by extension.
+
+    Returns:
+        List[tuple]: Target coordinates as (lat, lon).
+    """
+    columns = read_target_columns(path)
+    return list(zip(columns['lat'].tolist(), columns['lon'].tolist()))
+
+def read_targets_csv(path):
+    """
+    Reads targets from a CSV file, see read_target_columns_csv.
+
+    Returns:
+        List[tuple]: Target coordinates as (lat, lon).
+    """
+    columns = read_target_columns_csv(path)
+    return list(zip(columns['lat'].tolist(), columns['lon'].tolist()))
+
+def read_targets_geojson(path):
+    """
+    Reads targets from a GeoJSON file, see read_target_columns_geojson.
+
+    Returns:
+        List[tuple]: Target coordinates as (lat, lon).
+    """
+    columns = read_target_columns_geojson(path)
+    return list(zip(columns['lat'].tolist(), columns['lon'].tolist()))
@@ -0,0 +1,194 @@
+# target_store.py
+import hashlib
+
+import numpy as np
+
+from target_index import TargetIndex, to_unit_xyz
+from target_io import read_target_columns
+
+# Targets closer than this are treated as the same place by dedup()
+DEFAULT_DEDUP_KM = 1.0
+
+def targets_key(targets, priorities=None):
+    """
+    Returns a hash of the coordinates and priorities of a target list or
+    TargetStore, e.g. for cache keys, so large target sets are never compared
+    or hashed tuple by tuple.
+
+    Args:
+        targets (List[tuple] or TargetStore): Target coordinates as (lat, lon).
+        priorities (np.ndarray): Optional weights; defaults to the store's priority column.
+    """
+    if priorities is None:
+        priorities = getattr(targets, 'priority', None)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(np.asarray(targets, dtype=np.float64).reshape(-1, 2)).tobytes())
+    if priorities is not None:
+        digest.update(b'priority')
+        digest.update(np.ascontiguousarray(np.asarray(priorities, dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+class TargetStore:
+    """
+    Columnar container for large target sets.
+
+    Latitude, longitude and priority are kept as 1-D NumPy arrays (memory-
+    mapped when loaded from .npy), and the unit-sphere XYZ vectors are
+    computed once on first use and shared by everything that indexes the
+    store. The store behaves like the List[tuple] of (lat, lon) used
+    elsewhere: len(), integer indexing, iteration and np.asarray() work as
+    for a list, so it can be passed wherever targets are expected.
+    scheduler.global_schedule picks up the priority column automatically.
+    """
+
+    __slots__ = ('lat', 'lon', 'priority', 'names', '_xyz')
+
+    def __init__(self, lat, lon, priority=None, names=None):
+        """
+        Args:
+            lat, lon (np.ndarray): Target coordinates in degrees (N,).
+            priority (np.ndarray): Optional weights (N,); higher is scheduled first
+                when satellites are constrained.
+            names (List[str]): Optional target labels.
+        """
+        self.lat = np.asarray(lat, dtype=np.float64).reshape(-1)
+        self.lon = np.asarray(lon, dtype=np.float64).reshape(-1)
+        if len(self.lat) != len(self.lon):
+            raise ValueError(f"lat and lon lengths differ: {len(self.lat)} != {len(self.lon)}")
+        self.priority = None if priority is None else np.asarray(priority, dtype=np.float64).reshape(-1)
+        self.names = None if names is None else list(names)
+        self._xyz = None
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __repr__(self):
+        return f"TargetStore({len(self)} targets{', with priorities' if self.priority is not None else ''})"
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return (float(self.lat[key]), float(self.lon[key]))
+        if not isinstance(key, slice):
+            key = np.asarray(key)
+        subset = TargetStore(
+            self.lat[key], self.lon[key],
+            None if self.priority is None else self.priority[key],
+            None if self.names is None else np.array(self.names, dtype=object)[key].tolist(),
+        )
+        if self._xyz is not None:
+            subset._xyz = self._xyz[key]
+        return subset
+
+    def __iter__(self):
+        return zip(self.lat.tolist(), self.lon.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        return np.stack((self.lat, self.lon), axis=1).astype(dtype or np.float64, copy=False)
+
+    @property
+    def xyz(self):
+        """
+        Unit-sphere vectors (N, 3), computed on first access.
+        """
+        if self._xyz is None:
+            self._xyz = to_unit_xyz(self.lat, self.lon)
+        return self._xyz
+
+    def tolist(self):
+        return list(self)
+
+    def dedup(self, tolerance_km=DEFAULT_DEDUP_KM):
+        """
+        Merges targets closer than tolerance_km to each other.
+
+        Groups are formed by single linkage (chains of close targets merge
+        into one) and represented by their first member; a group keeps the
+        highest priority of its members.
+
+        Returns:
+            TargetStore: The representatives, in their original order.
+        """
+        n = len(self)
+        if n < 2:
+            return self
+        index = TargetIndex(self, cell_km=max(tolerance_km, 0.5))
+        i, j = index.query_pairs(self.lat, self.lon, tolerance_km)
+        # Connected components by min-label propagation: every target takes the
+        # smallest label among its neighbours (then its label's label) until
+        # nothing changes, which leaves each group labelled by its first member
+        representative = np.arange(n)
+        while True:
+            labels = representative.copy()
+            np.minimum.at(labels, i, representative[j])
+            labels = labels[labels]
+            if np.array_equal(labels, representative):
+                break
+            representative = labels
+        keep = np.flatnonzero(representative == np.arange(n))
+        if len(keep) == n:
+            return self
+        unique = self[keep]
+        if self.priority is not None:
+            priority = np.array(self.priority)
+            np.maximum.at(priority, representative, self.priority)
+            unique.priority = priority[keep]
+        return unique
+
+    def save_npy(self, path):
+        """
+        Saves the store as an (N, 2) or (N, 3) float64 .npy file for fast memory-mapped loading.
+        """
+        columns = [self.lat, self.lon] + ([self.priority] if self.priority is not None else [])
+        np.save(path, np.stack(columns, axis=1))
+
+    @classmethod
+    def from_tuples(cls, targets, priority=None):
+        """
+        Builds a store from a list of (lat, lon) tuples.
+        """
+        coords = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        return cls(coords[:, 0], coords[:, 1], priority)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Builds a store from the dict returned by the target_io.read_target_columns* readers.
+        """
+        return cls(columns['lat'], columns['lon'], columns.get('priority'), columns.get('names'))
+
+    @classmethod
+    def load(cls, path, source=None):
+        """
+        Loads targets from a CSV, GeoJSON or .npy file, chosen by extension.
+
+        .npy files are memory-mapped, so only the pages that are used are read.
+
+        Args:
+            path (str): File path, or just the file name when source is given.
+            source (file): Optional stream with the file contents (e.g. an upload).
+        """
+        return cls.from_columns(read_target_columns(path, source))
+
+    @classmethod
+    def concatenate(cls, stores):
+        """
+        Joins several stores; missing priorities count as 0.
+        """
+        stores = list(stores)
+        if not stores:
+            return cls(np.empty(0), np.empty(0))
+        if len(stores) == 1:
+            return stores[0]
+        priority = None
+        if any(store.priority is not None for store in stores):
+            priority = np.concatenate([
+                store.priority if store.priority is not None else np.zeros(len(store)) for store in stores
+            ])
+        names = None
+        if any(store.names is not None for store in stores):
+            names = [name for store in stores for name in (store.names or [None] * len(store))]
+        return cls(
+            np.concatenate([store.lat for store in stores]),
+            np.concatenate([store.lon for store in stores]),
+            priority, names,
+        )
@@ -0,0 +1,52 @@
+# tests/conftest.py
+from datetime import datetime, timezone
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from tle_catalog import parse_tle_text  # noqa: E402
+
+@pytest.fixture(scope="session")
+def start():
+    """
+    Fixed grid start shortly after the fixture epochs, so results do not depend on the day the tests run.
+    """
+    return datetime(2025, 3, 4, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture(scope="session")
+def tle_text():
+    """
+    Contents of fixtures/nusat.tle.
+    """
+    with open(os.path.join(ROOT_DIR, "fixtures", "nusat.tle"), encoding="utf-8") as f:
+        return f.read()
+
+@pytest.fixture(scope="session")
+def fixture_satellites(tle_text):
+    """
+    The fixture satellites as dicts with 'name', 'tle1' and 'tle2'.
+    """
+    return parse_tle_text(tle_text)
+
+@pytest.fixture(scope="session")
+def propagate(start):
+    """
+    Returns a function propagating satellites over duration_minutes on the fixed start.
+    """
+    from skyfield.api import load
+
+    from constellation import propagate_constellation_at
+    from satellite import time_grid
+
+    ts = load.timescale()
+
+    def run(satellites, duration_minutes, step_seconds=60, include_altitude=False):
+        return propagate_constellation_at(
+            satellites, *time_grid(ts, duration_minutes, step_seconds, start), include_altitude=include_altitude
+        )
+    return run
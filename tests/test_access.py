@@ -0,0 +1,98 @@
+# tests/test_access.py
+import numpy as np
+import pytest
+
+from access import access_windows
+from swath import EARTH_RADIUS_KM, destination_spherical
+from target_index import to_unit_xyz
+
+DURATION_MINUTES = 90
+RADIUS_KM = 75.0
+# Brute-force sampling step; crossings are interpolated linearly between samples
+FINE_STEP_SECONDS = 0.5
+
+@pytest.fixture(scope="module")
+def scenario(fixture_satellites, propagate):
+    satellites = fixture_satellites[:2]
+    coarse = propagate(satellites, DURATION_MINUTES, 60)
+    fine = propagate(satellites, DURATION_MINUTES, FINE_STEP_SECONDS)
+
+    # Targets scattered around the first satellite's track, at most 65 km from a sample
+    # so that no window is grazing, plus a few that are never seen
+    rng = np.random.default_rng(1)
+    k = rng.integers(600, len(fine['epoch']) - 600, 40)
+    lat, lon = destination_spherical(
+        fine['lat'][0, k], fine['lon'][0, k], rng.uniform(0, 360, len(k)), rng.uniform(0, 65, len(k))
+    )
+    targets = list(zip(lat.tolist(), lon.tolist())) + [(-89.0, 0.0), (0.0, 0.0)]
+    return satellites, coarse, fine, targets
+
+def _brute_force(fine, targets, sat):
+    # Every window of one satellite from densely sampled great-circle distances
+    epoch = fine['epoch']
+    points = to_unit_xyz(fine['lat'][sat], fine['lon'][sat])
+    windows = []
+    for target, xyz in enumerate(to_unit_xyz(*np.asarray(targets).T)):
+        distance = np.arccos(np.clip(points @ xyz, -1, 1)) * EARTH_RADIUS_KM
+        inside = np.concatenate(([False], distance <= RADIUS_KM, [False]))
+        # Sample ranges [first, last] inside the radius
+        changes = np.flatnonzero(np.diff(inside.astype(np.int8)))
+        for first, last in zip(changes[::2], changes[1::2] - 1):
+            def crossing(i):
+                u = (RADIUS_KM - distance[i]) / (distance[i + 1] - distance[i])
+                return epoch[i] + u * (epoch[i + 1] - epoch[i])
+            start = crossing(first - 1) if first > 0 else epoch[0]
+            end = crossing(last) if last < len(epoch) - 1 else epoch[-1]
+            closest = first + np.argmin(distance[first:last + 1])
+            windows.append((target, start, end, epoch[closest], distance[closest]))
+    return windows
+
+def _half_step_km(fine, sat):
+    points = to_unit_xyz(fine['lat'][sat], fine['lon'][sat])
+    return np.arccos(np.clip(np.einsum('ij,ij->i', points[:-1], points[1:]), -1, 1)).max() * EARTH_RADIUS_KM / 2
+
+def test_windows_match_brute_force_sampling(scenario):
+    _, coarse, fine, targets = scenario
+    windows = access_windows(coarse, targets, RADIUS_KM)
+    for sat in range(len(coarse['names'])):
+        expected = np.array(_brute_force(fine, targets, sat)).reshape(-1, 5)
+        mine = windows['sat'] == sat
+        found = np.stack([windows[key][mine] for key in ('target', 'start', 'end', 'closest', 'min_distance_km')], axis=1)
+        assert found.shape == expected.shape
+        np.testing.assert_array_equal(found[:, 0], expected[:, 0])
+        # Start/end to a fraction of a second; the distance is flat around the
+        # closest approach, so its time is looser than its distance
+        np.testing.assert_allclose(found[:, 1:3], expected[:, 1:3], atol=0.5)
+        np.testing.assert_allclose(found[:, 3], expected[:, 3], atol=2.0)
+        # The sampled minimum can miss the true one by up to half a sample spacing along the track
+        assert (found[:, 4] <= expected[:, 4] + 0.05).all()
+        assert (expected[:, 4] <= np.hypot(found[:, 4], _half_step_km(fine, sat)) + 0.05).all()
+    assert (windows['sat'] == 0).sum() >= 40
+    assert not np.isin(windows['target'], [len(targets) - 2, len(targets) - 1]).any()
+
+def test_windows_do_not_depend_on_the_sampling_step(scenario, propagate):
+    satellites, coarse, _, targets = scenario
+    a = access_windows(coarse, targets, RADIUS_KM)
+    b = access_windows(propagate(satellites, DURATION_MINUTES, 120), targets, RADIUS_KM)
+    np.testing.assert_array_equal(a['target'], b['target'])
+    np.testing.assert_allclose(a['start'], b['start'], atol=1.0)
+    np.testing.assert_allclose(a['end'], b['end'], atol=1.0)
+
+def test_failed_sample_keeps_neighbouring_windows(scenario):
+    _, coarse, _, targets = scenario
+    windows = access_windows(coarse, targets, RADIUS_KM)
+    epoch = coarse['epoch']
+    # A window of the first satellite that lies inside one segment, away from the track ends
+    segment = np.searchsorted(epoch, windows['start'], side='right') - 1
+    inside = (windows['sat'] == 0) & (windows['end'] <= epoch[np.minimum(segment + 1, len(epoch) - 1)]) & (segment >= 2)
+    k = np.flatnonzero(inside)[0]
+    # SGP4 failed at the sample just before that segment
+    failed = dict(coarse, lat=coarse['lat'].copy(), lon=coarse['lon'].copy())
+    failed['lat'][0, segment[k] - 1] = np.nan
+    failed['lon'][0, segment[k] - 1] = np.nan
+    found = access_windows(failed, targets, RADIUS_KM)
+    match = np.flatnonzero((found['sat'] == 0) & (found['target'] == windows['target'][k])
+                           & (np.abs(found['closest'] - windows['closest'][k]) < 5.0))
+    assert len(match) == 1
+    np.testing.assert_allclose(found['start'][match], windows['start'][k], atol=0.5)
+    np.testing.assert_allclose(found['end'][match], windows['end'][k], atol=0.5)
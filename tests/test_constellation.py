@@ -0,0 +1,49 @@
+# tests/test_constellation.py
+import numpy as np
+import pytest
+from skyfield.api import EarthSatellite, load
+
+from constellation import ecef_to_geodetic, geodetic_to_ecef, propagate_constellation_at
+from satellite import time_grid
+
+# skyfield goes through GCRS with the full precession-nutation model; the
+# direct TEME -> Earth-fixed rotation agrees with it to about a metre
+TOLERANCE_DEG = 5e-5
+TOLERANCE_KM = 0.002
+
+@pytest.fixture(scope="module")
+def satellites(fixture_satellites):
+    return fixture_satellites
+
+def test_matches_skyfield_subpoint(satellites, start):
+    ts = load.timescale()
+    t_array, epoch = time_grid(ts, 1440, 60, start)
+    constellation = propagate_constellation_at(satellites, t_array, epoch, include_altitude=True)
+    assert constellation['names'] == [sat['name'] for sat in satellites]
+    assert constellation['lat'].shape == (len(satellites), len(epoch))
+    for i, sat in enumerate(satellites):
+        subpoint = EarthSatellite(sat['tle1'], sat['tle2'], sat['name'], ts).at(t_array).subpoint()
+        lon_error = (constellation['lon'][i] - subpoint.longitude.degrees + 180) % 360 - 180
+        assert np.abs(constellation['lat'][i] - subpoint.latitude.degrees).max() < TOLERANCE_DEG
+        assert np.abs(lon_error).max() < TOLERANCE_DEG
+        assert np.abs(constellation['alt_km'][i] - subpoint.elevation.km).max() < TOLERANCE_KM
+
+def test_rows_do_not_depend_on_the_batch(satellites, propagate):
+    together = propagate(satellites, 90)
+    alone = propagate(satellites[2:3], 90)
+    np.testing.assert_array_equal(together['lat'][2], alone['lat'][0])
+    np.testing.assert_array_equal(together['lon'][2], alone['lon'][0])
+
+def test_empty_constellation(propagate):
+    constellation = propagate([], 10, include_altitude=True)
+    assert constellation['lat'].shape == (0, 10)
+    assert constellation['alt_km'].shape == (0, 10)
+
+def test_geodetic_round_trip():
+    lat = np.array([-89.9, -45.0, 0.0, 30.0, 89.9])
+    lon = np.array([-179.0, -90.0, 0.0, 45.0, 179.0])
+    alt = np.array([0.0, 500.0, 35786.0, 1.0, 700.0])
+    lat2, lon2, alt2 = ecef_to_geodetic(*geodetic_to_ecef(lat, lon, alt))
+    np.testing.assert_allclose(lat2, lat, atol=1e-9)
+    np.testing.assert_allclose(lon2, lon, atol=1e-9)
+    np.testing.assert_allclose(alt2, alt, atol=1e-6)
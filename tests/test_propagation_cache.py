@@ -0,0 +1,91 @@
+# tests/test_propagation_cache.py
+import os
+
+import numpy as np
+import pytest
+
+from ground_track import TRACK_COLUMNS
+from propagation_cache import PropagationCache, cache_key
+from simulation import run_simulation
+
+def _entry(value, size=100):
+    return {key: np.full(size, value, dtype=np.float32) for key in ('lat', 'lon')}
+
+def test_hit_and_miss():
+    cache = PropagationCache()
+    assert cache.get('a') is None
+    cache.put('a', _entry(1.0))
+    np.testing.assert_array_equal(cache.get('a')['lat'], _entry(1.0)['lat'])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_least_recently_used_entry_is_evicted():
+    # Room for two entries of 800 bytes
+    cache = PropagationCache(max_bytes=1600)
+    cache.put('a', _entry(1.0))
+    cache.put('b', _entry(2.0))
+    assert cache.get('a') is not None
+    cache.put('c', _entry(3.0))
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    # Entries larger than the whole cache are not kept in memory
+    cache.put('d', _entry(4.0, size=1000))
+    assert cache.get('d') is None
+    assert len(cache) == 2
+
+def test_disk_round_trip(tmp_path):
+    entry = {'lat': np.linspace(-80, 80, 50, dtype=np.float32), 'lon': np.linspace(-170, 170, 50, dtype=np.float32)}
+    PropagationCache(disk_dir=str(tmp_path)).put('key', entry)
+    assert os.listdir(tmp_path) == ['key.npz']
+    # A new instance (e.g. another process) finds the entry on disk
+    fresh = PropagationCache(disk_dir=str(tmp_path))
+    loaded = fresh.get('key')
+    assert set(loaded) == set(entry)
+    for name, value in entry.items():
+        assert loaded[name].dtype == value.dtype
+        np.testing.assert_array_equal(loaded[name], value)
+    assert len(fresh) == 1 and fresh.hits == 1
+    # Entries evicted from memory are still served from disk
+    fresh.clear()
+    assert fresh.get('key') is not None
+
+def test_cache_key_changes_with_its_inputs(fixture_satellites, start):
+    sat, other = fixture_satellites[0], fixture_satellites[1]
+    base = (sat['tle1'], sat['tle2'], start.timestamp(), 90, 60, 75.0)
+    key = cache_key(*base)
+    assert cache_key(*base) == key
+    # Whitespace around the TLE lines and int/float spelling do not matter
+    assert cache_key(sat['tle1'] + "\n", " " + sat['tle2'], start.timestamp(), 90.0, 60.0, 75) == key
+    changed = [
+        (other['tle1'], other['tle2']) + base[2:],
+        (sat['tle1'], other['tle2']) + base[2:],
+        base[:2] + (start.timestamp() + 60,) + base[3:],
+        base[:3] + (91,) + base[4:],
+        base[:4] + (30,) + base[5:],
+        base[:5] + (80.0,),
+    ]
+    keys = {cache_key(*args) for args in changed}
+    assert key not in keys
+    assert len(keys) == len(changed)
+
+def test_simulation_reuses_cached_tracks(fixture_satellites, start):
+    satellites = fixture_satellites[:2]
+    targets = [(0.0, 0.0), (45.0, 45.0)]
+    cache = PropagationCache()
+    kwargs = dict(duration_minutes=60, step_seconds=60, workers=1, start=start, cache=cache)
+    first = run_simulation(satellites, targets, **kwargs)
+    assert (len(cache), cache.hits) == (2, 0)
+    second = run_simulation(satellites, targets, **kwargs)
+    assert cache.hits == 2
+    for key in TRACK_COLUMNS:
+        np.testing.assert_array_equal(second[key], first[key])
+    # A different grid misses the cache
+    run_simulation(satellites, targets, **dict(kwargs, step_seconds=30))
+    assert cache.hits == 2 and len(cache) == 4
+
+@pytest.mark.parametrize("bad", [b"not an npz", b""])
+def test_unreadable_disk_entry_is_a_miss(tmp_path, bad):
+    (tmp_path / "key.npz").write_bytes(bad)
+    cache = PropagationCache(disk_dir=str(tmp_path))
+    assert cache.get('key') is None
+    assert cache.misses == 1
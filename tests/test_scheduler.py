@@ -0,0 +1,76 @@
+# tests/test_scheduler.py
+import pytest
+
+from access import access_windows, windows_to_records
+from constellation import satellite_track
+from satellite import get_satellite_path, get_satellite_track
+from scheduler import (
+    IncrementalScheduler, global_schedule, greedy_schedule, indexed_schedule, indexed_schedule_track,
+    access_schedule_constellation, schedule_constellation, schedule_track, window_schedule,
+)
+from target_list import TARGETS
+from target_store import TargetStore, targets_key
+
+@pytest.fixture(scope="module")
+def constellation(fixture_satellites, propagate):
+    return propagate(fixture_satellites[:3], 180)
+
+@pytest.fixture(scope="module")
+def targets(constellation):
+    # Points a few km off the tracks, so every satellite sees some of them
+    lat = constellation['lat'][:, 5::12].ravel() + 0.2
+    lon = constellation['lon'][:, 5::12].ravel()
+    return list(zip(lat.tolist(), lon.tolist()))
+
+def test_incremental_matches_global_schedule(constellation, targets):
+    planner = IncrementalScheduler(constellation['epoch'], constellation['lat'], constellation['lon'])
+    assert planner.sync(targets[:10]) == (10, 0)
+    assert planner.sync(targets) == (len(targets) - 10, 0)
+    expected = global_schedule(access_windows(constellation, targets), targets, len(constellation['names']))
+    assert sum(map(len, expected['tasks'])) > 0
+    assert planner.schedule() == expected
+
+def test_sync_is_a_no_op_for_unchanged_targets(constellation, targets):
+    planner = IncrementalScheduler(constellation['epoch'], constellation['lat'], constellation['lon'])
+    planner.sync(targets)
+    assert planner.sync(list(targets)) == (0, 0)
+    assert planner.sync(targets[1:]) == (0, 1)
+    # Direct edits invalidate the shortcut
+    planner.add_targets(targets[:1])
+    assert planner.sync(targets[1:]) == (0, 1)
+
+def test_targets_key():
+    store = TargetStore.from_tuples([(1.0, 2.0), (3.0, 4.0)])
+    assert targets_key(store) == targets_key([(1.0, 2.0), (3.0, 4.0)])
+    assert targets_key(store) != targets_key([(1.0, 2.0), (3.0, 4.5)])
+    assert targets_key(store) != targets_key(TargetStore(store.lat, store.lon, priority=[1.0, 0.0]))
+
+@pytest.mark.parametrize("sat", [0, 3])
+def test_indexed_schedule_matches_greedy_schedule(fixture_satellites, start, targets, sat):
+    tle = fixture_satellites[sat]
+    path = get_satellite_path(tle['tle1'], tle['tle2'], tle['name'], 180, 60, start)
+    candidates = list(TARGETS) + targets
+    expected = greedy_schedule(path, candidates)
+    assert len(expected) > 0
+    assert indexed_schedule(path, candidates) == expected
+    track = get_satellite_track(tle['tle1'], tle['tle2'], tle['name'], 180, 60, start=start)
+    assert indexed_schedule_track(track, candidates) == expected
+
+def test_schedule_constellation_matches_per_track_schedules(constellation, targets):
+    expected = [schedule_track(satellite_track(constellation, i), targets) for i in range(len(constellation['names']))]
+    assert sum(map(len, expected)) > 0
+    assert schedule_constellation(constellation, targets) == expected
+
+def test_access_schedule_constellation_matches_windows(constellation, targets):
+    windows = access_windows(constellation, targets)
+    schedules = access_schedule_constellation(constellation, targets)
+    assert len(schedules) == len(constellation['names'])
+    for i, schedule in enumerate(schedules):
+        mine = {key: value[windows['sat'] == i] for key, value in windows.items()}
+        assert schedule == window_schedule(mine, targets)
+        # One satellite without constraints: every target at its earliest window
+        assert schedule == global_schedule(dict(mine, sat=mine['sat'] * 0), targets, 1)['tasks'][0]
+    records = windows_to_records(windows, targets)
+    assert len(records) == len(windows['target'])
+    assert records[0]['target'] == targets[windows['target'][0]]
+    assert records[0]['start'] <= records[0]['closest'] <= records[0]['end']
@@ -0,0 +1,172 @@
+# tests/test_sensor.py
+from datetime import datetime, timezone
+import warnings
+
+import numpy as np
+import pytest
+from skyfield.api import EarthSatellite, load, wgs84
+from skyfield.framelib import itrs
+
+from access import access_windows
+from constellation import ecef_to_geodetic, geodetic_to_ecef
+from sensor import (
+    RADIUS_MARGIN, SensorModel, _sun_direction_analytic, apogee_altitude_km, capture_geometry, sun_direction,
+)
+from swath import EARTH_RADIUS_KM
+from target_index import to_unit_xyz
+
+def _angle_deg(a, b):
+    cosine = np.einsum('ij,ij->i', a, b) / (np.linalg.norm(a, axis=-1) * np.linalg.norm(b, axis=-1))
+    return np.degrees(np.arccos(np.clip(cosine, -1, 1)))
+
+def test_capture_geometry_overhead():
+    lat, lon, alt = np.array([10.0, -45.0]), np.array([20.0, 170.0]), np.array([500.0, 650.0])
+    sat_xyz = np.stack(geodetic_to_ecef(lat, lon, alt), axis=-1)
+    target_xyz = np.stack(geodetic_to_ecef(lat, lon), axis=-1)
+    up = to_unit_xyz(lat, lon)
+    geometry = capture_geometry(sat_xyz, target_xyz, up, sun=up)
+    np.testing.assert_allclose(geometry['off_nadir'], 0.0, atol=1e-5)
+    np.testing.assert_allclose(geometry['elevation'], 90.0, atol=1e-5)
+    np.testing.assert_allclose(geometry['range_km'], alt, rtol=1e-9)
+    np.testing.assert_allclose(geometry['sun_elevation'], 90.0, atol=1e-5)
+    assert 'sun_elevation' not in capture_geometry(sat_xyz, target_xyz, up)
+
+def test_capture_geometry_off_nadir():
+    # Satellite over the equator, target displaced along the meridian: the
+    # off-nadir and elevation angles are the angles of the triangle
+    # (satellite, target, nadir) measured from Earth-fixed positions
+    sat_xyz = np.stack(geodetic_to_ecef(np.zeros(3), np.zeros(3), np.full(3, 550.0)), axis=-1)
+    lat = np.array([1.0, 3.0, 8.0])
+    target_xyz = np.stack(geodetic_to_ecef(lat, np.zeros(3)), axis=-1)
+    up = to_unit_xyz(lat, np.zeros(3))
+    geometry = capture_geometry(sat_xyz, target_xyz, up)
+    line = target_xyz - sat_xyz
+    np.testing.assert_allclose(geometry['off_nadir'], _angle_deg(line, -sat_xyz), atol=1e-6)
+    np.testing.assert_allclose(geometry['elevation'], 90.0 - _angle_deg(-line, up), atol=1e-6)
+    assert np.all(np.diff(geometry['off_nadir']) > 0)
+    assert np.all(np.diff(geometry['elevation']) < 0)
+
+@pytest.mark.parametrize("alt_km, off_nadir, elevation, limited_by", [
+    (500.0, 30.0, None, 'off_nadir'),
+    (500.0, 45.0, 60.0, 'elevation'),
+    (800.0, 10.0, 20.0, 'off_nadir'),
+    # Beyond the horizon's off-nadir angle the whole visible cap is reachable
+    (500.0, 80.0, None, 'horizon'),
+])
+def test_access_radius_matches_spherical_geometry(alt_km, off_nadir, elevation, limited_by):
+    sensor = SensorModel(max_off_nadir_deg=off_nadir, min_elevation_deg=elevation)
+    central = sensor.access_radius_km(alt_km) / RADIUS_MARGIN / EARTH_RADIUS_KM
+    # Satellite and target in one plane through the centre of a spherical Earth
+    sat = np.array([[EARTH_RADIUS_KM + alt_km, 0.0]])
+    up = np.array([[np.cos(central), np.sin(central)]])
+    line = EARTH_RADIUS_KM * up - sat
+    seen_off_nadir = _angle_deg(line, -sat)[0]
+    seen_elevation = 90.0 - _angle_deg(-line, up)[0]
+    if limited_by == 'off_nadir':
+        assert seen_off_nadir == pytest.approx(off_nadir, abs=1e-9)
+    elif limited_by == 'elevation':
+        assert seen_elevation == pytest.approx(elevation, abs=1e-9)
+        assert seen_off_nadir < off_nadir
+    else:
+        assert seen_elevation == pytest.approx(0.0, abs=1e-6)
+
+def test_accepts():
+    geometry = {
+        'off_nadir': np.array([10.0, 25.0, 31.0, 10.0, 10.0]),
+        'elevation': np.array([70.0, 40.0, 35.0, 15.0, 70.0]),
+        'sun_elevation': np.array([30.0, 30.0, 30.0, 30.0, -5.0]),
+    }
+    np.testing.assert_array_equal(SensorModel(30.0).accepts(geometry), [True, True, False, True, True])
+    np.testing.assert_array_equal(
+        SensorModel(30.0, min_elevation_deg=20.0).accepts(geometry), [True, True, False, False, True]
+    )
+    np.testing.assert_array_equal(
+        SensorModel(30.0, min_elevation_deg=20.0, min_sun_elevation_deg=0.0).accepts(geometry),
+        [True, True, False, False, False]
+    )
+    with pytest.raises(ValueError):
+        SensorModel(max_off_nadir_deg=90.0)
+
+@pytest.fixture(scope="module")
+def scenario(fixture_satellites, propagate):
+    satellites = fixture_satellites[:2]
+    constellation = propagate(satellites, 180)
+    # Targets at growing distances from the first track, some out of the sensor's reach
+    k = np.arange(5, 175, 10)
+    offsets = np.resize([0.0, 1.5, 3.0, 4.5], len(k))
+    lat, lon = constellation['lat'][0, k], constellation['lon'][0, k] + offsets
+    targets = list(zip(lat.tolist(), ((lon + 180) % 360 - 180).tolist()))
+    return satellites, constellation, targets
+
+def _skyfield_off_nadir(satellites, targets, windows):
+    # Off-nadir angle at closest approach from skyfield positions and subpoints
+    ts = load.timescale()
+    angles = np.empty(len(windows['sat']))
+    for k, (i, target, closest) in enumerate(zip(windows['sat'], windows['target'], windows['closest'])):
+        sat = satellites[i]
+        t = ts.from_datetime(datetime.fromtimestamp(closest, tz=timezone.utc))
+        position = EarthSatellite(sat['tle1'], sat['tle2'], sat['name'], ts).at(t)
+        sat_xyz = position.frame_xyz(itrs).km
+        nadir = wgs84.subpoint_of(position).itrs_xyz.km - sat_xyz
+        target_xyz = wgs84.latlon(*targets[target]).itrs_xyz.km
+        angles[k] = _angle_deg((target_xyz - sat_xyz)[None], nadir[None])[0]
+    return angles
+
+def test_filter_windows_applies_the_off_nadir_limit(scenario):
+    satellites, constellation, targets = scenario
+    sensor = SensorModel(max_off_nadir_deg=20.0)
+    # A wider prefilter than needed, so that the geometry has windows to reject
+    wide = SensorModel(max_off_nadir_deg=40.0).access_radius_km(apogee_altitude_km(satellites))
+    windows = access_windows(constellation, targets, wide)
+    kept = sensor.filter_windows(windows, satellites, targets)
+    assert set(kept) == set(windows)
+    off_nadir = _skyfield_off_nadir(satellites, targets, windows)
+    expected = off_nadir <= sensor.max_off_nadir_deg
+    assert 0 < expected.sum() < len(expected)
+    clear = np.abs(off_nadir - sensor.max_off_nadir_deg) > 0.01
+    kept_keys = set(zip(kept['sat'].tolist(), kept['target'].tolist(), kept['start'].tolist()))
+    found = np.array([key in kept_keys for key in zip(windows['sat'].tolist(), windows['target'].tolist(),
+                                                      windows['start'].tolist())])
+    np.testing.assert_array_equal(found[clear], expected[clear])
+
+def test_filter_windows_checks_the_sun_at_closest_approach(scenario):
+    satellites, constellation, targets = scenario
+    sensor = SensorModel(max_off_nadir_deg=89.0, min_sun_elevation_deg=0.0, ephemeris=None)
+    windows = access_windows(constellation, targets, sensor.access_radius_km(apogee_altitude_km(satellites)))
+    kept = sensor.filter_windows(windows, satellites, targets)
+    up = to_unit_xyz(*np.asarray(targets)[windows['target']].T)
+    sun_elevation = np.degrees(np.arcsin(np.einsum('ij,ij->i', sun_direction(windows['closest'], None), up)))
+    daylit = sun_elevation >= 0.0
+    assert 0 < daylit.sum() < len(daylit)
+    np.testing.assert_array_equal(np.sort(kept['closest']), np.sort(windows['closest'][daylit]))
+
+def test_filter_windows_without_windows(scenario):
+    satellites, _, targets = scenario
+    empty = {key: np.empty(0) for key in ('target', 'start', 'end', 'closest', 'min_distance_km', 'sat')}
+    assert SensorModel().filter_windows(empty, satellites, targets) is empty
+
+@pytest.mark.parametrize("moment, declination", [
+    (datetime(2025, 3, 20, 9, 1, tzinfo=timezone.utc), 0.0),
+    (datetime(2025, 6, 21, 2, 42, tzinfo=timezone.utc), 23.44),
+    (datetime(2025, 12, 21, 15, 3, tzinfo=timezone.utc), -23.44),
+])
+def test_analytic_sun_direction(moment, declination):
+    sun = _sun_direction_analytic(np.array([moment.timestamp()]))
+    np.testing.assert_allclose(np.linalg.norm(sun, axis=-1), 1.0, rtol=1e-12)
+    lat, _, _ = ecef_to_geodetic(*(sun[0] * 1e8))
+    # Geocentric and geodetic latitude coincide far from the Earth
+    assert lat == pytest.approx(declination, abs=0.05)
+
+def test_analytic_sun_is_over_the_noon_meridian(start):
+    # At 12:00 UTC the sun is within the equation of time (under 5 degrees) of Greenwich
+    _, lon, _ = ecef_to_geodetic(*(sun_direction(start.timestamp(), None)[0] * 1e8))
+    assert abs(lon) < 5.0
+
+def test_sun_direction_falls_back_without_ephemeris(start):
+    epoch = start.timestamp() + np.arange(0, 86400, 3600.0)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        sun = sun_direction(epoch, "missing-ephemeris.bsp")
+    assert any("low-precision" in str(warning.message) for warning in caught)
+    np.testing.assert_array_equal(sun, _sun_direction_analytic(epoch))
+    assert sun_direction(np.empty(0), None).shape == (0, 3)
@@ -0,0 +1,43 @@
+# tests/test_simulation.py
+import numpy as np
+import pytest
+
+from ground_track import TRACK_COLUMNS
+from simulation import run_simulation
+
+@pytest.fixture(scope="module")
+def scenario(fixture_satellites, propagate):
+    satellites = fixture_satellites[:4]
+    constellation = propagate(satellites, 120)
+    # Targets just off every satellite's track, so each one has windows
+    lat, lon = constellation['lat'][:, 10::25], constellation['lon'][:, 10::25]
+    targets = list(zip((lat.ravel() + 0.2).tolist(), lon.ravel().tolist()))
+    return satellites, targets
+
+def test_pool_matches_serial_run(scenario, start):
+    satellites, targets = scenario
+    kwargs = dict(duration_minutes=120, step_seconds=30, start=start, chunk_size=1)
+    serial = run_simulation(satellites, targets, workers=1, **kwargs)
+    # Reversed satellites as well, so results cannot line up by accident of completion order
+    for order in (slice(None), slice(None, None, -1)):
+        pooled = run_simulation(satellites[order], targets, workers=3, **kwargs)
+        assert pooled['names'] == serial['names'][order]
+        np.testing.assert_array_equal(pooled['epoch'], serial['epoch'])
+        for key in TRACK_COLUMNS:
+            np.testing.assert_array_equal(pooled[key], serial[key][order])
+        rows = np.arange(len(satellites))[order]
+        pooled_windows = pooled['windows']
+        assert np.all(np.diff(pooled_windows['sat']) >= 0)
+        for i, row in enumerate(rows):
+            mine = pooled_windows['sat'] == i
+            theirs = serial['windows']['sat'] == row
+            assert mine.sum() > 0
+            for column in ('target', 'start', 'end', 'closest', 'min_distance_km'):
+                np.testing.assert_array_equal(pooled_windows[column][mine], serial['windows'][column][theirs])
+
+def test_serial_and_pool_schedules_agree(scenario, start):
+    satellites, targets = scenario
+    kwargs = dict(duration_minutes=120, step_seconds=30, start=start, chunk_size=1)
+    serial = run_simulation(satellites, targets, workers=1, **kwargs)
+    pooled = run_simulation(satellites, targets, workers=3, **kwargs)
+    assert pooled['schedule'] == serial['schedule']
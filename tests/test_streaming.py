@@ -0,0 +1,83 @@
+# tests/test_streaming.py
+import numpy as np
+import pytest
+
+from simulation import run_simulation
+from streaming import run_streaming
+from swath import EARTH_RADIUS_KM
+from target_index import to_unit_xyz
+
+DURATION_MINUTES = 180
+STEP_SECONDS = 10
+CHUNK_MINUTES = 10
+SWATH_RADIUS_KM = 75.0
+# Chunk edges use one-sided tangents; window times stay within 5 ms of the single-pass run
+TOLERANCE_SECONDS = 0.005
+
+def _towards(lat1, lon1, lat2, lon2, distance_km):
+    # Point distance_km from the first point along the great circle to the second
+    p, q = to_unit_xyz(lat1, lon1), to_unit_xyz(lat2, lon2)
+    angle = np.arccos(np.clip(p @ q, -1, 1))
+    fraction = distance_km / EARTH_RADIUS_KM / angle
+    v = (np.sin((1 - fraction) * angle) * p + np.sin(fraction * angle) * q) / np.sin(angle)
+    return float(np.degrees(np.arcsin(v[2]))), float(np.degrees(np.arctan2(v[1], v[0])))
+
+@pytest.fixture(scope="module")
+def scenario(fixture_satellites, propagate):
+    satellites = fixture_satellites[:3]
+    constellation = propagate(satellites, DURATION_MINUTES, STEP_SECONDS)
+    lat, lon = constellation['lat'], constellation['lon']
+    per_chunk = CHUNK_MINUTES * 60 // STEP_SECONDS
+    targets = []
+    for boundary in range(per_chunk, 4 * per_chunk, per_chunk):
+        # Passed by the first satellite across a chunk boundary
+        targets.append((float(lat[0, boundary]) + 0.3, float(lon[0, boundary])))
+        # Left by the second satellite exactly at a chunk boundary
+        targets.append(_towards(lat[1, boundary], lon[1, boundary], lat[1, boundary - 1], lon[1, boundary - 1],
+                                SWATH_RADIUS_KM))
+    # Ordinary passes of the third satellite inside chunks
+    targets.extend((float(lat[2, k]) - 0.2, float(lon[2, k])) for k in range(50, lat.shape[1], 80))
+    return satellites, targets, per_chunk
+
+@pytest.fixture(scope="module")
+def runs(scenario, start):
+    satellites, targets, _ = scenario
+    kwargs = dict(duration_minutes=DURATION_MINUTES, step_seconds=STEP_SECONDS, swath_radius_km=SWATH_RADIUS_KM,
+                  start=start)
+    single = run_simulation(satellites, targets, workers=1, **kwargs)
+    streamed = run_streaming(satellites, targets, chunk_minutes=CHUNK_MINUTES, **kwargs)
+    return single, streamed
+
+def test_windows_match_the_single_pass_run(runs):
+    single, streamed = runs
+    expected, windows = single['windows'], streamed['windows']
+    np.testing.assert_array_equal(windows['sat'], expected['sat'])
+    np.testing.assert_array_equal(windows['target'], expected['target'])
+    for column in ('start', 'end', 'closest'):
+        np.testing.assert_allclose(windows[column], expected[column], rtol=0, atol=TOLERANCE_SECONDS)
+    np.testing.assert_allclose(windows['min_distance_km'], expected['min_distance_km'], rtol=0, atol=0.01)
+
+def test_boundary_windows_are_stitched(scenario, runs, start):
+    _, targets, per_chunk = scenario
+    windows = runs[1]['windows']
+    boundaries = start.timestamp() + STEP_SECONDS * np.arange(per_chunk, 4 * per_chunk, per_chunk)
+    spanning = windows['sat'] == 0
+    assert spanning.sum() >= len(boundaries)
+    for boundary in boundaries:
+        # One window of the first satellite contains the boundary, not two halves meeting at it
+        inside = spanning & (windows['start'] < boundary - 1) & (windows['end'] > boundary + 1)
+        assert inside.sum() == 1
+        assert not np.any(spanning & (np.abs(windows['end'] - boundary) < TOLERANCE_SECONDS))
+        ending = (windows['sat'] == 1) & (np.abs(windows['end'] - boundary) < TOLERANCE_SECONDS)
+        assert ending.sum() == 1
+
+def test_schedule_matches_the_single_pass_run(runs):
+    single, streamed = runs
+    expected, schedule = single['schedule'], streamed['schedule']
+    assert schedule['unassigned'] == expected['unassigned']
+    assert len(schedule['tasks']) == len(expected['tasks'])
+    for tasks, expected_tasks in zip(schedule['tasks'], expected['tasks']):
+        assert [task['target'] for task in tasks] == [task['target'] for task in expected_tasks]
+        for task, expected_task in zip(tasks, expected_tasks):
+            for key in ('time', 'start', 'end'):
+                assert abs((task[key] - expected_task[key]).total_seconds()) < TOLERANCE_SECONDS
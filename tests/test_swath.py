@@ -0,0 +1,47 @@
+# tests/test_swath.py
+from geopy.distance import distance, great_circle
+import numpy as np
+import pytest
+
+from satellite import compute_bearing
+from swath import WGS84_TOLERANCE_DEG, swath_edges
+
+def _track():
+    # A descending pass over the pole region and across the date line, sampled every ~450 km
+    lat = np.concatenate((np.linspace(20.0, 81.5, 15), np.linspace(81.0, -60.0, 35)))
+    lon = (170.0 + np.linspace(0.0, 40.0, len(lat)) + 180) % 360 - 180
+    return lat, lon
+
+def _reference(lat, lon, radius_km, geodesic):
+    # Per-point geopy destinations; the last point reuses the previous bearing
+    left, right = [], []
+    for i in range(len(lat)):
+        if i + 1 < len(lat):
+            bearing = compute_bearing(lat[i], lon[i], lat[i + 1], lon[i + 1])
+        for side, offset in ((left, -90), (right, 90)):
+            point = geodesic(kilometers=radius_km).destination((lat[i], lon[i]), (bearing + offset) % 360)
+            side.append((point.latitude, point.longitude))
+    return np.array(left), np.array(right)
+
+def _max_error_deg(lat, lon, reference):
+    lon_error = (lon - reference[:, 1] + 180) % 360 - 180
+    return max(np.abs(lat - reference[:, 0]).max(), np.abs(lon_error).max())
+
+@pytest.mark.parametrize("radius_km", [10.0, 75.0, 500.0])
+def test_wgs84_edges_match_geopy_geodesic(radius_km):
+    lat, lon = _track()
+    left_lat, left_lon, right_lat, right_lon = swath_edges(lat, lon, radius_km)
+    left, right = _reference(lat, lon, radius_km, distance)
+    assert _max_error_deg(left_lat, left_lon, left) < WGS84_TOLERANCE_DEG
+    assert _max_error_deg(right_lat, right_lon, right) < WGS84_TOLERANCE_DEG
+
+def test_spherical_edges_match_geopy_great_circle():
+    lat, lon = _track()
+    left_lat, left_lon, right_lat, right_lon = swath_edges(lat, lon, 75.0, model='spherical')
+    left, right = _reference(lat, lon, 75.0, great_circle)
+    assert _max_error_deg(left_lat, left_lon, left) < WGS84_TOLERANCE_DEG
+    assert _max_error_deg(right_lat, right_lon, right) < WGS84_TOLERANCE_DEG
+
+def test_unknown_model_is_rejected():
+    with pytest.raises(ValueError):
+        swath_edges([0.0, 1.0], [0.0, 1.0], model='flat')
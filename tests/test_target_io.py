@@ -0,0 +1,27 @@
+# tests/test_target_io.py
+import io
+
+import numpy as np
+
+from target_io import read_target_columns_csv
+
+def test_quoted_names_with_commas():
+    text = b'name,lat,lon,priority\n"Paris, France",48.85,2.35,2\nBerlin,52.52,13.40,1\n\n"Lima, ""PE""",-12.05,-77.04,3\n'
+    columns = read_target_columns_csv(io.BytesIO(text))
+    np.testing.assert_array_equal(columns['lat'], [48.85, 52.52, -12.05])
+    np.testing.assert_array_equal(columns['lon'], [2.35, 13.40, -77.04])
+    np.testing.assert_array_equal(columns['priority'], [2, 1, 3])
+    assert columns['names'] == ['Paris, France', 'Berlin', 'Lima, "PE"']
+
+def test_unquoted_file_with_names():
+    columns = read_target_columns_csv(io.StringIO('Latitude,Longitude,Label\n10.5,20.25,a\n-1,2,b\n'))
+    np.testing.assert_array_equal(columns['lat'], [10.5, -1.0])
+    np.testing.assert_array_equal(columns['lon'], [20.25, 2.0])
+    assert columns['names'] == ['a', 'b']
+    assert 'priority' not in columns
+
+def test_headerless_file():
+    columns = read_target_columns_csv(io.StringIO('\n1,2,5\n3,4,6\n'))
+    np.testing.assert_array_equal(columns['lat'], [1, 3])
+    np.testing.assert_array_equal(columns['lon'], [2, 4])
+    np.testing.assert_array_equal(columns['priority'], [5, 6])
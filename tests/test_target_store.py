@@ -0,0 +1,41 @@
+# tests/test_target_store.py
+import numpy as np
+import pytest
+
+from swath import destination_spherical
+from target_store import TargetStore
+
+def _chain(length, spacing_km):
+    # Points spaced along a meridian, each spacing_km from the previous one
+    lat, lon = destination_spherical(np.zeros(length), np.zeros(length), 0.0, spacing_km * np.arange(length))
+    return np.stack((lat, lon), axis=1)
+
+@pytest.mark.parametrize("order", [[0, 1, 2], [0, 2, 1], [2, 0, 1], [1, 2, 0]])
+def test_dedup_merges_chains_in_any_order(order):
+    # A - B - C with 0.8 km links: A and C are 1.6 km apart, but one group by single linkage
+    points = _chain(3, 0.8)[order]
+    store = TargetStore(points[:, 0], points[:, 1], priority=[1.0, 5.0, 2.0])
+    unique = store.dedup(1.0)
+    assert len(unique) == 1
+    # Represented by the first member in input order, with the group's highest priority
+    assert unique[0] == store[0]
+    np.testing.assert_array_equal(unique.priority, [5.0])
+
+def test_dedup_long_permuted_chain_and_separate_groups():
+    chain = _chain(40, 0.9)
+    far = _chain(3, 5.0) + [10.0, 10.0]
+    points = np.concatenate((chain, far))
+    rng = np.random.default_rng(3)
+    for _ in range(5):
+        order = rng.permutation(len(points))
+        store = TargetStore(points[order, 0], points[order, 1])
+        unique = store.dedup(1.0)
+        # One group for the chain, one for each of the far points
+        assert len(unique) == 4
+        first_chain_member = next(k for k, o in enumerate(order) if o < len(chain))
+        assert store[first_chain_member] in list(unique)
+
+def test_dedup_keeps_distinct_targets():
+    points = _chain(5, 2.0)
+    store = TargetStore(points[:, 0], points[:, 1])
+    assert store.dedup(1.0) is store
@@ -0,0 +1,96 @@
+# tests/test_tle_catalog.py
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+
+import pytest
+
+from tle_catalog import TLECatalog, is_valid_tle
+
+ETAG = '"nusat-1"'
+LAST_MODIFIED = "Mon, 03 Mar 2025 12:00:00 GMT"
+
+class _CelesTrak(BaseHTTPRequestHandler):
+    # Serves the fixture with validators and answers matching conditional requests with 304
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = server.body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server(tle_text):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _CelesTrak)
+    httpd.requests = []
+    httpd.body = tle_text
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/nusat.tle"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def _corrupt(line):
+    # Changes one digit of the element set without updating the checksum
+    i = 20
+    return line[:i] + str((int(line[i]) + 1) % 10) + line[i + 1:]
+
+def test_first_load_fetches_and_stores(server, tmp_path, fixture_satellites):
+    catalog = TLECatalog(str(tmp_path))
+    satellites = catalog.load(server.url)
+    assert [sat["norad_id"] for sat in satellites] == [sat["norad_id"] for sat in fixture_satellites]
+    assert "If-None-Match" not in server.requests[0]
+    assert os.path.exists(tmp_path / "catalog.json")
+
+def test_fresh_store_skips_the_network(server, tmp_path):
+    TLECatalog(str(tmp_path)).load(server.url)
+    catalog = TLECatalog(str(tmp_path))
+    assert catalog.refresh(server.url) == "fresh"
+    assert len(server.requests) == 1
+
+def test_stale_store_revalidates_with_etag_and_last_modified(server, tmp_path):
+    first = TLECatalog(str(tmp_path)).load(server.url)
+    catalog = TLECatalog(str(tmp_path), max_age_seconds=0)
+    assert catalog.refresh(server.url) == "not-modified"
+    assert server.requests[-1]["If-None-Match"] == ETAG
+    assert server.requests[-1]["If-Modified-Since"] == LAST_MODIFIED
+    assert catalog.load(server.url) == first
+
+def test_offline_falls_back_to_store(server, tmp_path):
+    first = TLECatalog(str(tmp_path)).load(server.url)
+    url = server.url
+    server.shutdown()
+    server.server_close()
+    catalog = TLECatalog(str(tmp_path), timeout=1)
+    assert catalog.refresh(url, force=True) == "offline"
+    assert catalog.load(url) == first
+
+def test_checksum_failures_are_rejected(server, tmp_path, tle_text, fixture_satellites):
+    lines = tle_text.splitlines()
+    lines[1] = _corrupt(lines[1])
+    assert not is_valid_tle(lines[1], lines[2])
+    server.body = "\n".join(lines) + "\n"
+    satellites = TLECatalog(str(tmp_path)).load(server.url)
+    names = [sat["name"] for sat in satellites]
+    assert lines[0].strip() not in names
+    assert len(satellites) == len(fixture_satellites) - 1
+
+def test_unwritable_store_keeps_catalog_in_memory(server, tmp_path, fixture_satellites):
+    blocker = tmp_path / "store"
+    blocker.write_text("not a directory")
+    catalog = TLECatalog(str(blocker))
+    satellites = catalog.load(server.url)
+    assert len(satellites) == len(fixture_satellites)
+    assert catalog.refresh(server.url) == "fresh"
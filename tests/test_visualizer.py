@@ -0,0 +1,64 @@
+# tests/test_visualizer.py
+from datetime import datetime, timezone
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
+import numpy as np
+import pytest
+
+import visualizer
+from ground_track import GroundTrack
+
+@pytest.fixture(autouse=True)
+def blank_basemap(monkeypatch):
+    # cartopy downloads Natural Earth data on first use; the tests only check the overlays
+    monkeypatch.setattr(visualizer, "_basemap", lambda width_px, height_px: np.zeros((height_px, width_px, 4)))
+
+def _collections(fig):
+    ax = fig.axes[0]
+    lines = [c for c in ax.collections if isinstance(c, LineCollection)]
+    polygons = [c for c in ax.collections if isinstance(c, PolyCollection) and not isinstance(c, LineCollection)]
+    return lines, polygons
+
+def test_track_without_edges_draws_lines_only():
+    track = GroundTrack(['A'], np.arange(7.0), np.linspace(0, 60, 7), (np.linspace(150, 210, 7) + 180) % 360 - 180)
+    fig = visualizer.plot_ground_tracks(track, [(10.0, 20.0)])
+    lines, polygons = _collections(fig)
+    # The track is split at the antimeridian
+    assert len(lines[0].get_segments()) == 2
+    assert not polygons
+    plt.close(fig)
+
+def test_track_with_edges_draws_swaths():
+    track = GroundTrack(['A'], np.arange(5.0), np.linspace(0, 40, 5), np.linspace(0, 40, 5)).with_edges(75)
+    fig = visualizer.plot_ground_tracks(track, [])
+    lines, polygons = _collections(fig)
+    assert len(lines[0].get_segments()) == 1
+    assert len(polygons[0].get_paths()) == 1
+    plt.close(fig)
+
+def test_plot_multiple_satellites_without_times_or_edges():
+    path = [{'lat': lat, 'lon': lon} for lat, lon in zip(range(0, 50, 10), range(0, 50, 10))]
+    fig = visualizer.plot_multiple_satellites(
+        [{'name': 'A', 'path': path, 'captured': []}, {'name': 'B', 'path': path[:3], 'left_edge': [], 'right_edge': []}],
+        [(10.0, 20.0)]
+    )
+    lines, polygons = _collections(fig)
+    assert len(lines[0].get_segments()) == 2
+    assert not polygons
+    plt.close(fig)
+
+def test_plot_multiple_satellites_with_times_and_edges():
+    start = datetime(2025, 3, 4, 12, 0, tzinfo=timezone.utc).timestamp()
+    track = GroundTrack(['A'], start + np.arange(5.0) * 60, np.linspace(0, 40, 5), np.linspace(0, 40, 5)).with_edges(75)
+    left_edge, right_edge = track.to_edges()
+    fig = visualizer.plot_multiple_satellites(
+        [{'name': 'A', 'path': track.to_path(), 'left_edge': left_edge, 'right_edge': right_edge, 'captured': []}],
+        []
+    )
+    lines, polygons = _collections(fig)
+    assert len(lines[0].get_segments()) == 1
+    assert len(polygons[0].get_paths()) == 1
+    plt.close(fig)
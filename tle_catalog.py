@@ -0,0 +1,230 @@
+# tle_catalog.py
+import contextlib
+from datetime import datetime, timedelta, timezone
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+from instrumentation import count, timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "satellite-tracker", "tle")
+
+# CelesTrak regenerates its element sets every few hours
+DEFAULT_MAX_AGE_SECONDS = 2 * 3600
+
+def tle_checksum(line):
+    """
+    Computes the modulo-10 checksum of a TLE line (digits count, '-' counts as 1).
+    """
+    total = 0
+    for char in line[:68]:
+        if char.isdigit():
+            total += int(char)
+        elif char == '-':
+            total += 1
+    return total % 10
+
+def is_valid_tle(tle1, tle2):
+    """
+    Checks line numbers, lengths, checksums and matching catalog numbers of a TLE pair.
+    """
+    if len(tle1) < 69 or len(tle2) < 69:
+        return False
+    if not (tle1.startswith('1 ') and tle2.startswith('2 ')):
+        return False
+    if tle1[2:7] != tle2[2:7]:
+        return False
+    if not (tle1[68].isdigit() and tle2[68].isdigit()):
+        return False
+    return tle_checksum(tle1) == int(tle1[68]) and tle_checksum(tle2) == int(tle2[68])
+
+def tle_epoch(tle1):
+    """
+    Returns the element set epoch of a TLE as POSIX seconds.
+    """
+    year = int(tle1[18:20])
+    year += 2000 if year < 57 else 1900
+    day = float(tle1[20:32])
+    start = datetime(year, 1, 1, tzinfo=timezone.utc)
+    return (start + timedelta(days=day - 1)).timestamp()
+
+def norad_id(tle1):
+    """
+    Returns the NORAD catalog number of a TLE as a string.
+    """
+    return tle1[2:7].strip()
+
+def parse_tle_text(text):
+    """
+    Parses a TLE file in 3-line (name, line 1, line 2) or 2-line format.
+
+    Element sets that fail is_valid_tle are skipped.
+
+    Returns:
+        List[dict]: Each dict contains 'name', 'tle1', 'tle2', 'norad_id' and 'epoch'.
+    """
+    lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+    satellites = []
+    i = 0
+    while i < len(lines) - 1:
+        if lines[i].startswith('1 ') and lines[i + 1].startswith('2 '):
+            name, tle1, tle2 = None, lines[i], lines[i + 1]
+            i += 2
+        elif i + 2 < len(lines) and lines[i + 1].startswith('1 ') and lines[i + 2].startswith('2 '):
+            name, tle1, tle2 = lines[i].strip(), lines[i + 1], lines[i + 2]
+            i += 3
+        else:
+            i += 1
+            continue
+        if not is_valid_tle(tle1, tle2):
+            continue
+        satellites.append({
+            'name': name or norad_id(tle1),
+            'tle1': tle1,
+            'tle2': tle2,
+            'norad_id': norad_id(tle1),
+            'epoch': tle_epoch(tle1),
+        })
+    return satellites
+
+def merge_satellites(existing, fetched):
+    """
+    Merges fetched satellites into an existing list without duplicates.
+
+    Satellites are matched by NORAD ID; a match is replaced when the fetched
+    element set is at least as recent, otherwise the existing one is kept.
+
+    Returns:
+        List[dict]: The merged list, in the original order with new satellites appended.
+    """
+    merged = list(existing)
+    positions = {norad_id(sat['tle1']): i for i, sat in enumerate(merged)}
+    for sat in fetched:
+        key = norad_id(sat['tle1'])
+        if key not in positions:
+            positions[key] = len(merged)
+            merged.append(sat)
+        elif tle_epoch(sat['tle1']) >= tle_epoch(merged[positions[key]]['tle1']):
+            merged[positions[key]] = sat
+    return merged
+
+class TLECatalog:
+    """
+    On-disk TLE store with conditional HTTP refresh.
+
+    Element sets are stored by NORAD ID, keeping the most recent epoch. Each
+    source URL remembers its ETag/Last-Modified headers and when it was last
+    fetched, so the network is only used once the data is older than max_age_seconds,
+    and then with a conditional request. If the network fails, the stored
+    element sets are returned instead; if the store cannot be written, the
+    catalog is kept in memory for the lifetime of the object.
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, max_age_seconds=DEFAULT_MAX_AGE_SECONDS, timeout=10, session=None):
+        self.store_dir = store_dir
+        self.max_age_seconds = max_age_seconds
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+        self._path = os.path.join(store_dir, "catalog.json")
+        self._data = self._read()
+
+    def _read(self):
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"sources": {}, "satellites": {}}
+
+    def _write(self):
+        # A read-only or full store only loses persistence; the catalog stays usable in memory
+        tmp_path = None
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.warning("Cannot write TLE store %s (%s); keeping the catalog in memory only", self._path, e)
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+
+    def is_stale(self, url):
+        source = self._data["sources"].get(url)
+        return source is None or time.time() - source["fetched_at"] >= self.max_age_seconds
+
+    def _store(self, satellites):
+        stored = self._data["satellites"]
+        for sat in satellites:
+            current = stored.get(sat["norad_id"])
+            if current is None or sat["epoch"] >= current["epoch"]:
+                stored[sat["norad_id"]] = sat
+
+    def refresh(self, url, force=False):
+        """
+        Refreshes a source from the network if it is stale (or force is set).
+
+        Returns:
+            str: 'fresh' (store used without a request), 'not-modified',
+                'updated' or 'offline' (request failed, store used).
+        """
+        with self._lock:
+            if not force and not self.is_stale(url):
+                return "fresh"
+            source = self._data["sources"].get(url, {})
+            headers = {}
+            if source.get("etag"):
+                headers["If-None-Match"] = source["etag"]
+            if source.get("last_modified"):
+                headers["If-Modified-Since"] = source["last_modified"]
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException:
+                return "offline"
+
+            if response.status_code == 304:
+                status = "not-modified"
+            elif response.status_code == 200:
+                satellites = parse_tle_text(response.text)
+                if not satellites:
+                    return "offline"
+                self._store(satellites)
+                source = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "norad_ids": [sat["norad_id"] for sat in satellites],
+                }
+                status = "updated"
+            else:
+                return "offline"
+            source["fetched_at"] = time.time()
+            self._data["sources"][url] = source
+            self._write()
+            return status
+
+    @timed('tle_load')
+    def load(self, url, force=False):
+        """
+        Returns the satellites of a source, refreshing it first when stale.
+
+        Returns:
+            List[dict]: Each dict contains 'name', 'tle1', 'tle2', 'norad_id'
+                and 'epoch'; empty if the source was never fetched successfully.
+        """
+        self.refresh(url, force)
+        source = self._data["sources"].get(url)
+        if source is None:
+            return []
+        stored = self._data["satellites"]
+        satellites = [dict(stored[key]) for key in source["norad_ids"] if key in stored]
+        count('tles_loaded', len(satellites))
+        return satellites
@@ -1,56 +1,188 @@
 # visualizer.py
+from functools import lru_cache
+
 import matplotlib.pyplot as plt
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+import numpy as np
+
+from ground_track import GroundTrack
+from instrumentation import count, stage, timed
+
+COLORS = ['blue', 'green', 'purple', 'brown', 'cyan', 'magenta']
+
+# Legends with hundreds of satellites are unreadable; beyond this only the targets are listed
+MAX_LEGEND_SATELLITES = 12
+
+@lru_cache(maxsize=4)
+def _basemap(width_px, height_px):
+    """
+    Renders the world basemap (land, ocean, coastlines, borders) once per size.
+
+    Returns:
+        np.ndarray: RGBA image covering lon [-180, 180] x lat [-90, 90].
+    """
+    # cartopy is only needed here, so the import cost is paid once per process
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
+    with stage('basemap'):
+        fig = Figure(figsize=(width_px / 100, height_px / 100), dpi=100)
+        ax = fig.add_axes([0, 0, 1, 1], projection=ccrs.PlateCarree())
+        ax.set_global()
+        ax.axis('off')
+        ax.coastlines()
+        ax.add_feature(cfeature.BORDERS, linestyle=':')
+        ax.add_feature(cfeature.LAND, facecolor='lightgray')
+        ax.add_feature(cfeature.OCEAN, facecolor='lightblue')
+        canvas = FigureCanvasAgg(fig)
+        canvas.draw()
+        image = np.asarray(canvas.buffer_rgba()).copy()
+    image.setflags(write=False)
+    return image
+
+def _split_runs(lons, max_points=None):
+    """
+    Splits a track into runs that neither cross the antimeridian nor contain NaNs.
+
+    Args:
+        lons (List[np.ndarray]): Longitude series sharing the same time axis;
+            a jump of more than 180 degrees in any of them starts a new run.
+        max_points (int): Optional decimation target per track.
+
+    Returns:
+        List[np.ndarray]: Index arrays, one per run.
+    """
+    n = len(lons[0])
+    keep = np.arange(n)
+    if max_points is not None and n > max_points:
+        stride = int(np.ceil(n / max_points))
+        keep = np.unique(np.append(keep[::stride], n - 1))
+    stacked = np.stack([lon[keep] for lon in lons])
+    valid = ~np.isnan(stacked).any(axis=0)
+    jumps = (np.abs(np.diff(stacked, axis=1)) > 180).any(axis=0)
+    breaks = np.flatnonzero(jumps | ~valid[:-1] | ~valid[1:]) + 1
+    runs = np.split(np.arange(len(keep)), breaks)
+    return [keep[run[valid[run]]] for run in runs if valid[run].sum() >= 2]
+
+@timed('render')
+def plot_ground_tracks(track, targets, figsize=(18, 10), decimate=True):
+    """
+    Fast map of many satellites' ground tracks and swaths from a GroundTrack.
+
+    The basemap is rendered once per process and reused as an image. Tracks
+    are split at the antimeridian in NumPy and drawn as one LineCollection in
+    plain lon/lat (PlateCarree) coordinates; swaths are drawn as filled polygons.
+
+    Args:
+        track (GroundTrack): Tracks, drawn with their swaths when the edge
+            columns are present; columns are read without copying.
+        targets (List[tuple]): List of target coordinates (lat, lon).
+        figsize (tuple): Figure size in inches.
+        decimate (bool): Drop points beyond the horizontal screen resolution.
+
+    Returns:
+        matplotlib.figure.Figure: The generated plot.
+    """
+    names, lat, lon = track.names, track.lat, track.lon
+    left_lat, left_lon, right_lat, right_lon = track.left_lat, track.left_lon, track.right_lat, track.right_lon
+    fig, ax = plt.subplots(figsize=figsize)
+    width_px = int(fig.get_figwidth() * fig.dpi)
+    ax.imshow(_basemap(width_px, width_px // 2), extent=(-180, 180, -90, 90), origin='upper', interpolation='bilinear')
+    max_points = width_px if decimate else None
+
+    segments = []
+    segment_colors = []
+    polygons = []
+    polygon_colors = []
+    has_edges = track.has_edges
+    if has_edges:
+        # Express the edges relative to the centre line so a swath straddling the
+        # antimeridian stays one narrow polygon (the axes clip anything beyond +-180)
+        left_lon = lon + (left_lon - lon + 180) % 360 - 180
+        right_lon = lon + (right_lon - lon + 180) % 360 - 180
+    for i in range(len(names)):
+        color = COLORS[i % len(COLORS)]
+        columns = (lon[i], left_lon[i], right_lon[i]) if has_edges else (lon[i],)
+        for run in _split_runs(columns, max_points):
+            segments.append(np.column_stack((lon[i][run], lat[i][run])))
+            segment_colors.append(color)
+            if has_edges:
+                polygons.append(np.concatenate((
+                    np.column_stack((left_lon[i][run], left_lat[i][run])),
+                    np.column_stack((right_lon[i][run], right_lat[i][run]))[::-1],
+                )))
+                polygon_colors.append(color)
+    count('points_rendered', sum(len(segment) for segment in segments))
+    if polygons:
+        ax.add_collection(PolyCollection(polygons, facecolors=polygon_colors, edgecolors='none', alpha=0.25))
+    ax.add_collection(LineCollection(segments, colors=segment_colors, linewidths=1.0))
+
+    # Plot targets
+    target_arr = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+    ax.scatter(target_arr[:, 1], target_arr[:, 0], color='black', marker='o', s=12, zorder=3)
+
+    ax.set_xlim(-180, 180)
+    ax.set_ylim(-90, 90)
+    ax.set_aspect('equal')
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.set_title('Satellite Ground Tracks with Swath Edges and Target Capture')
+
+    handles = []
+    if len(names) <= MAX_LEGEND_SATELLITES:
+        handles = [
+            Line2D([], [], color=COLORS[i % len(COLORS)], label=f"{name} Path")
+            for i, name in enumerate(names)
+        ]
+    handles.append(Line2D([], [], color='black', marker='o', linestyle='', label='Targets'))
+    # Move the legend below the plot
+    ax.legend(handles=handles, loc='upper center', bbox_to_anchor=(0.5, -0.05), ncol=3)
+    return fig
 
 def plot_multiple_satellites(sat_data_list, targets):
     """
     Plots multiple satellites' ground tracks along with their swath edges on a world map.
-    
+
+    Compatibility wrapper around plot_ground_tracks for the list-of-dicts format.
+
     Args:
         sat_data_list (List[dict]): Each dict should contain:
             - 'name': Satellite name
-            - 'path': List of dicts with 'lat' and 'lon'
+            - 'path': List of dicts with 'lat' and 'lon' (and optionally 'time')
             - 'left_edge': List of dicts with 'lat' and 'lon'
             - 'right_edge': List of dicts with 'lat' and 'lon'
             - 'captured': List of capture events (each a dict)
+            Swaths are drawn only when every satellite has non-empty edges.
         targets (List[tuple]): List of target coordinates (lat, lon)
-    
+
     Returns:
         matplotlib.figure.Figure: The generated plot.
     """
-    fig, ax = plt.subplots(figsize=(18, 10), subplot_kw={'projection': ccrs.PlateCarree()})
-    
-    ax.set_global()
-    ax.coastlines()
-    ax.add_feature(cfeature.BORDERS, linestyle=':')
-    ax.add_feature(cfeature.LAND, facecolor='lightgray')
-    ax.add_feature(cfeature.OCEAN, facecolor='lightblue')
-    
-    colors = ['blue', 'green', 'purple', 'brown', 'cyan', 'magenta']
-    
-    for i, sat in enumerate(sat_data_list):
-        color = colors[i % len(colors)]
-        # Plot center path (to be included in the legend)
-        lats = [p['lat'] for p in sat['path']]
-        lons = [p['lon'] for p in sat['path']]
-        ax.plot(lons, lats, label=f"{sat['name']} Path", color=color, transform=ccrs.Geodetic())
-        
-        # Plot left and right edges (no legend labels)
-        lats_left = [p['lat'] for p in sat['left_edge']]
-        lons_left = [p['lon'] for p in sat['left_edge']]
-        ax.plot(lons_left, lats_left, color=color, linestyle='--', transform=ccrs.Geodetic())
-        
-        lats_right = [p['lat'] for p in sat['right_edge']]
-        lons_right = [p['lon'] for p in sat['right_edge']]
-        ax.plot(lons_right, lats_right, color=color, linestyle='-.', transform=ccrs.Geodetic())
-    
-    # Plot targets
-    t_lats = [t[0] for t in targets]
-    t_lons = [t[1] for t in targets]
-    ax.scatter(t_lons, t_lats, label='Targets', color='black', marker='o', transform=ccrs.Geodetic())
-    
-    ax.set_title('Satellite Ground Tracks with Swath Edges and Target Capture')
-    # Move the legend below the plot
-    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.05), ncol=3)
-    return fig
\ No newline at end of file
+    names = [sat['name'] for sat in sat_data_list]
+    keys = ['path']
+    if sat_data_list and all(sat.get('left_edge') and sat.get('right_edge') for sat in sat_data_list):
+        keys += ['left_edge', 'right_edge']
+    columns = []
+    for key in keys:
+        for coord in ('lat', 'lon'):
+            rows = [np.array([p[coord] for p in sat[key]], dtype=np.float64) for sat in sat_data_list]
+            columns.append(_pad_rows(rows))
+    # Paths may differ in length; the longest one provides the time axis,
+    # or the point index when it has no times (only the drawing uses it)
+    longest = max((sat['path'] for sat in sat_data_list), key=len, default=[])
+    if all('time' in point for point in longest):
+        epoch = np.array([point['time'].timestamp() for point in longest], dtype=np.float64)
+    else:
+        epoch = np.arange(len(longest), dtype=np.float64)
+    return plot_ground_tracks(GroundTrack(names, epoch, *columns), targets)
+
+def _pad_rows(rows):
+    # Tracks of different lengths are padded with NaN, which _split_runs skips
+    width = max((len(row) for row in rows), default=0)
+    padded = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        padded[i, :len(row)] = row
+    return padded